@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+import argparse
+import gc
+import resource
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+from ucca import core, layer0, layer1, convert, normalization
+
+desc = """Measures the performance of core passage operations on synthetic passages of increasing size."""
+
+SCENE_SIZE = 8  # Terminals per parallel scene in synthetic passages
+STREAM_PASSAGE_SIZE = 32  # Terminals per passage in streaming benchmarks
+
+
+def synthetic_passage(num_terminals, passage_id="1"):
+    """Creates a passage with the given number of terminals and a regular layer 1 annotation.
+
+    Every SCENE_SIZE terminals form a parallel scene: [[A [E t] [C t t]] [P t t] [D t t] [U t]],
+    where each scene except the first has a remote A pointing to the participant of the previous scene,
+    and every pair of consecutive scenes is linked by a linkage whose relation is the previous scene's D.
+    """
+    p = core.Passage(passage_id)
+    l0 = layer0.Layer0(p)
+    l1 = layer1.Layer1(p)
+    terminals = [l0.add_terminal(text=str(i), punct=(i % SCENE_SIZE == 0), paragraph=1 + i // 1000)
+                 for i in range(1, num_terminals + 1)]
+    previous = None
+    for start in range(0, num_terminals, SCENE_SIZE):
+        terms = terminals[start:start + SCENE_SIZE]
+        if len(terms) < SCENE_SIZE:
+            for terminal in terms:
+                l1.add_fnode(None, layer1.EdgeTags.Function).add(layer1.EdgeTags.Terminal, terminal)
+            break
+        scene = l1.add_fnode(None, layer1.EdgeTags.ParallelScene)
+        a = l1.add_fnode(scene, layer1.EdgeTags.Participant)
+        l1.add_fnode(a, layer1.EdgeTags.Elaborator).add(layer1.EdgeTags.Terminal, terms[0])
+        c = l1.add_fnode(a, layer1.EdgeTags.Center)
+        c.add(layer1.EdgeTags.Terminal, terms[1])
+        c.add(layer1.EdgeTags.Terminal, terms[2])
+        process = l1.add_fnode(scene, layer1.EdgeTags.Process)
+        process.add(layer1.EdgeTags.Terminal, terms[3])
+        process.add(layer1.EdgeTags.Terminal, terms[4])
+        d = l1.add_fnode(scene, layer1.EdgeTags.Adverbial)
+        d.add(layer1.EdgeTags.Terminal, terms[5])
+        d.add(layer1.EdgeTags.Terminal, terms[6])
+        l1.add_punct(scene, terms[7])
+        if previous is not None:
+            previous_scene, previous_a, previous_d = previous
+            l1.add_remote(scene, layer1.EdgeTags.Participant, previous_a)
+            l1.add_linkage(previous_d, previous_scene, scene)
+        previous = scene, a, d
+    return p
+
+
+def timed(f, *args, repeat=3):
+    """Returns the minimal wall time, in seconds, of calling f(*args) `repeat' times."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        f(*args)
+        duration = time.perf_counter() - started
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def traced_bytes(f, *args):
+    """Returns the result of f(*args) and the number of bytes it holds on to."""
+    tracemalloc.start()
+    result = f(*args)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated
+
+
+def benchmark_construction(sizes, repeat):
+    """Times convert.from_standard on passages of increasing size; near-constant time per terminal means linear."""
+    print("%10s %12s %16s" % ("terminals", "seconds", "us/terminal"))
+    for size in sizes:
+        root = convert.to_standard(synthetic_passage(size))
+        duration = timed(convert.from_standard, root, repeat=repeat)
+        print("%10d %12.4f %16.2f" % (size, duration, 1e6 * duration / size))
+
+
+def eager_passage(num_terminals):
+    """Creates a synthetic passage whose nodes and edges all have their attribute and extra dicts allocated,
+    as every element did before they were allocated on first use."""
+    p = synthetic_passage(num_terminals)
+    for node in p.nodes.values():
+        for element in [node] + list(node):
+            element.extra.clear()  # the getter allocates it
+            attrib = element.attrib
+            if isinstance(attrib, core._AttributeDict):  # terminal attributes are stored in Layer0 columns
+                attrib._writable()
+    return p
+
+
+def benchmark_memory(sizes, repeat):
+    """Measures the memory held by passages of increasing size, per node (edges, attributes etc. included),
+    with attribute and extra dicts allocated lazily and eagerly."""
+    del repeat
+    print("%10s %10s %10s %14s %16s %16s" % ("terminals", "nodes", "edges", "bytes", "bytes/node", "eager bytes/node"))
+    for size in sizes:
+        passage, allocated = traced_bytes(synthetic_passage, size)
+        _, eager_allocated = traced_bytes(eager_passage, size)
+        nodes = len(passage.nodes)
+        edges = sum(len(node) for node in passage.nodes.values())
+        print("%10d %10d %10d %14d %16.1f %16.1f" % (size, nodes, edges, allocated, allocated / nodes,
+                                                     eager_allocated / nodes))
+
+
+def benchmark_compact(sizes, repeat):
+    """Compares counting edge tags over Node/Edge objects with the same query over a CompactPassage."""
+    print("%10s %14s %14s %14s %14s" % ("terminals", "objects (s)", "compact (s)", "objects (B)", "compact (B)"))
+    for size in sizes:
+        passage, passage_bytes = traced_bytes(synthetic_passage, size)
+        compact, compact_bytes = traced_bytes(passage.to_compact)
+
+        def count_objects():
+            return Counter(edge.tag for node in passage.layer(layer1.LAYER_ID).all for edge in node)
+
+        def count_compact():
+            return np.bincount(compact.edge_tag[compact.node_layer[np.repeat(
+                np.arange(len(compact)), np.diff(compact.indptr))] == compact.layer_ids.index(layer1.LAYER_ID)])
+
+        print("%10d %14.5f %14.5f %14d %14d" % (size, timed(count_objects, repeat=repeat),
+                                                timed(count_compact, repeat=repeat), passage_bytes, compact_bytes))
+
+
+def benchmark_copy(sizes, repeat):
+    """Times Passage.copy, with and without sharing attributes, against a round trip through the standard XML."""
+    print("%10s %14s %14s %14s" % ("terminals", "copy (s)", "shared (s)", "XML (s)"))
+    for size in sizes:
+        passage = synthetic_passage(size)
+        print("%10d %14.5f %14.5f %14.5f" % (
+            size, timed(passage.copy, repeat=repeat), timed(lambda: passage.copy(share_attrib=True), repeat=repeat),
+            timed(lambda: convert.from_standard(convert.to_standard(passage)), repeat=repeat)))
+
+
+def benchmark_frozen(sizes, repeat):
+    """Times reading derived properties of all layer 1 nodes, with the passage unfrozen and frozen (memoized)."""
+    print("%10s %14s %14s" % ("terminals", "unfrozen (s)", "frozen (s)"))
+    for size in sizes:
+        passage = synthetic_passage(size)
+
+        def read_all():
+            for node in passage.layer(layer1.LAYER_ID).all:
+                if node.tag == layer1.NodeTags.Foundational:
+                    _ = (node.start_position, node.end_position, node.discontiguous, node.fparent, node.ftag,
+                         node.parents, node.children)
+
+        unfrozen = timed(read_all, repeat=repeat)
+        passage.frozen = True
+        read_all()  # fill the cache
+        print("%10d %14.5f %14.5f" % (size, unfrozen, timed(read_all, repeat=repeat)))
+
+
+def benchmark_gc(sizes, repeat):
+    """Streams passages of STREAM_PASSAGE_SIZE terminals, dropping each one, with and without Passage.close.
+
+    Here sizes are numbers of passages in the stream, e.g. -s 100000. Reports the total and longest pause of
+    the cyclic garbage collector, and the peak resident set size of the process so far (which never decreases,
+    so streams with close run first).
+    """
+    del repeat
+    pauses = []
+
+    def on_gc(phase, info):
+        del info
+        if phase == "start":
+            pauses.append(time.perf_counter())
+        else:
+            pauses[-1] = time.perf_counter() - pauses[-1]
+
+    print("%10s %6s %12s %14s %14s %14s" % ("passages", "close", "seconds", "GC total (s)", "GC max (ms)",
+                                            "peak RSS (MB)"))
+    gc.callbacks.append(on_gc)
+    try:
+        for close in True, False:
+            for size in sizes:
+                gc.collect()
+                del pauses[:]
+                started = time.perf_counter()
+                for i in range(size):
+                    passage = synthetic_passage(STREAM_PASSAGE_SIZE, passage_id=str(i))
+                    if close:
+                        passage.close()
+                    del passage
+                duration = time.perf_counter() - started
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+                print("%10d %6s %12.3f %14.4f %14.3f %14.1f" % (size, close, duration, sum(pauses),
+                                                                1000 * max(pauses, default=0), peak))
+    finally:
+        gc.callbacks.remove(on_gc)
+
+
+def benchmark_arrays(sizes, repeat):
+    """Compares building passages edge by edge with the layer 1 API against convert.from_arrays."""
+    print("%10s %14s %14s %14s" % ("terminals", "API (s)", "arrays (s)", "to_arrays (s)"))
+    for size in sizes:
+        arrays = convert.to_arrays(synthetic_passage(size))
+        print("%10d %14.5f %14.5f %14.5f" % (size, timed(synthetic_passage, size, repeat=repeat),
+                                             timed(convert.from_arrays, *arrays, repeat=repeat),
+                                             timed(convert.to_arrays, synthetic_passage(size), repeat=repeat)))
+
+
+def benchmark_span(sizes, repeat):
+    """Compares splitting passages into one sub-passage per SCENE_SIZE terminals with creating a PassageView of each."""
+    print("%10s %14s %14s" % ("terminals", "split (s)", "views (s)"))
+    for size in sizes:
+        passage = synthetic_passage(size)
+        ends = list(range(SCENE_SIZE, size, SCENE_SIZE)) + [size]
+        print("%10d %14.5f %14.5f" % (size, timed(convert.split_passage, passage, ends, repeat=repeat), timed(
+            lambda: [convert.PassageView(passage, start, end) for start, end in zip([0] + ends[:-1], ends)],
+            repeat=repeat)))
+
+
+def benchmark_terminals(sizes, repeat):
+    """Compares creating the terminals of a passage one by one with Layer0.add_terminal against Layer0.add_terminals."""
+    def _one_by_one(texts, punct, paragraphs):
+        l0 = layer0.Layer0(core.Passage("1"))
+        for args in zip(texts, punct, paragraphs):
+            l0.add_terminal(*args)
+
+    def _bulk(texts, punct, paragraphs):
+        layer0.Layer0(core.Passage("1")).add_terminals(texts, punct, paragraphs)
+
+    print("%10s %14s %14s" % ("terminals", "one by one (s)", "bulk (s)"))
+    for size in sizes:
+        args = (["w%d" % i for i in range(size)], [i % 10 == 9 for i in range(size)],
+                [1 + i // 100 for i in range(size)])
+        print("%10d %14.5f %14.5f" % (size, timed(_one_by_one, *args, repeat=repeat),
+                                      timed(_bulk, *args, repeat=repeat)))
+
+
+def benchmark_yields(sizes, repeat):
+    """Compares the terminal positions of all layer 1 nodes computed recursively per node and from cached spans."""
+    def _recursive(passage):
+        return [sorted(t.position for t in node.get_terminals(visited=set()))
+                for node in passage.layer(layer1.LAYER_ID).all if node.tag == layer1.NodeTags.Foundational]
+
+    def _spans(passage):
+        return [node.get_positions() for node in passage.layer(layer1.LAYER_ID).all
+                if node.tag == layer1.NodeTags.Foundational]
+
+    print("%10s %14s %14s" % ("terminals", "recursive (s)", "spans (s)"))
+    for size in sizes:
+        passage = synthetic_passage(size)
+        copies = iter([passage.copy() for _ in range(repeat)])  # a fresh passage for each run, to start uncached
+        print("%10d %14.5f %14.5f" % (size, timed(_recursive, passage, repeat=repeat),
+                                      timed(lambda: _spans(next(copies)), repeat=repeat)))
+
+
+def benchmark_normalize(sizes, repeat):
+    """Times normalization.normalize (with extra normalization) and scene and role lookups on all layer 1 nodes."""
+    def _roles(passage):
+        return [(node.is_scene(), node.participants, node.centers, node.functions)
+                for node in passage.layer(layer1.LAYER_ID).all if node.tag == layer1.NodeTags.Foundational]
+
+    print("%10s %14s %14s" % ("terminals", "normalize (s)", "roles (s)"))
+    for size in sizes:
+        passage = synthetic_passage(size)
+        copies = iter([passage.copy() for _ in range(repeat)])  # normalize modifies the passage
+        print("%10d %14.5f %14.5f" % (size, timed(lambda: normalization.normalize(next(copies), extra=True),
+                                                  repeat=repeat),
+                                      timed(_roles, passage, repeat=repeat)))
+
+
+BENCHMARKS = {
+    "construction": benchmark_construction,
+    "memory": benchmark_memory,
+    "compact": benchmark_compact,
+    "copy": benchmark_copy,
+    "frozen": benchmark_frozen,
+    "gc": benchmark_gc,
+    "arrays": benchmark_arrays,
+    "span": benchmark_span,
+    "terminals": benchmark_terminals,
+    "yields": benchmark_yields,
+    "normalize": benchmark_normalize,
+}
+
+
+def main(args):
+    for name in args.benchmarks or BENCHMARKS:
+        print("== %s ==" % name)
+        BENCHMARKS[name](args.sizes, args.repeat)
+        print()
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description=desc)
+    argparser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                           help="benchmarks to run, out of {%s} (default: all)" % ",".join(BENCHMARKS))
+    argparser.add_argument("-s", "--sizes", nargs="+", type=int, default=[250, 500, 1000, 2000, 4000],
+                           help="numbers of terminals in the synthetic passages")
+    argparser.add_argument("-r", "--repeat", type=int, default=3, help="number of repetitions per measurement")
+    main(argparser.parse_args())
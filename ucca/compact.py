@@ -0,0 +1,280 @@
+"""Read-only, array-backed representation of a :class:`core`.Passage.
+
+A :class:`CompactPassage` stores the annotation graph of a Passage in NumPy
+arrays: one entry per node (type, tag, layer, implicit flag, terminal
+position, fparent and terminal span) and one entry per edge, laid out in
+compressed sparse row (CSR) form, in both the parent-to-child and the
+child-to-parent direction. Strings (tags, layer IDs) and classes are stored
+once per passage and referred to by integer codes.
+
+This is meant for analytics and feature extraction over large corpora, where
+passages are never modified: aggregate queries become array operations, e.g.
+``numpy.bincount(compact.edge_tag[compact.remote])`` counts remote edges by
+tag. Attributes, categories and extra data which are not encoded in arrays
+are kept in sparse dictionaries, so :meth:`CompactPassage.to_passage`
+restores an equivalent Passage.
+
+"""
+
+import numpy as np
+
+from ucca import core, layer0, layer1
+
+
+class CompactPassage:
+    """Frozen, CSR-encoded annotation graph of a :class:`core`.Passage.
+
+    Nodes are numbered by their order in the Passage layers, and edges by
+    their order in the outgoing edges of their parents, so the outgoing edges
+    of node i are the edges indptr[i] to indptr[i+1] - 1.
+
+    Attributes:
+        ID, attrib, extra, frozen: those of the original Passage
+        layers: tuple of (class, ID, attrib, extra) for each Layer
+        node_ids: tuple of the original Node IDs
+        node_types: tuple of Node classes, indexed by node_type
+        node_tags: tuple of Node tags, indexed by node_tag
+        edge_tags: tuple of Edge tags, indexed by edge_tag
+        layer_ids: tuple of Layer IDs, indexed by node_layer
+        node_type, node_tag, node_layer: codes per node
+        implicit: whether each node is implicit
+        position: position of each terminal, -1 for other nodes
+        paragraph, para_pos: paragraph and position in paragraph of each
+            terminal, -1 for other nodes
+        texts: tuple of the text of each terminal, None for other nodes
+        fparent: index of the foundational parent of each node, or -1
+        span_start, span_end: positions of the first and last terminal under
+            each node, not following remote edges, or -1 if there are none
+        indptr: start of the outgoing edges of each node in the edge arrays
+        child: child node index of each edge
+        edge_tag: tag code of each edge (of its first category), -1 if none
+        remote: whether each edge is remote
+        parent_indptr: start of the incoming edges of each node in
+            parent and parent_edge
+        parent: parent node index of each incoming edge
+        parent_edge: edge index of each incoming edge
+        node_attrib, node_extra, edge_attrib, edge_extra: dictionaries
+            from node/edge index to the non-empty attrib/extra of the element
+            (terminal attributes encoded in arrays are not repeated here)
+        edge_categories: dictionary from edge index to a list of category
+            4-tuples (tag, slot, layer, parent), for edges whose categories
+            are not just a single plain tag
+
+    """
+
+    def __init__(self, passage):
+        """Creates a CompactPassage from a :class:`core`.Passage.
+
+        :param passage: the Passage to encode
+
+        """
+        self.ID = passage.ID
+        self.attrib = passage.attrib.copy()
+        self.extra = passage.extra.copy()
+        self.frozen = passage.frozen
+        self.layers = tuple((type(layer), layer.ID, layer.attrib.copy(), layer.extra.copy())
+                            for layer in passage.layers)
+        nodes = [node for layer in passage.layers for node in layer.all]
+        index = {id(node): i for i, node in enumerate(nodes)}
+        self.node_ids = tuple(node.ID for node in nodes)
+        self._index = {ID: i for i, ID in enumerate(self.node_ids)}
+        node_types, node_tags, edge_tags, layer_ids = {}, {}, {}, {}
+        self.node_attrib, self.node_extra, self.edge_attrib, self.edge_extra = {}, {}, {}, {}
+        self.edge_categories = {}
+        node_type, node_tag, node_layer, implicit, position, fparent = [], [], [], [], [], []
+        paragraph, para_pos, texts = [], [], []
+        indptr, child, edge_tag, remote = [0], [], [], []
+        edge_index = {}  # id(edge) -> edge index
+        primary_children = []
+        for i, node in enumerate(nodes):
+            node_type.append(node_types.setdefault(type(node), len(node_types)))
+            node_tag.append(node_tags.setdefault(node.tag, len(node_tags)))
+            node_layer.append(layer_ids.setdefault(node.layer.ID, len(layer_ids)))
+            implicit.append(bool(node.attrib.get("implicit")))
+            fparent.append(next((index[id(e.parent)] for e in node.incoming if _is_fedge(e)), -1))
+            attrib = node.attrib.copy()
+            if isinstance(node, layer0.Terminal):
+                position.append(node.position)
+                texts.append(attrib.pop("text"))
+                paragraph.append(attrib.pop("paragraph"))
+                para_pos.append(attrib.pop("paragraph_position"))
+            else:
+                position.append(-1)
+                texts.append(None)
+                paragraph.append(-1)
+                para_pos.append(-1)
+            if attrib:
+                self.node_attrib[i] = attrib
+            if node.extra:
+                self.node_extra[i] = node.extra.copy()
+            primary_children.append([])
+            for edge in node:
+                j = edge_index[id(edge)] = len(child)
+                child.append(index[id(edge.child)])
+                categories = [core.category_key(c) for c in edge.category_ids]
+                edge_tag.append(edge_tags.setdefault(categories[0][0], len(edge_tags)) if categories else -1)
+                if len(categories) != 1 or any(categories[0][1:]):
+                    self.edge_categories[j] = categories
+                remote.append(bool(edge.attrib.get("remote")))
+                if not remote[-1]:
+                    primary_children[-1].append(child[-1])
+                if len(edge.attrib):
+                    self.edge_attrib[j] = edge.attrib.copy()
+                if edge.extra:
+                    self.edge_extra[j] = edge.extra.copy()
+            indptr.append(len(child))
+        self.node_types, self.node_tags, self.edge_tags, self.layer_ids = \
+            map(tuple, (node_types, node_tags, edge_tags, layer_ids))
+        self.node_type = _frozen_array(node_type, np.int8)
+        self.node_tag = _frozen_array(node_tag, np.int32)
+        self.node_layer = _frozen_array(node_layer, np.int8)
+        self.implicit = _frozen_array(implicit, np.bool_)
+        self.position = _frozen_array(position, np.int32)
+        self.paragraph = _frozen_array(paragraph, np.int32)
+        self.para_pos = _frozen_array(para_pos, np.int32)
+        self.texts = tuple(texts)
+        self.fparent = _frozen_array(fparent, np.int32)
+        self.indptr = _frozen_array(indptr, np.int64)
+        self.child = _frozen_array(child, np.int32)
+        self.edge_tag = _frozen_array(edge_tag, np.int32)
+        self.remote = _frozen_array(remote, np.bool_)
+        self.parent_edge = _frozen_array([edge_index[id(e)] for node in nodes for e in node.incoming], np.int64)
+        self.parent = _frozen_array(np.repeat(np.arange(len(nodes)), np.diff(self.indptr))[self.parent_edge],
+                                    np.int32)
+        self.parent_indptr = _frozen_array(np.cumsum([0] + [len(node.incoming) for node in nodes]), np.int64)
+        span_start, span_end = _spans(position, primary_children)
+        self.span_start = _frozen_array(span_start, np.int32)
+        self.span_end = _frozen_array(span_end, np.int32)
+
+    def __len__(self):
+        """Number of nodes."""
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.child)
+
+    def index(self, ID):
+        """Returns the index of the node with the given ID.
+
+        :raise KeyError: if no node with this ID is present
+
+        """
+        return self._index[ID]
+
+    def tag(self, i):
+        """Returns the tag of node i."""
+        return self.node_tags[self.node_tag[i]]
+
+    def layer(self, i):
+        """Returns the Layer ID of node i."""
+        return self.layer_ids[self.node_layer[i]]
+
+    def outgoing(self, i):
+        """Returns the indices of the outgoing edges of node i, in order."""
+        return np.arange(self.indptr[i], self.indptr[i + 1])
+
+    def incoming(self, i):
+        """Returns the indices of the incoming edges of node i, in order."""
+        return self.parent_edge[self.parent_indptr[i]:self.parent_indptr[i + 1]]
+
+    def children(self, i):
+        """Returns the indices of the children of node i, in order."""
+        return self.child[self.indptr[i]:self.indptr[i + 1]]
+
+    def parents(self, i):
+        """Returns the indices of the parents of node i, in order."""
+        return self.parent[self.parent_indptr[i]:self.parent_indptr[i + 1]]
+
+    def tags(self, i):
+        """Returns the tags of the outgoing edges of node i, in order (None for edges with no category)."""
+        return [self.edge_tags[code] if code >= 0 else None
+                for code in self.edge_tag[self.indptr[i]:self.indptr[i + 1]]]
+
+    def terminal_span(self, i):
+        """Returns the positions of the first and last terminals under node i, or (-1, -1) if there are none."""
+        return int(self.span_start[i]), int(self.span_end[i])
+
+    def to_passage(self):
+        """Restores a :class:`core`.Passage equivalent to the original one.
+
+        Layers and nodes are created with their default ordering.
+
+        :return: a new Passage object
+
+        """
+        passage = core.Passage(self.ID, attrib=self.attrib.copy())
+        passage.extra = self.extra.copy()
+        with passage.bulk_build():
+            for layer_type, layer_id, attrib, extra in self.layers:
+                layer = layer_type(ID=layer_id, root=passage, attrib=attrib.copy()) if layer_type is core.Layer \
+                    else layer_type(root=passage, attrib=attrib.copy())
+                layer.extra = extra.copy()
+            nodes = []
+            for i, ID in enumerate(self.node_ids):
+                attrib = self.node_attrib.get(i, {})
+                if self.texts[i] is not None:
+                    attrib = dict(text=self.texts[i], paragraph=int(self.paragraph[i]),
+                                  paragraph_position=int(self.para_pos[i]), **attrib)
+                try:  # some nodes are created automatically with the layer
+                    node = passage.by_id(ID)
+                    node.attrib.update(attrib)
+                except KeyError:
+                    node = self.node_types[self.node_type[i]](ID=ID, root=passage, tag=self.tag(i),
+                                                              attrib=attrib.copy())
+                if i in self.node_extra:
+                    node.extra = self.node_extra[i].copy()
+                nodes.append(node)
+            for i, node in enumerate(nodes):
+                for j in range(self.indptr[i], self.indptr[i + 1]):
+                    categories = self.edge_categories.get(j)
+                    if categories is None:
+                        categories = [(self.edge_tags[self.edge_tag[j]],)]
+                    attrib = self.edge_attrib.get(j)
+                    edge = node.add_multiple(categories, nodes[self.child[j]],
+                                             edge_attrib=None if attrib is None else attrib.copy())
+                    if j in self.edge_extra:
+                        edge.extra = self.edge_extra[j].copy()
+        passage.frozen = self.frozen
+        return passage
+
+
+def _spans(position, children):
+    """Computes the terminal span of each node, bottom-up (in post-order).
+
+    :param position: position of each node if it is a terminal, otherwise -1
+    :param children: list of child indices of each node (to take into account)
+
+    :return: lists of the first and last terminal position under each node, -1 if none
+
+    """
+    start, end = list(position), list(position)
+    state = [0] * len(position)  # 0: unvisited, 1: children pending, 2: done (1 also breaks cycles)
+    for root in range(len(position)):
+        stack = [root]
+        while stack:
+            i = stack[-1]
+            if state[i] == 0:
+                state[i] = 1
+                stack.extend(c for c in children[i] if state[c] == 0)
+                continue
+            stack.pop()
+            if state[i] == 1:
+                state[i] = 2
+                for c in children[i]:
+                    if state[c] == 2 and end[c] >= 0:
+                        start[i] = start[c] if start[i] < 0 else min(start[i], start[c])
+                        end[i] = max(end[i], end[c])
+    return start, end
+
+
+def _frozen_array(values, dtype=None):
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+def _is_fedge(edge):
+    """Whether the edge connects its child to its foundational parent (see :attr:`layer1.FoundationalNode.fparent`)."""
+    return (edge.parent.layer.ID == layer1.LAYER_ID and edge.parent.tag == layer1.NodeTags.Foundational and
+            not edge.attrib.get("remote"))
@@ -1,7 +1,7 @@
 from collections import OrderedDict
 from itertools import chain
 
-from ucca import textutil, layer0, layer1
+from ucca import core, textutil, layer0, layer1
 from ucca.layer1 import EdgeTags, NodeTags
 
 
@@ -61,21 +61,28 @@ def positions(terminals):
     return frozenset(t.position for t in terminals)
 
 
+def node_positions(node, punct=True):
+    """Returns the yield of a node, using the cached spans of layer 1 nodes."""
+    if isinstance(node, layer1.FoundationalNode):
+        return frozenset(node.get_positions(punct=punct))
+    return positions(node.get_terminals(punct=punct))
+
+
 class Candidate:
     def __init__(self, edge, reference=None, reference_yield_tags=None, verbose=False):
         self.edge = edge
-        self.out_tags = {t for e in edge.child for t in e.tags}
+        self.out_tag_ids = {t for e in edge.child for t in e.tag_ids}
         self.reference = reference
         self.reference_yield_tags = reference_yield_tags
         self.verbose = verbose
         self.terminals = self.edge.child.get_terminals()
-        self._terminal_yield = positions(self.terminals)
-        self._terminal_yield_no_punct = positions(self.edge.child.get_terminals(punct=False))
+        self._terminal_yield = node_positions(self.edge.child)
+        self._terminal_yield_no_punct = node_positions(self.edge.child, punct=False)
         if self.reference is not None:
             self.terminals = [self.reference.by_id(t.ID) for t in self.terminals]
         self.extra = {}
         self.is_unary_child = self.edge.parent.incoming and (
-                self._terminal_yield_no_punct == positions(self.edge.parent.get_terminals(punct=False)))
+                self._terminal_yield_no_punct == node_positions(self.edge.parent, punct=False))
 
     def _annotate(self, attr=None):
         passage = self.edge.parent.root
@@ -88,6 +95,10 @@ class Candidate:
                 ret = self.extra[attr] = {t.get_annotation(attr, as_array=True) for t in self.terminals}
             return ret
 
+    @property
+    def out_tags(self):
+        return set(map(core.tag_by_id, self.out_tag_ids))
+
     @property
     def remote(self):
         return self.edge.attrib.get("remote", False)
@@ -98,7 +109,8 @@ class Candidate:
 
     @property
     def excluded(self):
-        return bool(EXCLUDED_EDGE_TAGS.intersection(self.edge.tags)) or self.edge.child.tag in EXCLUDED_NODE_TAGS
+        return bool(EXCLUDED_EDGE_TAG_IDS.intersection(self.edge.tag_ids)) or \
+            self.edge.child.tag in EXCLUDED_NODE_TAGS
 
     @property
     def pos(self):
@@ -115,7 +127,7 @@ class Candidate:
         if ret is None:
             self._annotate()
             para_pos = {t.para_pos for t in self.terminals}
-            ret = self.extra[attr] = {t for t in self.terminals if int(t.tok[attr]) not in para_pos}
+            ret = self.extra[attr] = {t for t in self.terminals if int(t.tok[attr.value]) not in para_pos}
         return ret
 
     @property
@@ -127,7 +139,7 @@ class Candidate:
         return ret
 
     def is_punct(self):
-        return EdgeTags.Punctuation in self.edge.tags or self.edge.child.tag == NodeTags.Punctuation
+        return PUNCTUATION_ID in self.edge.tag_ids or self.edge.child.tag == NodeTags.Punctuation
 
     def is_primary(self):
         return not self.remote and not self.implicit and not self.is_punct()
@@ -136,8 +148,8 @@ class Candidate:
         return self.remote and not self.implicit and not self.is_punct()
 
     def is_predicate(self):
-        return bool({EdgeTags.Process, EdgeTags.State}.intersection(self.edge.tags)) and \
-               self.out_tags <= {EdgeTags.Center, EdgeTags.Function, EdgeTags.Terminal} and \
+        return bool(PREDICATE_TAG_IDS.intersection(self.edge.tag_ids)) and \
+               self.out_tag_ids <= PREDICATE_CHILD_TAG_IDS and \
                "to" not in self.tokens
 
     def constructions(self, constructions=None):
@@ -163,13 +175,20 @@ class Candidate:
 EXCLUDED_EDGE_TAGS = {EdgeTags.LinkArgument, EdgeTags.LinkRelation, EdgeTags.Terminal}
 EXCLUDED_NODE_TAGS = {NodeTags.Linkage, layer0.NodeTags.Word, layer0.NodeTags.Punct}
 
+# Edge tags are compared by their IDs (see core.tag_id)
+EXCLUDED_EDGE_TAG_IDS = frozenset(map(core.tag_id, EXCLUDED_EDGE_TAGS))
+PREDICATE_TAG_IDS = frozenset(map(core.tag_id, (EdgeTags.Process, EdgeTags.State)))
+PREDICATE_CHILD_TAG_IDS = frozenset(map(core.tag_id, (EdgeTags.Center, EdgeTags.Function, EdgeTags.Terminal)))
+PUNCTUATION_ID, ADVERBIAL_ID, FUNCTION_ID = map(core.tag_id, (EdgeTags.Punctuation, EdgeTags.Adverbial,
+                                                              EdgeTags.Function))
+
 CONSTRUCTIONS = (
     Construction("primary", "Regular edges", Candidate.is_primary, default=True),
     Construction("remote", "Remote edges", Candidate.is_remote, default=True),
     Construction("aspectual_verbs", "Aspectual verbs",
-                 lambda c: c.pos == {"VERB"} and EdgeTags.Adverbial in c.edge.tags),
+                 lambda c: c.pos == {"VERB"} and ADVERBIAL_ID in c.edge.tag_ids),
     Construction("light_verbs", "Light verbs",
-                 lambda c: c.pos == {"VERB"} and EdgeTags.Function in c.edge.tags),
+                 lambda c: c.pos == {"VERB"} and FUNCTION_ID in c.edge.tag_ids),
     Construction("mwe", "Multi-word expressions",
                  lambda c: c.is_primary() and c.edge.child.tag == NodeTags.Foundational and len(
                      c.edge.child.terminals) > 1),  # Unanalyzable unit
@@ -178,7 +197,7 @@ CONSTRUCTIONS = (
     Construction("pred_adjs", "Predicate adjectives",
                  lambda c: "ADJ" in c.pos and "NOUN" not in c.pos and c.is_predicate()),
     Construction("expletives", "Expletives",
-                 lambda c: c.tokens <= {"it", "there"} and EdgeTags.Function in c.edge.tags),
+                 lambda c: c.tokens <= {"it", "there"} and FUNCTION_ID in c.edge.tag_ids),
     Categories(),
 )
 PRIMARY = CONSTRUCTIONS[0]
@@ -15,14 +15,18 @@ import sys
 from collections import defaultdict
 from itertools import repeat, groupby
 
+import base64
 import json
 import os
 import pickle
 import re
+import weakref
 import xml.etree.ElementTree as ET
 import xml.sax.saxutils
 from operator import attrgetter, itemgetter
 
+import numpy as np
+
 from ucca import textutil, core, layer0, layer1
 from ucca.layer1 import EdgeTags
 from ucca.normalization import attach_punct
@@ -359,8 +363,9 @@ def from_site(elem):
     pid = elem.find(SiteCfg.Paths.Main).get(SiteCfg.Attr.PassageID)
     passage = core.Passage(pid)
     elem2node = {}
-    _from_site_terminals(elem, passage, elem2node)
-    _from_site_annotation(elem, passage, elem2node)
+    with passage.bulk_build():
+        _from_site_terminals(elem, passage, elem2node)
+        _from_site_annotation(elem, passage, elem2node)
     return passage
 
 
@@ -477,7 +482,7 @@ def to_site(passage):
         ret = _fparent(node)
         if ret and ret.tag == layer1.NodeTags.Punctuation:
             ret = _fparent(ret)
-        if ret and ret in passage.layer(layer1.LAYER_ID).heads:
+        if ret and ret in passage.layer(layer1.LAYER_ID).heads_view:
             ret = None  # the parent is the fake FNodes head
         return ret
 
@@ -485,7 +490,7 @@ def to_site(passage):
 
     # The IDs are used to check whether a parent should be real or a chunk
     # of a larger unit -- in the latter case we need the new ID
-    split_ids = [ID for ID, node in passage.nodes.items()
+    split_ids = [ID for ID, node in passage.nodes_view.items()
                  if node.tag == layer1.NodeTags.Foundational and
                  node.discontiguous]
     unit_groups = [_cunit(passage.by_id(ID), None) for ID in split_ids]
@@ -572,6 +577,21 @@ def to_site(passage):
     return root
 
 
+def _json_default(obj):
+    """Encodes NumPy arrays (e.g., the Layer0 doc matrices) in JSON as the base64 of their bytes."""
+    if isinstance(obj, np.ndarray):
+        return {"__ndarray__": base64.b64encode(np.ascontiguousarray(obj).tobytes()).decode("ascii"),
+                "dtype": obj.dtype.str, "shape": obj.shape}
+    raise TypeError("Object of type %s is not JSON serializable" % type(obj).__name__)
+
+
+def _json_object_hook(obj):
+    """Decodes NumPy arrays encoded by _json_default."""
+    if "__ndarray__" in obj:
+        return np.frombuffer(base64.b64decode(obj["__ndarray__"]), dtype=obj["dtype"]).reshape(obj["shape"]).copy()
+    return obj
+
+
 def to_standard(passage):
     """Converts a Passage object to a standard XML root element.
 
@@ -587,7 +607,8 @@ def to_standard(passage):
     # we don't need to escape the character - the serializer of the XML element
     # will do it (e.g. tostring())
     def _dumps(dic):
-        return {str(k): str(v) if type(v) in (str, bool) else json.dumps(v) for k, v in dic.items()}
+        return {str(k): str(v) if type(v) in (str, bool) else json.dumps(v, default=_json_default)
+                for k, v in dic.items()}
 
     # Utility to add an extra element if exists in the object
     def _add_extra(obj, elem):
@@ -634,7 +655,7 @@ def from_standard(root, extra_funcs=None):
 
     def _loads(x):
         try:
-            return False if x == "False" else x == "True" or json.loads(x)
+            return False if x == "False" else x == "True" or json.loads(x, object_hook=_json_object_hook)
         except JSONDecodeError:
             return x
 
@@ -660,34 +681,35 @@ def from_standard(root, extra_funcs=None):
                 obj.extra[k] = (extra_funcs or {}).get(k, _loads)(v)
 
     passage = core.Passage(root.get('passageID'), attrib=_get_attrib(root))
-    _add_extra(passage, root)
-    edge_elems = []
-    for layer_elem in root.findall('layer'):
-        layer_id = int(layer_elem.get('layerID'))
-        layer = layer_objs[layer_id](passage, attrib=_get_attrib(layer_elem))
-        _add_extra(layer, layer_elem)
-        # some nodes are created automatically, skip creating them when found
-        # in the XML (they should have 'constant' IDs) but take their edges
-        # and attributes/extra from the XML (may have changed from the default)
-        created_nodes = {x.ID: x for x in layer.all}
-        for node_elem in layer_elem.findall('node'):
-            node_id = tuple(map(int,node_elem.get('ID').split(".")))
-            tag = node_elem.get('type')
-            node = created_nodes.get(node_id)
-            if node is None:
-                node = node_objs[tag](root=passage, ID=node_id, tag=tag, attrib=_get_attrib(node_elem))
-            else:
-                for key, value in _get_attrib(node_elem).items():
-                    node.attrib[key] = value
-            _add_extra(node, node_elem)
-            edge_elems += [(node, x) for x in node_elem.findall('edge')]
-
-    # Adding edges (must have all nodes before doing so)
-    for from_node, edge_elem in edge_elems:
-        to_node = passage.nodes[tuple(map(int,edge_elem.get('toID').split(".")))]
-        tag = edge_elem.get('type')
-        edge = from_node.add(tag, to_node, edge_attrib=_get_attrib(edge_elem))
-        _add_extra(edge, edge_elem)
+    with passage.bulk_build():
+        _add_extra(passage, root)
+        edge_elems = []
+        for layer_elem in root.findall('layer'):
+            layer_id = int(layer_elem.get('layerID'))
+            layer = layer_objs[layer_id](passage, attrib=_get_attrib(layer_elem))
+            _add_extra(layer, layer_elem)
+            # some nodes are created automatically, skip creating them when found
+            # in the XML (they should have 'constant' IDs) but take their edges
+            # and attributes/extra from the XML (may have changed from the default)
+            created_nodes = {x.ID: x for x in layer.all}
+            for node_elem in layer_elem.findall('node'):
+                node_id = tuple(map(int,node_elem.get('ID').split(".")))
+                tag = node_elem.get('type')
+                node = created_nodes.get(node_id)
+                if node is None:
+                    node = node_objs[tag](root=passage, ID=node_id, tag=tag, attrib=_get_attrib(node_elem))
+                else:
+                    for key, value in _get_attrib(node_elem).items():
+                        node.attrib[key] = value
+                _add_extra(node, node_elem)
+                edge_elems += [(node, x) for x in node_elem.findall('edge')]
+
+        # Adding edges (must have all nodes before doing so)
+        for from_node, edge_elem in edge_elems:
+            to_node = passage.by_id(tuple(map(int, edge_elem.get('toID').split("."))))
+            tag = edge_elem.get('type')
+            edge = from_node.add(tag, to_node, edge_attrib=_get_attrib(edge_elem))
+            _add_extra(edge, edge_elem)
 
     return passage
 
@@ -723,8 +745,8 @@ def from_text(text, passage_id="1", tokenized=False, one_per_line=False, extra_f
                 l0 = layer0.Layer0(p)
                 layer1.Layer1(p)
                 paragraph = 1
-            for lex in textutil.get_tokenizer(tokenized, lang=lang)(line):
-                l0.add_terminal(text=lex.orth_, punct=lex.is_punct, paragraph=paragraph)
+            lexes = list(textutil.get_tokenizer(tokenized, lang=lang)(line))
+            l0.add_terminals([lex.orth_ for lex in lexes], [lex.is_punct for lex in lexes], len(lexes) * [paragraph])
             paragraph += 1
         if p and (not line or one_per_line):
             yield p
@@ -799,6 +821,121 @@ def to_sequence(passage):
         seq += ' '
 
 
+ARRAY_NODE_CLASSES = {
+    layer1.NodeTags.Foundational: layer1.FoundationalNode,
+    layer1.NodeTags.Punctuation: layer1.PunctNode,
+    layer1.NodeTags.Linkage: layer1.Linkage,
+}
+
+
+def from_arrays(texts, node_types, edges, paragraphs=None, passage_id="1"):
+    """Creates a Passage from arrays describing its nodes and edges, e.g., the output of a parser.
+
+    Nodes are referred to by index: the first len(texts) nodes are the Terminals, in order,
+    and the next one is the head (root) of layer 1, followed by the other layer 1 nodes.
+    Foundational nodes with no outgoing edges (except for the head) are marked implicit.
+    The arrays are validated, and the Passage is built in bulk, in linear time.
+
+    :param texts: the text of each Terminal
+    :param node_types: the tag of each node: layer0.NodeTags.Word or Punct for the Terminals,
+            and layer1.NodeTags.Foundational, Punctuation or Linkage for the layer 1 nodes
+            (the head must be Foundational)
+    :param edges: (parent, child, tag, remote) of each Edge, where parent and child are node indices,
+            tag is the Edge tag and remote is whether it is a remote Edge
+    :param paragraphs: the paragraph number of each Terminal, all 1 by default
+    :param passage_id: ID of the Passage
+
+    :return: a new Passage object
+    :raise ValueError: if the arrays do not describe a valid UCCA graph: inconsistent lengths, unknown node
+            types, edges out of Foundational nodes into Linkages or the head, Punctuation or Linkage nodes
+            with the wrong children, or layer 1 nodes (other than Linkages) which are not reachable from the
+            head by exactly one primary path
+
+    """
+    num_terminals = len(texts)
+    head = num_terminals
+    if len(node_types) <= head:
+        raise ValueError("Expected %d Terminals and a layer 1 head, got %d node types" % (head, len(node_types)))
+    if paragraphs is None:
+        paragraphs = repeat(1)
+    elif len(paragraphs) != num_terminals:
+        raise ValueError("Expected %d paragraph numbers, got %d" % (num_terminals, len(paragraphs)))
+    for i, tag in enumerate(node_types):
+        if tag not in ((layer0.NodeTags.Word, layer0.NodeTags.Punct) if i < head else ARRAY_NODE_CLASSES):
+            raise ValueError("Invalid type for node %d: %s" % (i, tag))
+    if node_types[head] != layer1.NodeTags.Foundational:
+        raise ValueError("The layer 1 head must be %s, got %s" % (layer1.NodeTags.Foundational, node_types[head]))
+    edges = [(int(parent), int(child), tag, bool(remote)) for parent, child, tag, remote in edges]
+    primary_parent = [-1] * len(node_types)
+    has_children = [False] * len(node_types)
+    for parent, child, tag, remote in edges:
+        if not (head <= parent < len(node_types) and 0 <= child < len(node_types)) or child == head:
+            raise ValueError("Invalid edge %s: %d -> %d" % (tag, parent, child))
+        parent_type, child_type = node_types[parent], node_types[child]
+        if child_type == layer1.NodeTags.Linkage or \
+                parent_type == layer1.NodeTags.Punctuation and child >= head or \
+                parent_type == layer1.NodeTags.Linkage and child_type != layer1.NodeTags.Foundational:
+            raise ValueError("Invalid edge %s from %s to %s: %d -> %d" % (tag, parent_type, child_type, parent, child))
+        if not remote and parent_type != layer1.NodeTags.Linkage:
+            if primary_parent[child] >= 0:
+                raise ValueError("Node %d has multiple primary parents: %d, %d" %
+                                 (child, primary_parent[child], parent))
+            primary_parent[child] = parent
+        has_children[parent] = True
+    reaches_head = [None] * len(node_types)  # None: not visited, False: on the current path, True: reaches the head
+    reaches_head[head] = True
+    for i in range(head + 1, len(node_types)):
+        if node_types[i] == layer1.NodeTags.Linkage:
+            continue
+        path = []
+        while reaches_head[i] is None:
+            reaches_head[i] = False
+            path.append(i)
+            i = primary_parent[i]
+            if i < 0:
+                raise ValueError("Node %d has no primary parent" % path[-1])
+        if not reaches_head[i]:
+            raise ValueError("Cycle of primary edges through node %d" % i)
+        for j in path:
+            reaches_head[j] = True
+
+    passage = core.Passage(passage_id)
+    with passage.bulk_build():
+        l0 = layer0.Layer0(passage)
+        l1 = layer1.Layer1(passage)
+        nodes = l0.add_terminals(texts, [tag == layer0.NodeTags.Punct for tag in node_types[:head]],
+                                 [int(paragraph) for paragraph, _ in zip(paragraphs, texts)])
+        nodes.append(l1.heads[0])
+        for i in range(head + 1, len(node_types)):
+            tag = node_types[i]
+            nodes.append(ARRAY_NODE_CLASSES[tag](
+                ID=(layer1.LAYER_ID, i - head + 1), root=passage, tag=tag,
+                attrib={"implicit": True} if tag == layer1.NodeTags.Foundational and not has_children[i] else None))
+        for parent, child, tag, remote in edges:
+            nodes[parent].add_multiple([(tag,)], nodes[child], edge_attrib={"remote": True} if remote else None)
+    return passage
+
+
+def to_arrays(passage):
+    """Converts a Passage to arrays describing its nodes and edges, the inverse of :func:`from_arrays`.
+
+    Only the annotation graph of layers 0 and 1 is kept: node attributes other than the Terminal text and
+    paragraph and the implicit flag, extra data, and categories other than the first of each Edge are lost.
+
+    :param passage: the Passage object to convert
+
+    :return: tuple of (texts, node_types, edges, paragraphs), to be passed to from_arrays
+    """
+    terminals = passage.layer(layer0.LAYER_ID).all
+    l1 = passage.layer(layer1.LAYER_ID)
+    head = l1.heads[0]
+    nodes = list(terminals) + [head] + [node for node in l1.all if node is not head]
+    index = {id(node): i for i, node in enumerate(nodes)}
+    edges = [(i, index[id(edge.child)], edge.tag, bool(edge.attrib.get("remote")))
+             for i, node in enumerate(nodes) for edge in node if id(edge.child) in index]
+    return [t.text for t in terminals], [node.tag for node in nodes], edges, [t.paragraph for t in terminals]
+
+
 UNANALYZABLE = "Unanalyzable"
 UNCERTAIN = "Uncertain"
 IGNORED_CATEGORIES = {UNANALYZABLE, UNCERTAIN}
@@ -847,83 +984,85 @@ def from_json(lines, *args, skip_category_mapping=False, by_external_id=False, *
         passage_id = external_id
     passage = core.Passage(str(passage_id), attrib=attrib)
 
-    # Create terminals
-    l0 = layer0.Layer0(passage)
-    token_id_to_terminal = {token["id"]: l0.add_terminal(
-        text=token["text"], punct=not token["require_annotation"], paragraph=1)
-        for token in sorted(d["tokens"], key=itemgetter("index_in_task"))}
-
-    # Create non-terminals
-    l1 = layer1.Layer1(passage)
-    tree_id_to_node = {}
-    token_id_to_preterminal = {}
-    category_id_to_name = {c["id"]: c["name"] for c in d["project"]["layer"]["categories"]}
-    category_name_to_edge_tag = {} if skip_category_mapping else EdgeTags.__dict__
-    # Assuming topological sort: parents always appear before children
-    for unit in sorted(d["annotation_units"], key=itemgetter("is_remote_copy")):  # Get non-remotes first
-        tree_id = unit["tree_id"]
-        remote = unit["is_remote_copy"]
-        cloned_from_tree_id = None
-        if remote:
-            cloned_from_tree_id = unit.get("cloned_from_tree_id")
-            if cloned_from_tree_id is None:
-                raise ValueError("Remote unit %s without cloned_from_tree_id" % tree_id)
-        elif tree_id in tree_id_to_node:
-            raise ValueError("Unit %s is repeated" % tree_id)
-        parent_tree_id = unit["parent_tree_id"]
-        if parent_tree_id is None:  # Root node: no need to create
-            tree_id_to_node[tree_id] = None
-            continue
-        try:
-            parent_node = tree_id_to_node[parent_tree_id]
-        except KeyError as e:
-            raise ValueError("Unit %s appears before its parent, %s" % (tree_id, parent_tree_id)) from e
-
-        tags = []
-        for category in unit.get("categories", ()):
+    with passage.bulk_build():
+        # Create terminals
+        l0 = layer0.Layer0(passage)
+        tokens = sorted(d["tokens"], key=itemgetter("index_in_task"))
+        token_id_to_terminal = dict(zip(map(itemgetter("id"), tokens), l0.add_terminals(
+            [token["text"] for token in tokens], [not token["require_annotation"] for token in tokens])))
+
+        # Create non-terminals
+        l1 = layer1.Layer1(passage)
+        tree_id_to_node = {}
+        token_id_to_preterminal = {}
+        category_id_to_name = {c["id"]: c["name"] for c in d["project"]["layer"]["categories"]}
+        category_name_to_edge_tag = {} if skip_category_mapping else EdgeTags.__dict__
+        # Assuming topological sort: parents always appear before children
+        for unit in sorted(d["annotation_units"], key=itemgetter("is_remote_copy")):  # Get non-remotes first
+            tree_id = unit["tree_id"]
+            remote = unit["is_remote_copy"]
+            cloned_from_tree_id = None
+            if remote:
+                cloned_from_tree_id = unit.get("cloned_from_tree_id")
+                if cloned_from_tree_id is None:
+                    raise ValueError("Remote unit %s without cloned_from_tree_id" % tree_id)
+            elif tree_id in tree_id_to_node:
+                raise ValueError("Unit %s is repeated" % tree_id)
+            parent_tree_id = unit["parent_tree_id"]
+            if parent_tree_id is None:  # Root node: no need to create
+                tree_id_to_node[tree_id] = None
+                continue
             try:
-                category_name = category.get("name") or category_id_to_name[category["id"]]
+                parent_node = tree_id_to_node[parent_tree_id]
             except KeyError as e:
-                raise ValueError("Category missing from layer: " + category["id"]) from e
-            tag = category_name_to_edge_tag.get(category_name.replace(" ", ""), category_name)
-            tags.append(tag)
-
-        if not tags:
-            raise ValueError("Unit %s has no categories" % tree_id)
+                raise ValueError("Unit %s appears before its parent, %s" % (tree_id, parent_tree_id)) from e
 
-        for tag in tags:
-            if tag in IGNORED_ABBREVIATIONS:
-                continue
-            children_tokens = [] if unit["type"] == "IMPLICIT" else unit["children_tokens"]
-            try:
-                terminal = token_id_to_terminal[children_tokens[0]["id"]] if len(children_tokens) == 1 else None
-            except (IndexError, KeyError):
-                terminal = None
-            if remote:
+            tags = []
+            for category in unit.get("categories", ()):
                 try:
-                    node = tree_id_to_node[cloned_from_tree_id]
+                    category_name = category.get("name") or category_id_to_name[category["id"]]
                 except KeyError as e:
-                    raise ValueError("Remote copy %s refers to nonexistent unit: %s" %
-                                     (tree_id, cloned_from_tree_id)) from e
-                l1.add_remote(parent_node, tag, node)
-            elif not skip_category_mapping and terminal and layer0.is_punct(terminal):
-                tree_id_to_node[tree_id] = l1.add_punct(None, terminal)
-            elif tree_id not in tree_id_to_node:
-                node = tree_id_to_node[tree_id] = l1.add_fnode(parent_node, tag, implicit=(unit["type"] == "IMPLICIT"))
-                node.extra['tree_id'] = tree_id
-                comment = unit.get("comment")
-                node.extra["all_tags"] = ';'.join(tags)
-                if comment:
-                    node.extra['remarks'] = comment
-                for token in children_tokens:
-                    token_id_to_preterminal[token["id"]] = node
-            # currently only supports one non-ignored category, TODO: fix it
-
-    # Attach terminals to non-terminals
-    for token_id, node in token_id_to_preterminal.items():
-        terminal = token_id_to_terminal[token_id]
-        if skip_category_mapping or not layer0.is_punct(terminal):
-            node.add(EdgeTags.Terminal, terminal)
+                    raise ValueError("Category missing from layer: " + category["id"]) from e
+                tag = category_name_to_edge_tag.get(category_name.replace(" ", ""), category_name)
+                tags.append(tag)
+
+            if not tags:
+                raise ValueError("Unit %s has no categories" % tree_id)
+
+            for tag in tags:
+                if tag in IGNORED_ABBREVIATIONS:
+                    continue
+                children_tokens = [] if unit["type"] == "IMPLICIT" else unit["children_tokens"]
+                try:
+                    terminal = token_id_to_terminal[children_tokens[0]["id"]] if len(children_tokens) == 1 else None
+                except (IndexError, KeyError):
+                    terminal = None
+                if remote:
+                    try:
+                        node = tree_id_to_node[cloned_from_tree_id]
+                    except KeyError as e:
+                        raise ValueError("Remote copy %s refers to nonexistent unit: %s" %
+                                         (tree_id, cloned_from_tree_id)) from e
+                    l1.add_remote(parent_node, tag, node)
+                elif not skip_category_mapping and terminal and layer0.is_punct(terminal):
+                    tree_id_to_node[tree_id] = l1.add_punct(None, terminal)
+                elif tree_id not in tree_id_to_node:
+                    node = tree_id_to_node[tree_id] = l1.add_fnode(parent_node, tag,
+                                                                   implicit=(unit["type"] == "IMPLICIT"))
+                    node.extra['tree_id'] = tree_id
+                    comment = unit.get("comment")
+                    node.extra["all_tags"] = ';'.join(tags)
+                    if comment:
+                        node.extra['remarks'] = comment
+                    for token in children_tokens:
+                        token_id_to_preterminal[token["id"]] = node
+                # currently only supports one non-ignored category, TODO: fix it
+
+        # Attach terminals to non-terminals
+        for token_id, node in token_id_to_preterminal.items():
+            terminal = token_id_to_terminal[token_id]
+            if skip_category_mapping or not layer0.is_punct(terminal):
+                node.add(EdgeTags.Terminal, terminal)
 
     return passage
 
@@ -948,16 +1087,13 @@ def to_json(passage, *args, return_dict=False, tok_task=None, all_categories=Non
     terminals = sorted(passage.layer(layer0.LAYER_ID).all, key=attrgetter("position"))
     if tok_task is True or tok_task is None:  # Necessary because bool(tok_task) == True also if a task dict is given
         tokens = []
-        start_index = 0
-        for terminal in terminals:
-            end_index = start_index + len(terminal.text)
-            token = dict(text=terminal.text, start_index=start_index, end_index=end_index,
+        for terminal, start_index, end_index in zip(terminals, *passage.layer(layer0.LAYER_ID).char_offsets()):
+            token = dict(text=terminal.text, start_index=int(start_index), end_index=int(end_index),
                          index_in_task=terminal.position - 1,
                          require_annotation=not layer0.is_punct(terminal))
             if tok_task is None:  # When doing tokenization as a task, no need to fill the IDs (done by the server)
                 token["id"] = terminal_id_to_token_id[terminal.ID] = terminal.position
             tokens.append(token)
-            start_index = end_index + 1
     else:
         tokens = sorted(tok_task["tokens"], key=itemgetter("start_index"))
         if len(tokens) != len(terminals):
@@ -1100,8 +1236,6 @@ def passage2file(passage, filename, indent=True, binary=False):
             pickle.dump(passage, h)
     else:  # xml
         root = to_standard(passage)
-        import IPython;
-        IPython.embed()
         xml_string = ET.tostring(root).decode()
         output = textutil.indent_xml(xml_string) if indent else xml_string
         with open(filename, "w", encoding="utf-8") as h:
@@ -1146,38 +1280,233 @@ def split_passage(passage, ends, remarks=False, ids=None, suffix_format="%03d",
         if start == end:
             continue
         other = core.Passage(ID=index or ("%s" + suffix_format) % (passage.ID, i), attrib=passage.attrib.copy())
-        other.extra = passage.extra.copy()
-        # Create terminals and find layer 1 nodes to be included
-        l0 = passage.layer(layer0.LAYER_ID)
-        other_l0 = layer0.Layer0(root=other, attrib=l0.attrib.copy())
-        other_l0.extra = l0.extra.copy()
-        level = set()
-        nodes = set()
-        id_to_other = {}
-        paragraphs = set()
-        for terminal in l0.all[start:end]:
-            other_terminal = other_l0.add_terminal(terminal.text, terminal.punct, 1)
-            _copy_extra(terminal, other_terminal, remarks)
-            other_terminal.extra["orig_paragraph"] = terminal.paragraph
-            paragraphs.add(terminal.paragraph)
-            id_to_other[terminal.ID] = other_terminal
-            level.update(terminal.parents)
-            nodes.add(terminal)
-        while level:
-            nodes.update(level)
-            level = set(e.parent for n in level for e in n.incoming if not e.attrib.get("remote") and
-                        e.tag != layer1.EdgeTags.Punctuation and e.parent not in nodes)
-
-        other_l1 = layer1.Layer1(root=other, attrib=passage.layer(layer1.LAYER_ID).attrib.copy())
-        _copy_l1_nodes(passage, other, id_to_other, nodes, remarks=remarks)
-        attach_punct(other_l0, other_l1)
-        for j, paragraph in enumerate(paragraphs, start=1):
-            other_l0.doc(j)[:] = l0.doc(paragraph)
+        with other.bulk_build():
+            other.extra = passage.extra.copy()
+            # Create terminals and find layer 1 nodes to be included
+            l0 = passage.layer(layer0.LAYER_ID)
+            other_l0 = layer0.Layer0(root=other, attrib=l0.attrib.copy())
+            other_l0.extra = l0.extra.copy()
+            terminals, nodes = _span_nodes(passage, start, end)
+            id_to_other = {}
+            paragraphs = set()
+            other_terminals = other_l0.add_terminals([t.text for t in terminals], [t.punct for t in terminals])
+            for terminal, other_terminal in zip(terminals, other_terminals):
+                _copy_extra(terminal, other_terminal, remarks)
+                other_terminal.extra["orig_paragraph"] = terminal.paragraph
+                paragraphs.add(terminal.paragraph)
+                id_to_other[terminal.ID] = other_terminal
+
+            other_l1 = layer1.Layer1(root=other, attrib=passage.layer(layer1.LAYER_ID).attrib.copy())
+            _copy_l1_nodes(passage, other, id_to_other, nodes, remarks=remarks)
+            attach_punct(other_l0, other_l1)
+            for j, paragraph in enumerate(paragraphs, start=1):
+                other_l0.set_doc(j, l0.doc(paragraph))
         other.frozen = passage.frozen
         passages.append(other)
     return passages
 
 
+def _span_nodes(passage, start, end):
+    """
+    Find the nodes to include in a sub-passage spanning a range of terminals (see split_passage)
+    :param passage: passage to take the nodes from
+    :param start: index of the first terminal in the range
+    :param end: index after the last terminal in the range
+    :return: list of the terminals in the range, and set of them and their ancestors by primary non-punctuation edges
+    """
+    terminals = passage.layer(layer0.LAYER_ID).all_view[start:end]
+    nodes = set(terminals)
+    level = set(p for terminal in terminals for p in terminal.parents)
+    while level:
+        nodes.update(level)
+        level = set(e.parent for n in level for e in n.incoming if not e.attrib.get("remote") and
+                    e.tag != layer1.EdgeTags.Punctuation and e.parent not in nodes)
+    return terminals, nodes
+
+
+_UNANCHORED_CHILDREN = weakref.WeakKeyDictionary()  # Passage -> (version, {node: list of unanchored children})
+
+
+def _unanchored_children(passage):
+    """
+    Find the unanchored children (see _unanchored) of all layer 1 nodes, once per version of the passage
+    :param passage: passage to take the nodes from
+    :return: dict from each layer 1 node with unanchored children to the list of them
+    """
+    version, children = _UNANCHORED_CHILDREN.get(passage, (None, None))
+    if version != passage.version:
+        memo = {}
+        children = {}
+        for node in passage.layer(layer1.LAYER_ID).all:
+            unanchored = [child for child in node.children if _unanchored(child, memo)]
+            if unanchored:
+                children[node] = unanchored
+        _UNANCHORED_CHILDREN[passage] = passage.version, children
+    return children
+
+
+class PassageView:
+    """Read-only view of the part of a Passage spanning a range of terminals, without copying it.
+
+    The view includes the same nodes as the sub-passage created by split_passage for the range: the terminals,
+    their ancestors by primary edges (not by punctuation edges), implicit units under included units, and linkages
+    whose relation and arguments are all included. Units crossing the range boundary only keep their edges to
+    included nodes. As the view does not create nodes, its boundary handling differs from split_passage in that:
+
+    - a remote edge to a unit outside the range is left out, where split_passage adds an implicit unit instead;
+    - an implicit unit whose primary parent is outside the range, but which is the remote child of an included
+      unit, stays a remote child, where split_passage makes its copy a primary child instead;
+    - punctuation whose parent is outside the range is left with no parent, where split_passage re-attaches it
+      to its nearest unit.
+
+    Creating a view takes time proportional to the number of nodes it includes, after a pass over the whole
+    passage which is done once until the passage is modified.
+
+    The view refers to the nodes and edges of the passage. Using it after the passage is modified raises
+    core.StaleViewError.
+
+    Attributes:
+        passage: the Passage viewed
+        ID: the ID of the Passage
+        start, end: the range of terminals, as in passage.layer(layer0.LAYER_ID).all[start:end]
+        layers: views of all the Layers of the Passage, with the included nodes
+
+    """
+
+    def __init__(self, passage, start, end):
+        self.passage = passage
+        self.start = start
+        self.end = end
+        self._version = passage.version
+        self._terminals, include = _span_nodes(passage, start, end)
+        self._nodes = {n for n in include if n.tag != layer1.NodeTags.Linkage}
+        queue = [n for n in self._nodes if n.layer.ID == layer1.LAYER_ID]
+        linkages = set()
+        unanchored = _unanchored_children(passage)  # so that nodes spanning beyond the range cost O(1)
+        while queue:  # implicit units under included units, and linkages, as in _copy_l1_nodes
+            node = queue.pop()
+            linkages.update(e.parent for e in node.incoming if e.parent.tag == layer1.NodeTags.Linkage)
+            for child in unanchored.get(node, ()):
+                if child not in self._nodes:
+                    self._nodes.add(child)
+                    queue.append(child)
+        self._nodes.update(linkage for linkage in linkages if include.issuperset(linkage.children))
+        by_layer = defaultdict(list)
+        for node in self._nodes:
+            by_layer[node.layer.ID].append(node)
+        self._layers = {layer.ID: _LayerView(self, layer, by_layer[layer.ID]) for layer in passage.layers}
+
+    def _check(self):
+        if self.passage.version != self._version:
+            raise core.StaleViewError(self.passage.ID)
+
+    @property
+    def ID(self):
+        return self.passage.ID
+
+    @property
+    def layers(self):
+        self._check()
+        return self._layers.values()
+
+    def layer(self, ID):
+        """Returns the view of the Layer whose ID is given.
+
+        :raise KeyError: if no Layer with this ID is present
+        """
+        self._check()
+        return self._layers[ID]
+
+    def by_id(self, ID):
+        """Returns the included node whose ID is given.
+
+        :raise KeyError: if no node with this ID is included
+        """
+        self._check()
+        node = self.passage.by_id(ID)
+        if node not in self._nodes:
+            raise KeyError(ID)
+        return node
+
+    def __contains__(self, node):
+        self._check()
+        return node in self._nodes
+
+    def outgoing(self, node):
+        """Returns the outgoing edges of a node which lead to included nodes."""
+        self._check()
+        return [edge for edge in node if edge.child in self._nodes]
+
+    def incoming(self, node):
+        """Returns the incoming edges of a node which come from included nodes."""
+        self._check()
+        return [edge for edge in node.incoming if edge.parent in self._nodes]
+
+    def children(self, node):
+        return [edge.child for edge in self.outgoing(node)]
+
+    def parents(self, node):
+        return [edge.parent for edge in self.incoming(node)]
+
+    def get_terminals(self, node=None, punct=True, remotes=False):
+        """Returns the included terminals under a node, like FoundationalNode.get_terminals.
+
+        :param node: the node to take the terminals of, or None for all terminals in the range
+        :param punct: whether to include punctuation terminals, defaults to True
+        :param remotes: whether to include terminals under remote edges, defaults to False
+        :return: a list of layer0.Terminal objects, ordered by position
+        """
+        self._check()
+        if node is None:
+            return [t for t in self._terminals if punct or not t.punct]
+        terminals = []
+        visited = {node}
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.layer.ID == layer0.LAYER_ID:
+                if punct or not node.punct:
+                    terminals.append(node)
+                continue
+            if not punct and node.tag == layer1.NodeTags.Punctuation:
+                continue
+            for edge in node:
+                if edge.child in self._nodes and edge.child not in visited and (
+                        remotes or not edge.attrib.get("remote")):
+                    visited.add(edge.child)
+                    stack.append(edge.child)
+        return sorted(terminals, key=attrgetter("position"))
+
+
+class _LayerView:
+    """View of the nodes of a Layer which are included in a PassageView."""
+
+    def __init__(self, view, layer, nodes):
+        self._view = view
+        self._layer = layer
+        self._all = sorted(nodes, key=layer.orderkey)
+        self._heads = [node for node in self._all if not any(
+            edge.parent.layer is layer and edge.parent in view._nodes for edge in node.incoming)]
+
+    @property
+    def ID(self):
+        return self._layer.ID
+
+    @property
+    def root(self):
+        return self._view
+
+    @property
+    def all(self):
+        self._view._check()
+        return self._all[:]
+
+    @property
+    def heads(self):
+        self._view._check()
+        return self._heads[:]
+
+
 def join_passages(passages, passage_id=None, remarks=False):
     """
     Join passages to one passage with all the nodes in order
@@ -1189,29 +1518,33 @@ def join_passages(passages, passage_id=None, remarks=False):
     if not passages:
         raise ValueError("Cannot join empty list of passages")
     other = core.Passage(ID=passage_id or passages[0].ID, attrib=passages[0].attrib.copy())
-    other.extra = passages[0].extra.copy()
-    l0 = passages[0].layer(layer0.LAYER_ID)
-    l1 = passages[0].layer(layer1.LAYER_ID)
-    other_l0 = layer0.Layer0(root=other, attrib=l0.attrib.copy())
-    layer1.Layer1(root=other, attrib=l1.attrib.copy())
-    id_to_other = {}
-    paragraph = 0
-    for passage in passages:
-        l0 = passage.layer(layer0.LAYER_ID)
-        paragraphs = set()
-        for terminal in l0.all:
-            if terminal.para_pos == 1:
-                paragraph += 1
-            orig_paragraph = terminal.extra.get("orig_paragraph")
-            if orig_paragraph is not None:
-                paragraph = orig_paragraph
-            paragraphs.add(paragraph)
-            other_terminal = other_l0.add_terminal(terminal.text, terminal.punct, paragraph)
-            _copy_extra(terminal, other_terminal, remarks)
-            id_to_other[terminal.ID] = other_terminal
-        for paragraph in paragraphs:
-            other_l0.doc(paragraph).extend(l0.doc(1))
-        _copy_l1_nodes(passage, other, id_to_other, remarks=remarks)
+    with other.bulk_build():
+        other.extra = passages[0].extra.copy()
+        l0 = passages[0].layer(layer0.LAYER_ID)
+        l1 = passages[0].layer(layer1.LAYER_ID)
+        other_l0 = layer0.Layer0(root=other, attrib=l0.attrib.copy())
+        layer1.Layer1(root=other, attrib=l1.attrib.copy())
+        id_to_other = {}
+        paragraph = 0
+        for passage in passages:
+            l0 = passage.layer(layer0.LAYER_ID)
+            terminal_paragraphs = []
+            for terminal in l0.all:
+                if terminal.para_pos == 1:
+                    paragraph += 1
+                orig_paragraph = terminal.extra.get("orig_paragraph")
+                if orig_paragraph is not None:
+                    paragraph = orig_paragraph
+                terminal_paragraphs.append(paragraph)
+            paragraphs = set(terminal_paragraphs)
+            other_terminals = other_l0.add_terminals([t.text for t in l0.all], [t.punct for t in l0.all],
+                                                     terminal_paragraphs)
+            for terminal, other_terminal in zip(l0.all, other_terminals):
+                _copy_extra(terminal, other_terminal, remarks)
+                id_to_other[terminal.ID] = other_terminal
+            for paragraph in paragraphs:
+                other_l0.set_doc(paragraph, [*other_l0.doc(paragraph), *l0.doc(1)])
+            _copy_l1_nodes(passage, other, id_to_other, remarks=remarks)
     return other
 
 
@@ -1226,6 +1559,7 @@ def _copy_l1_nodes(passage, other, id_to_other, include=None, remarks=False):
     """
     l1 = passage.layer(layer1.LAYER_ID)
     other_l1 = other.layer(layer1.LAYER_ID)
+    other_head = other_l1.heads[0]
     queue = [(n, None) for n in l1.heads]
     linkages = []
     remotes = []
@@ -1238,7 +1572,7 @@ def _copy_l1_nodes(passage, other, id_to_other, include=None, remarks=False):
             continue
         if other_node is None:
             heads.append(node)
-            other_node = other_l1.heads[0]
+            other_node = other_head
         for edge in node:
             is_remote = edge.attrib.get("remote", False)
             if include is None or edge.child in include or _unanchored(edge.child):
@@ -1285,12 +1619,24 @@ def _copy_extra(node, other, remarks=False):
         other.extra["remarks"] = node.ID
 
 
-def _unanchored(n):
+def _unanchored(n, memo=None):
+    """
+    Whether a node has no terminals under it by primary edges, but is or has implicit units under it
+    :param n: node to check
+    :param memo: optional dict from nodes already checked to the result, updated with the nodes checked
+    """
+    if memo is not None and n in memo:
+        return memo[n]
     unanchored_children = False
+    anchored = False
     for e in n:
         if not e.attrib.get("remote"):
-            if _unanchored(e.child):
+            if _unanchored(e.child, memo):
                 unanchored_children = True
             else:
-                return False
-    return n.attrib.get("implicit") or unanchored_children
+                anchored = True
+                break
+    result = not anchored and bool(n.attrib.get("implicit") or unanchored_children)
+    if memo is not None:
+        memo[n] = result
+    return result
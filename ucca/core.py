@@ -8,7 +8,14 @@ are connected between themselves and to Nodes in other layers using
 
 """
 
+import bisect
 import functools
+import inspect
+from collections import abc
+from contextlib import contextmanager
+from types import MappingProxyType
+
+from ucca import traversal
 
 # Max number of digits allowed for a unique ID
 UNIQUE_ID_MAX_DIGITS = 5
@@ -75,6 +82,11 @@ class MissingNodeError(UCCAError):
     pass
 
 
+class StaleViewError(UCCAError):
+    """Exception raised when using a view of a :class:`Passage` which was modified since the view was created."""
+    pass
+
+
 class UnimplementedMethodError(UCCAError):
     """Exception raised when trying to call a not-yet-implemented method."""
     pass
@@ -87,7 +99,8 @@ class ModifyPassage:
     a :class:`Passage` to change by adding or removing an element, or changing
     an attribute.
 
-    It validates that the Passage is not frozen before allowing the change.
+    It validates that the Passage is not frozen before allowing the change,
+    unless the Passage is in bulk-build mode (see :meth:`Passage.bulk_build`).
 
     The decorator can't be used for __init__ calls, as at the stage of the
     check there are no instance attributes to check. So in such cases,
@@ -118,14 +131,366 @@ class ModifyPassage:
         :raise FrozenPassageError: if the :class:`Passage` is frozen and can't be
                 modified.
         """
+        root = args[0].root
+        if root.frozen and not root._bulk:
+            raise FrozenPassageError(root.ID)
+        return self.fn(*args, **kwargs)
+
+
+def _hashable(value):
+    """Returns the value if it is hashable, otherwise its representation."""
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _edge_filter(ignore_node=None, ignore_edge=None):
+    """Returns an edge filter (see :mod:`ucca.traversal`) from equality ignore functions, or None if both are None."""
+    if ignore_node is None and ignore_edge is None:
+        return None
+    return lambda edge: (ignore_node is None or not ignore_node(edge.child)) and \
+        (ignore_edge is None or not ignore_edge(edge))
+
+
+def frozen_cached(fn):
+    """Decorator for memoizing derived data of a member of a :class:`Passage` while it is frozen.
+
+    The decorated method (or property getter) must depend only on the Passage
+    and its (hashable) arguments. While the Passage is frozen, its result is
+    computed once per member and arguments, and kept in the Passage until it
+    is unfrozen. Memoized results are shared between calls, so callers must
+    not modify them.
+
+    :param fn: method of an object with an attribute _root, which points to
+            the Passage it is part of.
+    :return: the decorated method.
+
+    """
+    # The check is on the hot path of unfrozen Passages too, so getters get a wrapper without argument packing
+    if fn.__code__.co_argcount == 1 and not fn.__code__.co_flags & (inspect.CO_VARARGS | inspect.CO_VARKEYWORDS):
+        @functools.wraps(fn)
+        def getter(self):
+            root = self._root
+            if root._frozen and not root._bulk:
+                return _frozen_cached_value(root, fn, self, (), {})
+            return fn(self)
+        return getter
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        root = self._root
+        if root._frozen and not root._bulk:
+            return _frozen_cached_value(root, fn, self, args, kwargs)
+        return fn(self, *args, **kwargs)
+    return wrapper
+
+
+def frozen_cached_list(fn):
+    """Like :func:`frozen_cached`, for methods (or property getters) returning a list.
+
+    The result is memoized as a tuple, and every call returns a new list of
+    it, so callers may modify it.
+
+    """
+    def to_tuple(self, *args, **kwargs):
+        return tuple(fn(self, *args, **kwargs))
+
+    if fn.__code__.co_argcount == 1 and not fn.__code__.co_flags & (inspect.CO_VARARGS | inspect.CO_VARKEYWORDS):
+        @functools.wraps(fn)
+        def getter(self):
+            root = self._root
+            if root._frozen and not root._bulk:
+                return list(_frozen_cached_value(root, to_tuple, self, (), {}))
+            return fn(self)
+        return getter
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        root = self._root
+        if root._frozen and not root._bulk:
+            return list(_frozen_cached_value(root, to_tuple, self, args, kwargs))
+        return fn(self, *args, **kwargs)
+    return wrapper
+
+
+def _frozen_cached_value(root, fn, obj, args, kwargs):
+    key = (fn, id(obj), args, tuple(kwargs.items()) if kwargs else ())
+    try:
+        return root._frozen_cache[key]
+    except KeyError:
+        value = root._frozen_cache[key] = fn(obj, *args, **kwargs)
+        return value
+
+
+def _structural_hashes(root, nodes, ordered=False, ignore_node=None, ignore_edge=None):
+    """Computes structural (Merkle) hashes for all Nodes under the given ones.
+
+    The hash of a Node combines its Node-equality key (tag and attributes)
+    with the keys of its outgoing Edges and the hashes of their children,
+    as an ordered tuple or as a sorted multiset (for unordered equality).
+    Hence, equal subgraphs have equal hashes, and each Node is hashed once.
+    If the Passage is frozen and nothing is ignored, the hashes of all its
+    Nodes are computed once and cached until it is unfrozen.
+
+    :param root: the Passage of the Nodes
+    :param nodes: the Nodes to start from
+    :param ordered: whether the order of outgoing Edges matters
+    :param ignore_node: function that returns whether to ignore a given node
+    :param ignore_edge: function that returns whether to ignore a given edge
+
+    :return: dictionary from id(node) to its hash
+
+    """
+    edge_filter = _edge_filter(ignore_node, ignore_edge)
+    if edge_filter is None and root.frozen:
+        key = ("structural_hashes", ordered)
+        hashes = root._frozen_cache.get(key)
+        if hashes is None:
+            nodes = [node for layer in root.layers for node in layer.all]
+            hashes = root._frozen_cache[key] = _compute_structural_hashes(nodes, ordered)
+        return hashes
+    return _compute_structural_hashes(nodes, ordered, edge_filter)
+
+
+def _compute_structural_hashes(nodes, ordered, edge_filter=None):
+    hashes = {}
+    for node in traversal.postorder(*nodes, edge_filter=edge_filter):
+        children = [hash((edge._structural_key(), hashes.get(id(edge.child), 0)))  # 0 closes a cycle
+                    for edge in node._outgoing if edge_filter is None or edge_filter(edge)]
+        if not ordered:
+            children.sort()
+        hashes[id(node)] = hash((node._structural_key(), tuple(children)))
+    return hashes
+
+
+def _edge_signature(edge, hashes):
+    """Returns a key which is equal for (recursively) Edge-equal Edges, given the structural hashes of children."""
+    return edge._structural_key(), hashes[id(edge.child)]
+
+
+def _missing_nodes(nodes, hashes, other_nodes, other_hashes):
+    """Returns the nodes with no Node-equal node in other_nodes, given the structural hashes of both."""
+    signatures = {other_hashes[id(node)] for node in other_nodes}
+    return sorted([node for node in nodes if hashes[id(node)] not in signatures], key=id_orderkey)
+
+
+def _missing_edges(edges, hashes, other_edges, other_hashes):
+    """Returns the edges with no Edge-equal edge in other_edges, given the structural hashes of their children."""
+    signatures = {_edge_signature(edge, other_hashes) for edge in other_edges}
+    return sorted([edge for edge in edges if _edge_signature(edge, hashes) not in signatures], key=edge_id_orderkey)
+
+
+def _verify_structure(pairs, hashes, other_hashes, ignore_node=None, ignore_edge=None):
+    """Verifies unordered Node-equality of pairs of Nodes with equal structural hashes.
+
+    Children are paired up by their Edge keys and hashes, so each pair of
+    Nodes is compared once and the verification takes linear time.
+
+    :param pairs: iterable of (node, other_node) pairs to verify
+    :param hashes: structural hashes of the Nodes under the first Nodes
+    :param other_hashes: structural hashes of the Nodes under the other Nodes
+    :param ignore_node: function that returns whether to ignore a given node
+    :param ignore_edge: function that returns whether to ignore a given edge
+
+    :return: True iff all pairs are recursively Node-equal
+
+    """
+    edge_filter = _edge_filter(ignore_node, ignore_edge)
+    stack = list(pairs)
+    verified = set()
+    while stack:
+        node, other = stack.pop()
+        if (id(node), id(other)) in verified:
+            continue
+        verified.add((id(node), id(other)))
+        if node._structural_key() != other._structural_key():
+            return False
+        candidates = {}
+        for edge in other._outgoing:
+            if edge_filter is None or edge_filter(edge):
+                candidates.setdefault(_edge_signature(edge, other_hashes), []).append(edge.child)
+        for edge in node._outgoing:
+            if edge_filter is None or edge_filter(edge):
+                children = candidates.get(_edge_signature(edge, hashes))
+                if not children:
+                    return False
+                stack.append((edge.child, children.pop()))
+        if any(candidates.values()):
+            return False
+    return True
+
+
+class _SortedList:
+    """List of UCCA elements which is kept ordered according to a key function.
+
+    Keys are computed once, when an element is inserted, and cached, so that
+    insertion and removal only require a binary search instead of re-sorting
+    the whole list. Elements with equal keys keep their insertion order, as
+    they would with a stable sort. Membership is tested by identity, in
+    constant time once the list is long enough to be worth indexing.
+    Storage is only allocated once the first element is added, as many lists
+    (e.g., the outgoing edges of terminals) stay empty.
+
+    If the key of an element may have changed (e.g., because it depends on
+    a tag), :meth:`rekey` should be called to re-position it.
+
+    Attributes:
+        key: the key function ordering the elements
+
+    """
+
+    __slots__ = ("_key", "_items", "_keys", "_index")
+
+    INDEX_MIN_LENGTH = 16  # shorter lists are scanned rather than indexed
+
+    def __init__(self, key, items=()):
+        self._key = key
+        self._items = self._keys = ()
+        self._index = None  # id(element) -> cached key, for long lists only
+        for item in items:
+            self.add(item)
+
+    @property
+    def key(self):
+        return self._key
+
+    def add(self, item):
+        """Inserts the element in its place according to its key."""
+        key = self._key(item)
+        if not self._keys:
+            self._items, self._keys = [item], [key]
+            return
+        if not key < self._keys[-1]:  # common case: append
+            self._keys.append(key)
+            self._items.append(item)
+        else:
+            i = bisect.bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._items.insert(i, item)
+        if self._index is not None:
+            self._index[id(item)] = key
+        elif len(self._items) >= self.INDEX_MIN_LENGTH:
+            self._index = {id(x): k for x, k in zip(self._items, self._keys)}
+
+    def extend(self, items):
+        """Inserts the elements, in linear time if they are ordered and come after the current ones."""
+        items = list(items)
+        keys = [self._key(item) for item in items]
+        if not keys:
+            return
+        if (self._keys and keys[0] < self._keys[-1]) or any(b < a for a, b in zip(keys, keys[1:])):
+            for item in items:
+                self.add(item)
+            return
+        if not self._keys:
+            self._items, self._keys = [], []
+        self._items.extend(items)
+        self._keys.extend(keys)
+        if self._index is not None:
+            self._index.update(zip(map(id, items), keys))
+        elif len(self._items) >= self.INDEX_MIN_LENGTH:
+            self._index = {id(x): k for x, k in zip(self._items, self._keys)}
+
+    def remove(self, item):
+        """Removes the element.
+
+        :raise ValueError: if the element is not in the list
+
+        """
+        i = self.index(item)
+        if self._index is not None:
+            del self._index[id(item)]
+        del self._keys[i]
+        del self._items[i]
+
+    def rekey(self, item):
+        """Re-positions the element if its key has changed (no-op if absent)."""
+        try:
+            i = self.index(item)
+        except ValueError:
+            return
+        if self._key(item) != self._keys[i]:
+            self.remove(item)
+            self.add(item)
+
+    def sort(self, key=None):
+        """Re-orders all elements, optionally by a new key function."""
+        if key is not None:
+            self._key = key
+        items = self._items
+        self._items = self._keys = ()
+        self._index = None
+        for item in sorted(items, key=self._key):
+            self.add(item)
+
+    def _clone(self, mapping):
+        """Returns a copy with every element x replaced by mapping[id(x)].
+
+        Elements missing from the mapping are left out. The cached keys are
+        reused rather than computed again, so they must not depend on the
+        identity of the elements (as IDs and tags do not).
+
+        """
+        other = _SortedList.__new__(_SortedList)
+        other._key = self._key
+        other._items = other._keys = ()
+        other._index = None
+        if not self._items:
+            return other
+        pairs = [(mapping[id(x)], key) for x, key in zip(self._items, self._keys) if id(x) in mapping]
+        if pairs:
+            other._items, other._keys = map(list, zip(*pairs))
+            if len(pairs) >= self.INDEX_MIN_LENGTH:
+                other._index = {id(x): key for x, key in pairs}
+        return other
+
+    def index(self, item):
+        if self._index is None:
+            for i, x in enumerate(self._items):
+                if x is item:
+                    return i
+            raise ValueError("%r not in list" % (item,))
+        try:
+            i = bisect.bisect_left(self._keys, self._index[id(item)])
+        except KeyError as e:
+            raise ValueError("%r not in list" % (item,)) from e
+        while self._items[i] is not item:
+            i += 1
+        return i
 
-        @functools.wraps(self.fn)
-        def decorated(*args, **kwargs):
-            if args[0].root.frozen:
-                raise FrozenPassageError(args[0].root.ID)
-            return self.fn(*args, **kwargs)
+    def __contains__(self, item):
+        if self._index is None:
+            return any(x is item for x in self._items)
+        return id(item) in self._index
 
-        return decorated(*args, **kwargs)
+    def __iter__(self):
+        return iter(self._items)
+
+    def __reversed__(self):
+        return reversed(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __repr__(self):
+        return repr(list(self._items))
+
+    def __getstate__(self):
+        return self._key, self._items, self._keys
+
+    def __setstate__(self, state):
+        self._key, self._items, self._keys = state
+        self._index = None
+        if len(self._items) >= self.INDEX_MIN_LENGTH:
+            self._index = {id(x): k for x, k in zip(self._items, self._keys)}
+
+
+_EMPTY_DICT = MappingProxyType({})  # shared by all elements with no attributes yet
 
 
 class _AttributeDict:
@@ -134,16 +499,22 @@ class _AttributeDict:
     This dictionary is used to store attributes which are part of any
     element in the UCCA annotation scheme. It's advantage over regular
     dictionary is adhering to :class:`Passage` frozen status and modification
-    decorators.
+    decorators. Most elements have no attributes, so the underlying dict is
+    only allocated on the first write. Copies may share their underlying
+    dict (see :meth:`Passage.copy`), in which case it is read-only and is
+    copied on the first write to any of them.
 
     Attributes:
+        owner: the element whose attributes these are
         root: the Passage this object is linked with
 
     """
 
-    def __init__(self, root, mapping=None):
-        self._root = root
-        self._dict = mapping.copy() if mapping is not None else dict()
+    __slots__ = ("_owner", "_dict")
+
+    def __init__(self, owner, mapping=None):
+        self._owner = owner
+        self._dict = mapping.copy() if mapping else _EMPTY_DICT
 
     def __getitem__(self, key):
         return self._dict[key]
@@ -163,24 +534,79 @@ class _AttributeDict:
 
         return omit_irrelevant(self._dict) == omit_irrelevant(other._dict)
 
+    def structural_key(self):
+        """Returns a hashable key which is equal for equal objects (see equals())."""
+        return tuple(sorted((k, _hashable(v)) for k, v in self._dict.items() if k not in IRRELEVANT_ATTRIBUTES))
+
+    @property
+    def owner(self):
+        return self._owner
+
     @property
     def root(self):
-        return self._root
+        return self._owner.root
 
     def copy(self):
         return self._dict.copy()
 
+    def _writable(self):
+        if type(self._dict) is MappingProxyType:  # empty or shared
+            self._dict = dict(self._dict)
+        return self._dict
+
+    def _clone(self, owner, share=False):
+        """Returns a copy of the attributes for another element.
+
+        :param owner: the element the copy belongs to (e.g., a copy of the owner)
+        :param share: whether to share the underlying dict (copy-on-write)
+            rather than copying it
+
+        """
+        other = _AttributeDict.__new__(_AttributeDict)
+        other._owner = owner
+        if not self._dict:
+            other._dict = _EMPTY_DICT
+        elif share:
+            if type(self._dict) is not MappingProxyType:
+                self._dict = MappingProxyType(self._dict)  # from now on, neither side writes to it in place
+            other._dict = self._dict
+        else:
+            other._dict = dict(self._dict)
+        return other
+
+    def __getstate__(self):
+        mapping = self._dict
+        if type(mapping) is MappingProxyType:
+            mapping = dict(mapping) or None
+        return self._owner, mapping
+
+    def __setstate__(self, state):
+        self._owner, mapping = state
+        self._dict = _EMPTY_DICT if mapping is None else mapping
+
+    def _record(self, key):
+        root = self._owner.root
+        root._version += 1  # attributes such as "remote" on Edges affect derived data (e.g., Layer1.spans)
+        journal = root._journal
+        if journal is not None:
+            journal._append(("attrib", self._owner, key, key in self._dict, self._dict.get(key)))
+
     @ModifyPassage
     def __setitem__(self, key, value):
-        self._dict[key] = value
+        self._record(key)
+        self._writable()[key] = value
 
     @ModifyPassage
     def update(self, values):
-        self._dict.update(values)
+        values = dict(values)
+        for key in values:
+            self._record(key)
+        self._writable().update(values)
 
     @ModifyPassage
     def __delitem__(self, key):
-        del self._dict[key]
+        self._record(key)
+        del self._writable()[key]
 
     def __len__(self):
         return len(self._dict)
@@ -189,42 +615,115 @@ class _AttributeDict:
         return self._dict.items()
 
 
+def _get_extra(self):
+    # The extra dict of elements with many instances is allocated on first use
+    if self._extra is None:
+        self._extra = {}
+    return self._extra
+
+
+def _set_extra(self, value):
+    self._extra = value
+
+
+# Per-process tables of interned tags and categories, so that Edges store small integers.
+# A category is a (tag, slot, layer, parent) tuple; its ID is its index in _CATEGORY_KEYS.
+_TAGS = []  # tag ID -> tag
+_TAG_IDS = {}  # tag -> tag ID
+_CATEGORY_KEYS = []  # category ID -> (tag, slot, layer, parent)
+_CATEGORY_IDS = {}  # (tag, slot, layer, parent) -> category ID
+_CATEGORY_TAG_IDS = []  # category ID -> tag ID
+
+
+def tag_id(tag):
+    """Returns the integer ID of a tag, which is the same for equal tags within the process.
+
+    Comparing tag IDs (e.g., :attr:`Edge.tag_id`) is equivalent to comparing tags.
+
+    """
+    ID = _TAG_IDS.get(tag)
+    if ID is None:
+        ID = _TAG_IDS[tag] = len(_TAGS)
+        _TAGS.append(tag)
+    return ID
+
+
+def tag_by_id(ID):
+    """Returns the tag with the given tag ID (see :func:`tag_id`)."""
+    return _TAGS[ID]
+
+
+def category_id(tag, slot="", layer="", parent=""):
+    """Returns the integer ID of a category, which is the same for equal categories within the process.
+
+    IDs depend on the order categories are first used in, so they should not be persisted.
+
+    """
+    key = (tag, slot or "", layer or "", parent or "")
+    ID = _CATEGORY_IDS.get(key)
+    if ID is None:
+        ID = _CATEGORY_IDS[key] = len(_CATEGORY_KEYS)
+        _CATEGORY_KEYS.append(key)
+        _CATEGORY_TAG_IDS.append(tag_id(tag))
+    return ID
+
+
+def category_key(ID):
+    """Returns the (tag, slot, layer, parent) tuple of the category with the given ID (see :func:`category_id`)."""
+    return _CATEGORY_KEYS[ID]
+
+
 class Category:
     """when considering refinement layers, each edge can have multiple tags sorted in a certain hierarchy.
     for this reason, a category must include not only the tag information but also the layer and hierarchy
     information.
+
+    Edges store only the IDs of their categories (see :func:`category_id`), so Categories are immutable
+    values: to modify the categories of an Edge, set :attr:`Edge.tag` or :attr:`Edge.categories`.
     """
 
+    __slots__ = ("_id",)
+
     def __init__(self, tag, slot=None, layer=None, parent=None):
-        self._tag = tag
-        self._slot = slot if slot else ""
-        self._layer = layer if layer else ""
-        self._parent = parent if parent else ""
-        self.extra = {}
+        self._id = category_id(tag, slot, layer, parent)
+
+    @classmethod
+    def _from_id(cls, ID):
+        category = cls.__new__(cls)
+        category._id = ID
+        return category
 
     @property
-    def tag(self):
-        return self._tag
+    def ID(self):
+        return self._id
 
-    @tag.setter
-    def tag(self, new_tag):
-        self._tag = new_tag
+    @property
+    def tag(self):
+        return _CATEGORY_KEYS[self._id][0]
 
     @property
     def slot(self):
-        return self._slot
+        return _CATEGORY_KEYS[self._id][1]
 
     @property
     def layer(self):
-        return self._layer
+        return _CATEGORY_KEYS[self._id][2]
 
     @property
     def parent(self):
-        return self._parent
+        return _CATEGORY_KEYS[self._id][3]
+
+    def __eq__(self, other):
+        return isinstance(other, Category) and self._id == other._id
 
-    @parent.setter
-    def parent(self, new_parent):
-        self._parent = new_parent
+    def __hash__(self):
+        return self._id
+
+    def __getstate__(self):
+        return _CATEGORY_KEYS[self._id]
+
+    def __setstate__(self, state):
+        self._id = category_id(*state)
 
     def to_xml(self):
         pass
@@ -248,6 +747,9 @@ class Edge:
         parent: the originating Node of the Edge
         child: the target Node of the Edge
         categories: a list of categories for this edge
+        category_ids: a tuple of the IDs of the categories (see :func:`category_id`)
+        tag_id: the ID of the tag (see :func:`tag_id`), for fast comparison
+        tag_ids: a tuple of the IDs of the tags of all categories
         ID_FORMAT: format string which creates the ID of the Edge from
             the IDs of the parent (first argument to the formatting string)
             and the child (second argument).
@@ -256,6 +758,8 @@ class Edge:
 
     ID_FORMAT = "{}->{}"
 
+    __slots__ = ("_root", "_parent", "_child", "_attrib", "_categories", "_extra")
+
     def __init__(self, root, parent, child, tag=None, attrib=None):
         """Creates a new :class:`Edge` object.
 
@@ -270,24 +774,63 @@ class Edge:
         self._root = root
         self._parent = parent
         self._child = child
-        self._attrib = _AttributeDict(root, attrib)
-        self._categories = [Category(tag)] if tag else []
-        self.extra = {}
+        self._attrib = _AttributeDict(self, attrib)
+        self._categories = (category_id(tag),) if tag else ()  # category IDs
+        self._extra = None
+
+    extra = property(_get_extra, _set_extra)
+
+    def _clone(self, root, parent, child, share_attrib=False):
+        """Returns a copy of the Edge for another :class:`Passage`, between the given copied Nodes.
+
+        :param share_attrib: whether to share the attribute dict (copy-on-write)
+
+        """
+        other = Edge.__new__(Edge)
+        other._root = root
+        other._parent = parent
+        other._child = child
+        other._attrib = self._attrib._clone(other, share_attrib)
+        other._categories = self._categories
+        other._extra = None if self._extra is None else self._extra.copy()
+        return other
+
+    def __getstate__(self):
+        return (self._root, self._parent, self._child, self._attrib,
+                [_CATEGORY_KEYS[c] for c in self._categories], self._extra)
+
+    def __setstate__(self, state):
+        self._root, self._parent, self._child, self._attrib, keys, self._extra = state
+        self._categories = tuple(category_id(*key) for key in keys)  # IDs may differ between processes
 
     @property
     def tag(self):
-        return self._categories[0].tag
+        return _CATEGORY_KEYS[self._categories[0]][0]
 
     @tag.setter
     @ModifyPassage
     def tag(self, new_tag):
         old_tag = self.tag
-        self._categories[0].tag = new_tag
+        first = category_id(new_tag, *_CATEGORY_KEYS[self._categories[0]][1:])
+        self._categories = (first,) + self._categories[1:]
+        self._root._register_category(first)
+        self._parent._by_tag = None
+        # Edges may be ordered by their tag, so re-position this one
+        self._parent._outgoing.rekey(self)
+        self._child._incoming.rekey(self)
         self._root._change_edge_tag(self, old_tag)
 
     @property
     def tags(self):
-        return [category.tag for category in self._categories]
+        return [_CATEGORY_KEYS[c][0] for c in self._categories]
+
+    @property
+    def tag_id(self):
+        return _CATEGORY_TAG_IDS[self._categories[0]]
+
+    @property
+    def tag_ids(self):
+        return tuple(_CATEGORY_TAG_IDS[c] for c in self._categories)
 
     @property
     def root(self):
@@ -299,11 +842,21 @@ class Edge:
 
     @property
     def categories(self):
-        return self._categories
+        return [Category._from_id(c) for c in self._categories]
 
     @categories.setter
+    @ModifyPassage
     def categories(self, new_categories):
-        self._categories = new_categories
+        new_categories = list(new_categories)
+        # One category at a time, so that the journal can revert the change
+        for index in reversed(range(len(self._categories))):
+            self._remove_category(Category._from_id(self._categories[index]), index)
+        for index, category in enumerate(new_categories):
+            self._insert_category(category, index)
+
+    @property
+    def category_ids(self):
+        return self._categories
 
     @property
     def child(self):
@@ -317,8 +870,12 @@ class Edge:
     def ID(self):
         return Edge.ID_FORMAT.format(self._parent.ID, self._child.ID)
 
+    def _structural_key(self):
+        """Returns a hashable key which is equal for non-recursively Edge-equal Edges."""
+        return self.tag if self._categories else None, self._attrib.structural_key()
+
     def equals(self, other, *, recursive=True, ordered=False,
-               ignore_node=None, ignore_edge=None):
+               ignore_node=None, ignore_edge=None, verify=False):
         """Returns whether self and other are Edge-equals.
 
         Edge-equality is determined by having the same tag and attributes.
@@ -331,34 +888,58 @@ class Edge:
             w.r.t order (see Node.equals())
         :param ignore_node: function that returns whether to ignore a given node
         :param ignore_edge: function that returns whether to ignore a given edge
+        :param verify: if recursive and unordered, whether to verify equal
+            structural hashes of the children (see Node.equals())
 
 
         :return: True iff the Edges are equal.
 
         """
-        return self.tag == other.tag and \
+        return self.tag_id == other.tag_id and \
                self._attrib.equals(other._attrib) and \
                (not recursive or
                 self.child.equals(other.child,
                                   ordered=ordered,
-                                  ignore_node=ignore_node, ignore_edge=ignore_edge))
+                                  ignore_node=ignore_node, ignore_edge=ignore_edge, verify=verify))
 
     @ModifyPassage
     def add(self, tag, slot="", layer="", parent=""):
         """ adds a new category to the edge"""
         c = Category(tag, slot, layer, parent)
-        self._categories.append(c)
-        if c.tag not in self.root.categories:
-            self.root._update_categories(c)
-        if c.parent and c.parent not in self.root.refined_categories:
-            self.root._update_refined_categories(c.parent)
+        self._insert_category(c, len(self._categories))
         return c
 
+    @ModifyPassage
+    def _insert_category(self, category, index):
+        self._categories = self._categories[:index] + (category.ID,) + self._categories[index:]
+        self._root._register_category(category.ID)
+        self._parent._by_tag = None
+        self._root._version += 1
+        if self._root._journal is not None:
+            self._root._journal._append(("add_category", self, category, index))
+
+    @ModifyPassage
+    def _remove_category(self, category, index):
+        assert self._categories[index] == category.ID
+        self._categories = self._categories[:index] + self._categories[index + 1:]
+        self._parent._by_tag = None
+        self._root._version += 1
+        if self._root._journal is not None:
+            self._root._journal._append(("remove_category", self, category, index))
+
     def __repr__(self):
         return self.ID
 
     def __getitem__(self, index):
-        return self._categories[index]
+        return Category._from_id(self._categories[index])
+
+
+def _index_edge(by_tag, edge):
+    """Appends an :class:`Edge` to the lists of its tags in a tag index (see :meth:`Node._edges_by_tag`)."""
+    for category in edge._categories:
+        edges = by_tag.setdefault(_CATEGORY_TAG_IDS[category], [])
+        if not edges or edges[-1] is not edge:  # several categories may have the same tag
+            edges.append(edge)
 
 
 class Node:
@@ -380,9 +961,13 @@ class Node:
         layer: the Layer this Node belongs to
         incoming: a copy of the incoming Edges to this object
         outgoing: a copy of the outgoing Edges from this object
+        incoming_view, outgoing_view: read-only :class:`SequenceView` of the
+            incoming or outgoing Edges, without copying
         parents: the Nodes which have incoming Edges to this object
         children: the Nodes which have outgoing Edges from this object
         orderkey: the key function for ordering the outgoing Edges
+        index: dense integer index of the Node in its Passage, assigned on
+            creation (see :attr:`Passage.node_count`)
         ID_SEPARATOR: separator function between the Layer ID and the unique
             Node ID in the complete ID of the Node. Mustn't be alphanumeric.
 
@@ -390,6 +975,9 @@ class Node:
 
     ID_SEPARATOR = '.'
 
+    __slots__ = ("_tag", "_root", "_ID", "_attrib", "_extra", "_outgoing", "_incoming", "_orderkey", "_index",
+                 "_by_tag")
+
     def __init__(self, ID, root, tag, attrib=None, *,
                  orderkey=edge_id_orderkey):
         """Creates a new :class:`Node` object.
@@ -402,18 +990,60 @@ class Node:
         """
         if root.frozen:
             raise FrozenPassageError(root.ID)
+        self._init_slots(ID, root, tag, attrib, orderkey)
+
+        # After properly initializing self, add it to the Passage/Layer
+        root._add_node(self)
+        root.layer(self.layer.ID)._add_node(self)
+
+    def _init_slots(self, ID, root, tag, attrib=None, orderkey=edge_id_orderkey):
+        """Initializes a new Node with no Edges, without adding it to the Passage or its Layer.
+
+        Used by __init__, and to create Nodes in bulk (see :meth:`layer0.Layer0.add_terminals`),
+        in which case the caller adds them to the Passage (by :meth:`Passage._add_node`) and Layer.
+
+        """
         self._tag = tag
         self._root = root
         self._ID = ID
-        self._attrib = _AttributeDict(root, attrib)
-        self.extra = {}
-        self._outgoing = []
-        self._incoming = []
+        self._attrib = _AttributeDict(self, attrib)
+        self._extra = None
+        self._outgoing = _SortedList(orderkey)
+        self._incoming = _SortedList(orderkey)
         self._orderkey = orderkey
+        self._by_tag = None  # tag ID -> outgoing Edges, see _edges_by_tag
 
-        # After properly initializing self, add it to the Passage/Layer
-        root._add_node(self)
-        root.layer(self.layer.ID)._add_node(self)
+    extra = property(_get_extra, _set_extra)
+
+    def _clone(self, root, share_attrib=False):
+        """Returns a copy of the Node for another :class:`Passage`, with no Edges.
+
+        The copy is not registered with the Passage or its Layer.
+
+        :param root: the Passage the copy is linked with
+        :param share_attrib: whether to share the attribute dict (copy-on-write)
+
+        """
+        other = type(self).__new__(type(self))
+        other._tag = self._tag
+        other._root = root
+        other._ID = self._ID
+        other._attrib = self._attrib._clone(other, share_attrib)
+        other._extra = None if self._extra is None else self._extra.copy()
+        other._orderkey = self._orderkey
+        other._index = self._index
+        other._by_tag = None
+        return other
+
+    def __getstate__(self):
+        # the tag index is left out, as tag IDs may differ between processes
+        return (self._tag, self._root, self._ID, self._attrib, self._extra, self._outgoing, self._incoming,
+                self._orderkey, self._index)
+
+    def __setstate__(self, state):
+        (self._tag, self._root, self._ID, self._attrib, self._extra, self._outgoing, self._incoming,
+         self._orderkey, self._index) = state
+        self._by_tag = None
 
     @property
     def tag(self):
@@ -434,6 +1064,10 @@ class Node:
     def ID(self):
         return self._ID
 
+    @property
+    def index(self):
+        return self._index
+
     @property
     def attrib(self):
         return self._attrib
@@ -451,10 +1085,12 @@ class Node:
         return tuple(self._outgoing)
 
     @property
+    @frozen_cached_list
     def parents(self):
         return [edge.parent for edge in self._incoming]
 
     @property
+    @frozen_cached_list
     def children(self):
         return [edge.child for edge in self._outgoing]
 
@@ -488,15 +1124,36 @@ class Node:
         """
         edge = Edge(root=self._root, parent=self,
                     child=node, attrib=edge_attrib)
-        for category in edge_categories:
-            edge.add(*category)
-        self._outgoing.append(edge)
-        self._outgoing.sort(key=self._orderkey)
-        node._incoming.append(edge)
-        node._incoming.sort(key=node._orderkey)
-        self.root._add_edge(edge)
+        edge._categories = tuple(category_id(*category) for category in edge_categories)
+        for category in edge._categories:
+            self._root._register_category(category)
+        self._attach(edge)
         return edge
 
+    def _attach(self, edge):
+        """Links an :class:`Edge` from self, which is not linked yet."""
+        self._outgoing.add(edge)
+        edge.child._incoming.add(edge)
+        if self._by_tag is not None:
+            if self._outgoing[-1] is edge:  # the common case: keeps the order of each tag's Edges
+                _index_edge(self._by_tag, edge)
+            else:
+                self._by_tag = None
+        self._root._add_edge(edge)
+
+    def _edges_by_tag(self):
+        """Returns a dict of each tag ID to the list of outgoing Edges with a category of this tag, in order.
+
+        The dict is built on first use and kept up to date by adding and removing Edges; re-tagging an Edge
+        or inserting one before the last Edge drops it, to be rebuilt on the next use. It must not be modified.
+
+        """
+        if self._by_tag is None:
+            self._by_tag = {}
+            for edge in self._outgoing:
+                _index_edge(self._by_tag, edge)
+        return self._by_tag
+
     @ModifyPassage
     def add(self, tag, node, *, edge_attrib=None):
         """Adds another :class:`Node` object as a child of self.
@@ -540,11 +1197,22 @@ class Node:
 
         try:
             self._outgoing.remove(edge)
+            if self._by_tag is not None:
+                for tag_id in set(edge.tag_ids):
+                    self._by_tag[tag_id] = [e for e in self._by_tag[tag_id] if e is not edge]
             edge.child._incoming.remove(edge)
             self.root._remove_edge(edge)
         except ValueError as e:
             raise MissingNodeError(edge_or_node) from e
 
+    @property
+    def incoming_view(self):
+        return SequenceView(self._root, lambda: self._incoming)
+
+    @property
+    def outgoing_view(self):
+        return SequenceView(self._root, lambda: self._outgoing)
+
     @property
     def orderkey(self):
         return self._orderkey
@@ -553,6 +1221,9 @@ class Node:
     def orderkey(self, value):
         self._orderkey = value
         self._outgoing.sort(key=value)
+        self._incoming.sort(key=value)
+        self._by_tag = None
+        self._root._version += 1
 
     @ModifyPassage
     def destroy(self):
@@ -570,8 +1241,29 @@ class Node:
         self.layer._remove_node(self)
         self._root._remove_node(self)
 
+    def _structural_key(self):
+        """Returns a hashable key which is equal for non-recursively Node-equal Nodes."""
+        return self._tag, self._attrib.structural_key()
+
+    def structural_hash(self, *, ordered=False, ignore_node=None, ignore_edge=None):
+        """Returns a hash of the subgraph under this Node.
+
+        Recursively Node-equal Nodes (with the same parameters) have the same
+        structural hash (see :meth:`equals`). Computing it takes linear time
+        in the size of the subgraph, and it is cached while the
+        :class:`Passage` is frozen.
+
+        :param ordered: whether the hash should depend on the order of Edges
+        :param ignore_node: function that returns whether to ignore a given node
+        :param ignore_edge: function that returns whether to ignore a given edge
+
+        :return: an integer hash value
+
+        """
+        return _structural_hashes(self._root, [self], ordered, ignore_node, ignore_edge)[id(self)]
+
     def equals(self, other, *, recursive=True, ordered=False,
-               ignore_node=None, ignore_edge=None):
+               ignore_node=None, ignore_edge=None, verify=False):
         """Returns whether the self Node-equals other.
 
         Node-equality is basically determined by self and other having the same
@@ -582,11 +1274,17 @@ class Node:
         while unordered equality means that each Edges are equivalent after
         being ordered with some determined order.
 
+        Unordered recursive equality is determined by comparing structural
+        hashes (see :meth:`structural_hash`), in linear time. Unequal Nodes
+        might only be considered equal in case of a hash collision, which is
+        ruled out (in linear time too) if verify is True.
+
         :param other: the Node object to compare to
         :param recursive: whether comparison is recursive, defaults to True.
         :param ordered: whether comparison should include strict ordering
         :param ignore_node: function that returns whether to ignore a given node
         :param ignore_edge: function that returns whether to ignore a given edge
+        :param verify: whether to verify equal structural hashes (see above)
 
         :return: True iff the Nodes are equal in the terms given.
 
@@ -595,6 +1293,11 @@ class Node:
             return False
         if not recursive:
             return True
+        if not ordered:
+            hashes = _structural_hashes(self._root, [self], False, ignore_node, ignore_edge)
+            other_hashes = _structural_hashes(other.root, [other], False, ignore_node, ignore_edge)
+            return hashes[id(self)] == other_hashes[id(other)] and (not verify or _verify_structure(
+                [(self, other)], hashes, other_hashes, ignore_node, ignore_edge))
         edges, other_edges = [[edge for edge in node
                                if (ignore_node is None or
                                    not ignore_node(edge.child)) and (
@@ -603,23 +1306,9 @@ class Node:
                               for node in (self, other)]
         if len(edges) != len(other_edges):
             return False  # not necessary, but gives better performance
-        if ordered:
-            return all(e1.equals(e2, ordered=True,
-                                 ignore_node=ignore_node, ignore_edge=ignore_edge)
-                       for e1, e2 in zip(edges, other_edges))
-        # For unordered equality, I try to find & remove an equivalent
-        # Edge + Node couple from other's Edges until exhausted.
-        # Because both Edge-equality and Node-equality are equivalence
-        # classes, I can just take the first I found and remove it w/o
-        # trying to iterate through possible orders.
-        try:
-            for e1 in edges:
-                other_edges.remove(next(e2 for e2 in other_edges
-                                        if e1.equals(e2, ignore_node=ignore_node,
-                                                     ignore_edge=ignore_edge)))
-        except StopIteration:
-            return False
-        return not other_edges
+        return all(e1.equals(e2, ordered=True,
+                             ignore_node=ignore_node, ignore_edge=ignore_edge)
+                   for e1, e2 in zip(edges, other_edges))
 
     def missing_edges(self, other, ignore_node=None):
         """Returns edges present in this node but missing in the other.
@@ -634,8 +1323,9 @@ class Node:
                                if ignore_node is None or
                                not ignore_node(edge.child)]
                               for node in (self, other)]
-        return sorted([e1 for e1 in edges if not any(e1.equals(e2) for e2 in other_edges)],
-                      key=edge_id_orderkey)
+        hashes, other_hashes = [_structural_hashes(node.root, [e.child for e in node_edges])
+                                for node, node_edges in ((self, edges), (other, other_edges))]
+        return _missing_edges(edges, hashes, other_edges, other_hashes)
 
     def iter(self, obj="nodes", method="dfs", duplicates=False, key=None):
         """Iterates the :class:`Node` objects in the subtree of self.
@@ -648,6 +1338,7 @@ class Node:
                 encountered twice, because of the DAG structure which isn't
                 necessarily a tree. If it is False, all objects will be yielded
                 only the first time they are encountered. Defaults to False.
+                See :mod:`ucca.traversal` for more kinds of traversal.
             key: boolean function that filters the iterable items. key function
                 takes one argument (the item) and returns True if it should be
                 returned to the user. If an item isn't returned, its subtree
@@ -662,22 +1353,10 @@ class Node:
             raise ValueError("method can be either 'dfs' or 'bfs'")
         if obj not in ("nodes", "edges"):
             raise ValueError("obj can be either 'nodes' or 'edges'")
-        processed = set()
-        if obj == 'nodes':
-            waiting = [self]
-        else:
-            waiting = self._outgoing[:]
-        while len(waiting):
-            curr = waiting.pop(0)
-            if key is None or key(curr):
-                yield curr
-            processed.add(curr)
-            to_add = curr.children if obj == 'nodes' else list(curr.child)
-            to_add = [x for x in to_add if duplicates or x not in processed]
-            if method == "bfs":
-                waiting.extend(to_add)
-            else:
-                waiting = to_add + waiting
+        traverse = traversal.bfs if method == "bfs" else traversal.dfs
+        for item in traverse(self, edges=(obj == "edges"), duplicates=duplicates):
+            if key is None or key(item):
+                yield item
 
     def get_terminals(self, *args, **kwargs):
         """Returns a list of all terminals under the span of this Node."""
@@ -706,6 +1385,8 @@ class Layer:
         all: a list of all the Nodes which are part of this Layer
         heads: a list of all Nodes which have no incoming Edges in the subgraph
             of the Layer (can have Edges from Nodes in other Layers).
+        all_view, heads_view: read-only :class:`SequenceView` of all or head
+            Nodes, without copying
 
     """
 
@@ -722,11 +1403,12 @@ class Layer:
             raise FrozenPassageError(root.ID)
         self._ID = ID
         self._root = root
-        self._attrib = _AttributeDict(root, attrib)
+        self._attrib = _AttributeDict(self, attrib)
         self.extra = {}
-        self._all = []
-        self._heads = []
+        self._all = _SortedList(orderkey)
+        self._heads = _SortedList(orderkey)
         self._orderkey = orderkey
+        self._outdated = False
         root._add_layer(self)
 
     @property
@@ -742,13 +1424,33 @@ class Layer:
         return self._attrib
 
     @property
+    @frozen_cached_list
     def all(self):
+        if self._outdated:
+            self._recompute()
         return self._all[:]
 
     @property
+    @frozen_cached_list
     def heads(self):
+        if self._outdated:
+            self._recompute()
         return self._heads[:]
 
+    @property
+    def all_view(self):
+        return SequenceView(self._root, lambda: self._current()._all)
+
+    @property
+    def heads_view(self):
+        return SequenceView(self._root, lambda: self._current()._heads)
+
+    def _current(self):
+        """Returns the Layer, after recomputing its order and heads if they are outdated."""
+        if self._outdated:
+            self._recompute()
+        return self
+
     @property
     def orderkey(self):
         return self._orderkey
@@ -758,8 +1460,52 @@ class Layer:
         self._orderkey = value
         self._all.sort(key=value)
         self._heads.sort(key=value)
+        self._root._version += 1
+
+    def _rekey(self, node):
+        """Re-positions a :class:`Node` whose ordering key may have changed."""
+        self._all.rekey(node)
+        self._heads.rekey(node)
 
-    def equals(self, other, *, ordered=False, ignore_node=None, ignore_edge=None):
+    def _recompute(self):
+        """Recomputes the order and heads of the :class:`Layer` from scratch.
+
+        Used after building the :class:`Passage` in bulk, when the derived
+        state is not updated per mutation (see :meth:`Passage.bulk_build`).
+        Meant to be extended by subclasses with derived state of their own.
+
+        """
+        self._outdated = False
+        self._all.sort()  # keys may depend on edges, so compute them again
+        self._heads = _SortedList(self._orderkey, (
+            node for node in self._all
+            if all(edge.parent.layer is not self for edge in node._incoming)))
+
+    def _clone(self, root, nodes):
+        """Copies the :class:`Layer` to another :class:`Passage`, given copies of its Nodes.
+
+        Derived state is copied rather than recomputed, so this is meant to be
+        extended by subclasses with derived state of their own.
+
+        :param root: the Passage to add the copy to
+        :param nodes: dictionary from the id() of each Node in the Layer to its copy
+
+        :return: the new Layer
+
+        """
+        if self._outdated:
+            self._recompute()
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other._root = root
+        other._attrib = self._attrib._clone(other)
+        other.extra = self.extra.copy()
+        other._all = self._all._clone(nodes)
+        other._heads = self._heads._clone(nodes)
+        root._add_layer(other)
+        return other
+
+    def equals(self, other, *, ordered=False, ignore_node=None, ignore_edge=None, verify=False):
         """Returns whether two Layer objects are equal.
 
         Layers are considered Layer-equal if their attribute dictionaries are
@@ -772,6 +1518,8 @@ class Layer:
         :param ordered: whether strict-order equality is used, defaults to False
         :param ignore_node: function that returns whether to ignore a given node
         :param ignore_edge: function that returns whether to ignore a given edge
+        :param verify: whether to verify equal structural hashes of heads, if
+            unordered (see :meth:`Node.equals`)
 
         :return: True iff self and other are Layer-equal.
 
@@ -788,16 +1536,15 @@ class Layer:
             return all(x1.equals(x2, ordered=True,
                                  ignore_node=ignore_node, ignore_edge=ignore_edge)
                        for x1, x2 in zip(heads, other_heads))
-        # I can just find the first equal head in unordered search, as
-        # Node-equality is an equivalence class (see their for details).
-        try:
-            for h1 in heads:
-                other_heads.remove(next(h2 for h2 in other_heads
-                                        if h1.equals(h2, ignore_node=ignore_node,
-                                                     ignore_edge=ignore_edge)))
-        except StopIteration:
+        # Unordered: the multisets of head structural hashes should be equal
+        hashes = _structural_hashes(self._root, heads, False, ignore_node, ignore_edge)
+        other_hashes = _structural_hashes(other.root, other_heads, False, ignore_node, ignore_edge)
+        heads.sort(key=lambda head: hashes[id(head)])
+        other_heads.sort(key=lambda head: other_hashes[id(head)])
+        if [hashes[id(h)] for h in heads] != [other_hashes[id(h)] for h in other_heads]:
             return False
-        return not other_heads
+        return not verify or _verify_structure(zip(heads, other_heads), hashes, other_hashes,
+                                               ignore_node, ignore_edge)
 
     def _add_edge(self, edge):
         """Alters self.heads if an :class:`Edge` has been added to the subgraph.
@@ -808,11 +1555,14 @@ class Layer:
         :param edge: the Edge added to the Layer subgraph
 
         """
+        if self._root._bulk:
+            self._outdated = True
+            return
         if edge.child in self._heads:
             self._heads.remove(edge.child)
-        # Order may depend on edges, so re-order
-        self._all.sort(key=self._orderkey)
-        self._heads.sort(key=self._orderkey)
+        # Order may depend on edges, so re-position the affected nodes
+        self._rekey(edge.parent)
+        self._rekey(edge.child)
 
     def _remove_edge(self, edge):
         """Alters self.heads if an :class:`Edge` has been removed.
@@ -823,12 +1573,15 @@ class Layer:
         :param edge: the Edge removed from the Layer subgraph
 
         """
-        if edge.child.layer == self and all(p.layer != self for p in edge.child.parents):
-            self._heads.append(edge.child)
-            self._heads.sort(key=self._orderkey)
-        # Order may depend on edges, so re-order
-        self._all.sort(key=self._orderkey)
-        self._heads.sort(key=self._orderkey)
+        if self._root._bulk:
+            self._outdated = True
+            return
+        if edge.child.layer == self and edge.child not in self._heads and \
+                all(p.layer != self for p in edge.child.parents):
+            self._heads.add(edge.child)
+        # Order may depend on edges, so re-position the affected nodes
+        self._rekey(edge.parent)
+        self._rekey(edge.child)
 
     def _add_node(self, node):
         """Adds a :class:`node` to the :class:`Layer`.
@@ -836,10 +1589,8 @@ class Layer:
         Assumes node has no incoming or outgoing :class:`Edge` objects.
 
         """
-        self._all.append(node)
-        self._all.sort(key=self._orderkey)
-        self._heads.append(node)
-        self._heads.sort(key=self._orderkey)
+        self._all.add(node)
+        self._heads.add(node)
 
     def _remove_node(self, node):
         """Removes a :class:`node` from the :class:`Layer`.
@@ -848,7 +1599,11 @@ class Layer:
 
         """
         self._all.remove(node)
-        self._heads.remove(node)
+        if self._root._bulk:  # heads may not be up to date
+            if node in self._heads:
+                self._heads.remove(node)
+        else:
+            self._heads.remove(node)
 
     def _change_edge_tag(self, edge, old_tag):
         """Updates the :class:`Layer` objects with the change.
@@ -857,7 +1612,13 @@ class Layer:
             old_tag: the Edge's tag before the change
 
         """
-        pass  # meant to be overriden by subclasses
+        # Order may depend on edges, so re-position the affected nodes.
+        # Meant to be extended by subclasses.
+        if self._root._bulk:
+            self._outdated = True
+            return
+        self._rekey(edge.parent)
+        self._rekey(edge.child)
 
     def _change_node_tag(self, node, old_tag):
         """Updates the :class:`Layer` objects with the change.
@@ -866,7 +1627,224 @@ class Layer:
             old_tag: the Node's tag before the change
 
         """
-        pass  # meant to be overriden by subclasses
+        # Order may depend on tags, so re-position the node.
+        # Meant to be extended by subclasses.
+        if self._root._bulk:
+            self._outdated = True
+            return
+        self._rekey(node)
+
+
+class _View:
+    """Base class for read-only views of the elements of a :class:`Passage`.
+
+    A view refers to the underlying container of the Passage rather than
+    copying it, and is valid as long as the Passage is not modified
+    (see :attr:`Passage.version`). Using it afterwards raises a
+    :class:`StaleViewError`.
+
+    Attributes:
+        root: the Passage viewed
+        valid: whether the Passage was not modified since the view was created
+
+    """
+
+    __slots__ = ("_root", "_get", "_version")
+
+    def __init__(self, root, get):
+        """Creates a view of the container returned by a function.
+
+        :param root: the Passage viewed
+        :param get: function returning the current underlying container
+
+        """
+        self._root = root
+        self._get = get
+        self._version = root._version
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def valid(self):
+        return self._root._version == self._version
+
+    def _target(self):
+        if self._root._version != self._version:
+            raise StaleViewError(self._root.ID)
+        return self._get()
+
+    def __iter__(self):
+        for item in self._target():
+            yield item
+            if self._root._version != self._version:
+                raise StaleViewError(self._root.ID)
+
+    def __len__(self):
+        return len(self._target())
+
+    def __contains__(self, item):
+        return item in self._target()
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, list(self._target()))
+
+
+class SequenceView(_View, abc.Sequence):
+    """Read-only view of an ordered collection of elements of a :class:`Passage` (see :class:`_View`).
+
+    Membership (``in``) is by identity, and takes constant time for long
+    sequences of Nodes or Edges.
+
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        return self._target()[index]
+
+    def __reversed__(self):
+        return reversed(self._target())
+
+    def __eq__(self, other):
+        if not isinstance(other, abc.Sequence):
+            return NotImplemented
+        return list(self._target()) == list(other)
+
+    __hash__ = None
+
+
+class MappingView(_View, abc.Mapping):
+    """Read-only view of a dictionary of elements of a :class:`Passage` (see :class:`_View`)."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return self._target()[key]
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, dict(self._target()))
+
+
+class Journal:
+    """Record of the changes made to a :class:`Passage`, in order.
+
+    Once a Passage starts a journal (see :meth:`Passage.start_journal`), every
+    change to its graph is appended to it as a tuple whose first element is
+    the kind of change, and whose second element is the changed element:
+
+    - ("add_node", node) and ("remove_node", node)
+    - ("add_edge", edge) and ("remove_edge", edge)
+    - ("node_tag", node, old_tag) and ("edge_tag", edge, old_tag)
+    - ("add_category", edge, category, index) and ("remove_category", edge, category, index)
+    - ("attrib", element, key, existed, old_value), where element is the
+      Node, Edge, Layer or Passage whose attribute was set or deleted
+
+    The journal only grows: undoing changes appends the reverse changes.
+    Caches of derived data may keep a position in the journal, and when it
+    grows, invalidate only the :meth:`touched` Nodes.
+
+    Attributes:
+        entries: the list of changes
+
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def _append(self, entry):
+        self.entries.append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+    def touched(self, start=0):
+        """Returns the Nodes affected by the changes from a given position.
+
+        Nodes are affected by changes to themselves, to their attributes, and
+        to their incoming and outgoing Edges.
+
+        :param start: position in the journal of the first change to consider
+
+        :return: list of Nodes, in order of the first change to each of them
+
+        """
+        nodes = {}  # id(node) -> node
+        for entry in self.entries[start:]:
+            element = entry[1]
+            if isinstance(element, Edge):
+                nodes.setdefault(id(element.parent), element.parent)
+                nodes.setdefault(id(element.child), element.child)
+            elif isinstance(element, Node):
+                nodes.setdefault(id(element), element)
+        return list(nodes.values())
+
+    def undo(self, start=0):
+        """Reverts the changes from a given position, latest first.
+
+        The reverting changes are recorded in the journal as well.
+
+        :param start: position in the journal of the first change to revert
+
+        """
+        for entry in reversed(self.entries[start:]):
+            kind, element = entry[:2]
+            if kind == "add_node":
+                element.destroy()
+            elif kind == "remove_node":
+                element.root._add_node(element, index=element.index)
+                element.layer._add_node(element)
+            elif kind == "add_edge":
+                element.parent.remove(element)
+            elif kind == "remove_edge":
+                element.parent._attach(element)
+            elif kind == "node_tag" or kind == "edge_tag":
+                element.tag = entry[2]
+            elif kind == "add_category":
+                element._remove_category(*entry[2:])
+            elif kind == "remove_category":
+                element._insert_category(*entry[2:])
+            elif kind == "attrib":
+                _, _, key, existed, old_value = entry
+                if existed:
+                    element._attrib[key] = old_value
+                else:
+                    del element._attrib[key]
+            else:
+                raise ValueError("Unknown journal entry: %r" % (entry,))
+
+
+class Transaction:
+    """Changes made to a :class:`Passage` within a :meth:`Passage.transaction` block.
+
+    Attributes:
+        passage: the Passage being changed
+        start: position in the Passage journal where the transaction started
+
+    """
+
+    def __init__(self, passage, start):
+        self.passage = passage
+        self.start = start
+
+    @property
+    def changes(self):
+        """Journal entries of the changes made in the transaction so far."""
+        return self.passage.journal[self.start:]
+
+    def rollback(self):
+        """Reverts all changes made in the transaction so far."""
+        journal = self.passage.journal
+        position = len(journal)
+        journal.undo(self.start)
+        self.start = position  # changes before this point are already reverted
 
 
 class Passage:
@@ -883,7 +1861,19 @@ class Passage:
         extra: temporary storage space for undocumented attributes and data
         layers: all Layers of the Passage, no order guaranteed
         nodes: dictionary of ID-node pairs for all the nodes in the Passage
+        nodes_view: read-only :class:`MappingView` of nodes, without copying
+        version: number of changes (nodes, edges, tags, attributes and order)
+            made to the Passage so far, invalidating views created before them
+        categories: dictionary from each tag used by Edges to its slot, layer and parent
+        category_ids: set of the IDs of the categories used by Edges (see :func:`category_id`)
+        node_count: number of Node indices given so far: every Node in the
+            Passage has a unique index smaller than it (see :attr:`Node.index`).
+            Indices of removed Nodes are not reused.
+        journal: the :class:`Journal` recording changes to the Passage, or None
+            if not recording (see :meth:`start_journal`)
         frozen: indicates whether the Passage can be modified or not, boolean.
+            While frozen, derived data of its members (e.g., :attr:`Node.children`
+            and :attr:`Layer.all`) is memoized (see :func:`frozen_cached`).
 
     """
 
@@ -898,10 +1888,35 @@ class Passage:
         self.extra = {}
         self._layers = {}
         self._nodes = {}
+        self._node_count = 0
         self._categories = {}
         self._refined_categories = []
+        self._category_ids = set()
+        self._bulk = False
+        self._journal = None
+        self._version = 0
         self.frozen = False
 
+    @property
+    def frozen(self):
+        return self._frozen
+
+    @frozen.setter
+    def frozen(self, value):
+        self._frozen = value
+        self._frozen_cache = {}  # derived data, only kept while frozen
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_frozen_cache"]  # may refer to objects by id()
+        state["_category_ids"] = [_CATEGORY_KEYS[c] for c in self._category_ids]  # IDs are per process
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._category_ids = {category_id(*key) for key in self._category_ids}
+        self._frozen_cache = {}
+
     @property
     def ID(self):
         return self._ID
@@ -922,6 +1937,70 @@ class Passage:
     def nodes(self):
         return self._nodes.copy()
 
+    @property
+    def nodes_view(self):
+        return MappingView(self, lambda: self._nodes)
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def node_count(self):
+        return self._node_count
+
+    @property
+    def journal(self):
+        return self._journal
+
+    def start_journal(self):
+        """Starts recording the changes to the Passage, if not recording already.
+
+        :return: the :class:`Journal` the changes are recorded in
+
+        """
+        if self._journal is None:
+            self._journal = Journal()
+        return self._journal
+
+    def stop_journal(self):
+        """Stops recording the changes to the Passage.
+
+        :return: the :class:`Journal` the changes were recorded in, or None
+
+        """
+        journal, self._journal = self._journal, None
+        return journal
+
+    @contextmanager
+    def transaction(self):
+        """Context manager for making changes which are reverted if the block raises an exception.
+
+        Changes are recorded in the Passage journal (started for the duration
+        of the block if needed), so reverting them only touches what changed.
+        They can be reverted explicitly by the rollback() method of the
+        :class:`Transaction` returned, e.g. when trying out a modification:
+
+        >>> with passage.transaction() as transaction:
+        ...     normalize(passage)
+        ...     if not acceptable(passage):
+        ...         transaction.rollback()
+
+        Transactions may be nested.
+
+        """
+        started = self._journal is None
+        journal = self.start_journal()
+        transaction = Transaction(self, len(journal))
+        try:
+            yield transaction
+        except BaseException:
+            transaction.rollback()
+            raise
+        finally:
+            if started:
+                self._journal = None
+
     @property
     def categories(self):
         return self._categories.copy()
@@ -930,6 +2009,40 @@ class Passage:
     def refined_categories(self):
         return self._refined_categories
 
+    @property
+    def category_ids(self):
+        return frozenset(self._category_ids)
+
+    @contextmanager
+    def bulk_build(self):
+        """Context manager for building or rewriting the Passage in bulk.
+
+        Within the block, the derived state of the Passage is not maintained
+        per mutation: frozen-status checks, the order and heads of each
+        :class:`Layer` (and layer-specific state such as top-level scenes)
+        are suspended. They are recomputed once, in linear time, when the
+        block exits. Reading :attr:`Layer.all` or :attr:`Layer.heads` within
+        the block recomputes the state of that layer on demand.
+
+        Nested blocks are allowed; only the outermost one recomputes.
+
+        :raise FrozenPassageError: if the Passage is frozen.
+
+        """
+        if self._bulk:
+            yield self
+            return
+        if self.frozen:
+            raise FrozenPassageError(self.ID)
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            for layer in self._layers.values():
+                if layer._outdated:
+                    layer._recompute()
+
     def layer(self, ID):
         """Returns the :class:`Layer` object whose ID is given.
 
@@ -940,7 +2053,7 @@ class Passage:
         """
         return self._layers[ID]
 
-    def equals(self, other, *, ordered=False, ignore_node=None, ignore_edge=None):
+    def equals(self, other, *, ordered=False, ignore_node=None, ignore_edge=None, verify=False):
         """Returns whether two passages are equivalent.
 
         Passage-equivalence is determined by having the same attributes and
@@ -950,6 +2063,8 @@ class Passage:
         :param ordered: is Layer-equivalency should be ordered (see there)
         :param ignore_node: function that returns whether to ignore a given node
         :param ignore_edge: function that returns whether to ignore a given edge
+        :param verify: whether to verify equal structural hashes, if unordered
+            (see :meth:`Node.equals`)
 
         :return: True iff self is Passage-equivalent to other.
 
@@ -963,12 +2078,30 @@ class Passage:
             for lid, l1 in self._layers.items():
                 l2 = other.layer(lid)
                 if not l1.equals(l2, ordered=ordered,
-                                 ignore_node=ignore_node, ignore_edge=ignore_edge):
+                                 ignore_node=ignore_node, ignore_edge=ignore_edge, verify=verify):
                     return False
         except KeyError:  # no layer with same ID found
             return False
         return True
 
+    def structural_hash(self, *, ordered=False):
+        """Returns a hash of the whole Passage, equal for Passage-equivalent ones.
+
+        :param ordered: whether the hash should depend on the order of heads and Edges
+
+        :return: an integer hash value
+
+        """
+        layers = []
+        for lid, layer in self._layers.items():
+            heads = layer.heads
+            hashes = _structural_hashes(self, heads, ordered)
+            head_hashes = [hashes[id(head)] for head in heads]
+            if not ordered:
+                head_hashes.sort()
+            layers.append((_hashable(lid), layer.attrib.structural_key(), tuple(head_hashes)))
+        return hash((self._attrib.structural_key(), tuple(sorted(layers, key=repr))))
+
     def missing_nodes(self, other, ignore_node=None, ignore_edge=None):
         """Returns nodes present in this passage but missing in the other.
 
@@ -979,41 +2112,129 @@ class Passage:
         :return: List of nodes present in this passage but missing in the other.
 
         """
-        nodes, other_nodes = [[node for node in passage.nodes.values()
+        nodes, other_nodes = [[node for node in passage._nodes.values()
                                if ignore_node is None or
                                not ignore_node(node)]
                               for passage in (self, other)]
-        return sorted([n1 for n1 in nodes
-                       if not any(n1.equals(n2, ignore_node=ignore_node,
-                                            ignore_edge=ignore_edge)
-                                  for n2 in other_nodes)],
-                      key=id_orderkey)
+        hashes = _structural_hashes(self, nodes, False, ignore_node, ignore_edge)
+        other_hashes = _structural_hashes(other, other_nodes, False, ignore_node, ignore_edge)
+        return _missing_nodes(nodes, hashes, other_nodes, other_hashes)
 
-    def copy(self, layers):
+    def copy(self, layers=None, *, share_attrib=False):
         """Copies the Passage and specified layers to a new object.
 
-        The main "building block" of copying is the Layer, so copying is
-        truly copying the Passage attributes (attrib, extra, ID, frozen)
-        and creating the equivalent layers (each layer for itself).
+        The copy is deep: Nodes, Edges, categories, attributes and extra
+        dictionaries are all cloned (extra dictionaries shallowly), keeping
+        their order, Node indices and the derived state of the Layers, without
+        going through the mutation API. Edges between a copied Node and a Node
+        of a Layer which is not copied are left out.
 
-        :param layers: sequence of layer IDs to copy to the new object.
+        :param layers: sequence of layer IDs to copy to the new object,
+            or None (default) to copy all of them.
+        :param share_attrib: whether to share the attribute dicts of Nodes (e.g.,
+            Terminal text) and Edges between the copy and this Passage rather than
+            copying them. Shared dicts are copied when first modified on either side.
 
         :return: A new Passage object.
 
         :raise KeyError: if a given layer ID doesn't exist.
-            UnimplementedMethodError if copying for a layer is unimplemented.
 
         """
+        layers = list(self._layers.values()) if layers is None else [self.layer(lid) for lid in layers]
         other = Passage(ID=self.ID, attrib=self.attrib.copy())
         other.extra = self.extra.copy()
-        for lid in layers:
-            try:
-                self.layer(lid).copy(other)
-            except AttributeError as e:
-                raise UnimplementedMethodError() from e
+        other._node_count = self._node_count  # Nodes keep their indices
+        copied = set(map(id, layers))
+        nodes = {}  # id(node) -> copy
+        for node in self._nodes.values():
+            if id(node.layer) in copied:
+                nodes[id(node)] = other._nodes[node.ID] = node._clone(other, share_attrib)
+        edges = {}  # id(edge) -> copy
+        for node in self._nodes.values():
+            parent = nodes.get(id(node))
+            if parent is not None:
+                for edge in node._outgoing:
+                    child = nodes.get(id(edge.child))
+                    if child is not None:
+                        edges[id(edge)] = edge._clone(other, parent, child, share_attrib)
+        for node in self._nodes.values():
+            copy = nodes.get(id(node))
+            if copy is not None:
+                copy._outgoing = node._outgoing._clone(edges)
+                copy._incoming = node._incoming._clone(edges)
+        for layer in self._layers.values():
+            if id(layer) in copied:
+                layer._clone(other, nodes)
+        if len(layers) == len(self._layers):
+            other._categories = {tag: category.copy() for tag, category in self._categories.items()}
+            other._refined_categories = list(self._refined_categories)
+            other._category_ids = set(self._category_ids)
+        else:
+            for edge in edges.values():
+                for category in edge._categories:
+                    other._register_category(category)
         other.frozen = self.frozen
         return other
 
+    def fork(self):
+        """Creates a modifiable copy-on-write copy of the Passage, for modifying without affecting it.
+
+        Nodes and Edges are linked with their Passage, so they are cloned, but
+        all attribute dicts are shared with this Passage until modified on either
+        side (see :meth:`copy`). Extra dicts are copied shallowly, so their values
+        are shared too. The fork is never frozen, even if this Passage is.
+
+        :return: A new Passage object.
+
+        """
+        other = self.copy(share_attrib=True)
+        other.frozen = False
+        return other
+
+    def close(self):
+        """Releases the elements of the Passage, leaving it empty.
+
+        Nodes, Edges and Layers refer to each other and to their Passage, so
+        a dropped Passage can only be reclaimed by the cyclic garbage collector.
+        Closing breaks these reference cycles, so that the Passage and its
+        elements are freed by reference counting as soon as they are dropped.
+        Elements of a closed Passage must not be used any more.
+        Frozen Passages may be closed too.
+
+        """
+        for node in self._nodes.values():
+            for edge in node._outgoing:
+                edge._attrib._owner = None
+            node._attrib._owner = None
+            node._extra = None
+            node._outgoing = _SortedList(node._orderkey)
+            node._incoming = _SortedList(node._orderkey)
+            node._by_tag = None
+        for layer in self._layers.values():
+            layer._attrib._owner = None
+        self._attrib._owner = None
+        self._nodes = {}
+        self._layers = {}
+        self._journal = None
+        self._frozen_cache = {}
+        self._version += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def to_compact(self):
+        """Creates a read-only, array-backed copy of the Passage.
+
+        :return: a :class:`ucca.compact.CompactPassage` object, which can be
+            converted back using its to_passage() method.
+
+        """
+        from ucca.compact import CompactPassage
+        return CompactPassage(self)
+
     def by_id(self, ID):
         """Returns a Node whose ID is given.
 
@@ -1039,19 +2260,27 @@ class Passage:
             raise DuplicateIdError(layer.ID)
         self._layers[layer.ID] = layer
 
-    @ModifyPassage
-    def _update_categories(self, category):
-        self._categories[category.tag] = {"layer": category.layer, "slot": category.slot, "parent": category.parent}
+    def _register_category(self, category):
+        """Registers the tag and refinement parent of a category used by an Edge, if it is new.
 
-    @ModifyPassage
-    def _update_refined_categories(self, refined_category):
-        self._refined_categories.append(refined_category)
+        :param category: category ID (see :func:`category_id`)
+
+        """
+        if category in self._category_ids:
+            return
+        self._category_ids.add(category)
+        tag, slot, layer, parent = _CATEGORY_KEYS[category]
+        if tag not in self._categories:
+            self._categories[tag] = {"layer": layer, "slot": slot, "parent": parent}
+        if parent and parent not in self._refined_categories:
+            self._refined_categories.append(parent)
 
     @ModifyPassage
-    def _add_node(self, node):
+    def _add_node(self, node, index=None):
         """Adds a :class:`Node` object to the :class:`Passage`.
 
         :param node: the Node object to add
+        :param index: the index of the Node if it was removed before, None to assign the next one
 
         :raise DuplicateIdError: if node.ID is identical to a Node already
                 present in the Passage.
@@ -1062,6 +2291,13 @@ class Passage:
         if node.ID in self._nodes:
             raise DuplicateIdError(node.ID)
         self._nodes[node.ID] = node
+        self._version += 1
+        if index is None:
+            index = self._node_count
+            self._node_count += 1
+        node._index = index
+        if self._journal is not None:
+            self._journal._append(("add_node", node))
 
     def _remove_node(self, node):
         """Removes a :class:`Node` object from the :class:`Passage`.
@@ -1072,7 +2308,10 @@ class Passage:
         :raise KeyError: if no Node with this ID is present
 
         """
+        self._version += 1
         del self._nodes[node.ID]
+        if self._journal is not None:
+            self._journal._append(("remove_node", node))
 
     @ModifyPassage
     def _add_edge(self, edge):
@@ -1083,8 +2322,10 @@ class Passage:
         :param edge: the Edge object to add
 
         """
-        # Currently no work is done in the Passage level
+        self._version += 1
         edge.parent.layer._add_edge(edge)
+        if self._journal is not None:
+            self._journal._append(("add_edge", edge))
 
     def _remove_edge(self, edge):
         """Removes a :class:`Edge` object from :class:`Passage`.
@@ -1094,8 +2335,10 @@ class Passage:
         :param edge: the Edge object to remove
 
         """
-        # Currently no work is done in the Passage level
+        self._version += 1
         edge.parent.layer._remove_edge(edge)
+        if self._journal is not None:
+            self._journal._append(("remove_edge", edge))
 
     def _change_edge_tag(self, edge, old_tag):
         """Updates the :class:`Passage` and :class:`Layer` objects with the change.
@@ -1104,8 +2347,10 @@ class Passage:
             old_tag: the Edge's tag before the change
 
         """
-        # Currently no work is done in the Passage level
+        self._version += 1
         edge.parent.layer._change_edge_tag(edge, old_tag)
+        if self._journal is not None:
+            self._journal._append(("edge_tag", edge, old_tag))
 
     def _change_node_tag(self, node, old_tag):
         """Updates the :class:`Passage` and :class:`Layer` objects with the change.
@@ -1114,8 +2359,10 @@ class Passage:
             old_tag: the Node's tag before the change
 
         """
-        # Currently no work is done in the Passage level
+        self._version += 1
         node.layer._change_node_tag(node, old_tag)
+        if self._journal is not None:
+            self._journal._append(("node_tag", node, old_tag))
 
     def __str__(self):
         try:
@@ -1,8 +1,14 @@
 import sys
 
+from ucca.core import _missing_edges, _missing_nodes, _structural_hashes, IRRELEVANT_ATTRIBUTES
 from ucca.ioutil import passage2file
 
 
+def _relevant_attrib(node):
+    """Returns the attributes of a node (including the text of Terminals) which count for equality."""
+    return {k: v for k, v in node.attrib.items() if k not in IRRELEVANT_ATTRIBUTES}
+
+
 def diff_passages(true_passage, pred_passage):
     """
     Debug method to print missing or mistaken attributes, nodes and edges
@@ -13,45 +19,50 @@ def diff_passages(true_passage, pred_passage):
                      (true_passage._attrib, pred_passage._attrib))
     try:
         for lid, l1 in true_passage._layers.items():
-            l2 = true_passage.layer(lid)
+            l2 = pred_passage.layer(lid)
             if not l1._attrib.equals(l2._attrib):
-                lines.append("Layer %d attributes mismatch: %s, %s" %
+                lines.append("Layer %s attributes mismatch: %s, %s" %
                              (lid, l1._attrib, l2._attrib))
     except KeyError:  # no layer with same ID found
         lines.append("Missing layer: %s, %s" %
                      (true_passage._layers, pred_passage._layers))
+    # Index all nodes by structural hash once, so that finding missing nodes and edges takes linear time
+    true_nodes, pred_nodes = list(true_passage._nodes.values()), list(pred_passage._nodes.values())
+    true_hashes = _structural_hashes(true_passage, true_nodes)
+    pred_hashes = _structural_hashes(pred_passage, pred_nodes)
     pred_ids = {node.extra["remarks"]: node
-                for node in pred_passage.missing_nodes(true_passage)}
+                for node in _missing_nodes(pred_nodes, pred_hashes, true_nodes, true_hashes)}
     true_ids = {node.ID: node
-                for node in true_passage.missing_nodes(pred_passage)}
+                for node in _missing_nodes(true_nodes, true_hashes, pred_nodes, pred_hashes)}
     for pred_id, pred_node in list(pred_ids.items()):
         true_node = true_ids.get(pred_id)
         if true_node:
             pred_ids.pop(pred_id)
             true_ids.pop(pred_id)
-            pred_edges = {edge.tag + "->" + edge.child.ID: edge for edge in
-                          pred_node.missing_edges(true_node)}
-            true_edges = {edge.tag + "->" + edge.child.ID: edge for edge in
-                          true_node.missing_edges(pred_node)}
+            pred_edges = {"%s->%s" % (edge.tag, edge.child.ID): edge for edge in
+                          _missing_edges(list(pred_node), pred_hashes, list(true_node), true_hashes)}
+            true_edges = {"%s->%s" % (edge.tag, edge.child.ID): edge for edge in
+                          _missing_edges(list(true_node), true_hashes, list(pred_node), pred_hashes)}
             intersection = set(pred_edges).intersection(set(true_edges))
             pred_edges = {s: edge for s, edge in pred_edges.items() if s not in intersection}
             true_edges = {s: edge for s, edge in true_edges.items() if s not in intersection}
 
             node_lines = []
-            if not pred_node._attrib.equals(true_node._attrib):
-                node_lines.append("  Attributes mismatch: %s, %s" %
-                                  (sorted(true_node._attrib.items()), sorted(pred_node._attrib.items())))
+            true_attrib, pred_attrib = _relevant_attrib(true_node), _relevant_attrib(pred_node)
+            if true_attrib != pred_attrib:
+                node_lines.append("  Attributes mismatch: %s, %s" % (sorted(true_attrib.items()),
+                                                                    sorted(pred_attrib.items())))
             if pred_edges:
                 node_lines.append("  Mistake edges: %s" % ", ".join(pred_edges))
             if true_edges:
                 node_lines.append("  Missing edges: %s" % ", ".join(true_edges))
             if node_lines:
-                lines.append("For node " + pred_id + ":")
+                lines.append("For node %s:" % (pred_id,))
                 lines.extend(node_lines)
     if pred_ids:
-        lines.append("Mistake nodes: %s" % ", ".join(pred_ids))
+        lines.append("Mistake nodes: %s" % ", ".join(map(str, pred_ids)))
     if true_ids:
-        lines.append("Missing nodes: %s" % ", ".join(true_ids))
+        lines.append("Missing nodes: %s" % ", ".join(map(str, true_ids)))
     if lines:
         outfile = "%s.xml" % true_passage.ID
         sys.stderr.write("Writing passage '%s'...\n" % outfile)
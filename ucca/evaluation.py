@@ -13,7 +13,7 @@ from itertools import groupby
 
 from operator import attrgetter
 
-from ucca import layer0, layer1, normalization
+from ucca import core, layer0, layer1, normalization
 from ucca.constructions import get_by_names, create_passage_yields, PRIMARY, DEFAULT, ALL_EDGES
 from ucca.layer1 import EdgeTags, NodeTags
 
@@ -32,6 +32,8 @@ EQUIV = ((EdgeTags.Process, EdgeTags.State),
 
 def get_yield(unit):
     try:
+        if isinstance(unit, layer1.FoundationalNode):
+            return frozenset(unit.get_positions(punct=False))
         return frozenset(t.position for t in unit.get_terminals(punct=False))
     except ValueError:
         return frozenset()
@@ -41,8 +43,9 @@ def move_functions(p1, p2):
     """
     Move any common Fs to the root
     """
+    function_id = core.tag_id(EdgeTags.Function)
     f1, f2 = [{get_yield(u): u for u in p.layer(layer1.LAYER_ID).all
-               if u.tag == NodeTags.Foundational and u.ftag == EdgeTags.Function} for p in (p1, p2)]
+               if u.tag == NodeTags.Foundational and u.ftag_id == function_id} for p in (p1, p2)]
     for positions in f1.keys() & f2.keys():  # positions is a yield corresponding to a Function in both passages
         for (p, unit) in ((p1, f1[positions]), (p2, f2[positions])):
             unit.fparent.remove(unit)  # Remove from current primary parent (but preserve remote parents)
@@ -324,7 +327,6 @@ def evaluate(guessed, ref, converter=None, verbose=False, constructions=DEFAULT,
              units=False, fscore=True, errors=False, normalize=True, eval_type=None, ref_yield_tags=None, **kwargs):
     """
     Compare two passages and return requested diagnostics and scores, possibly printing them too.
-    NOTE: since normalize=True by default, this method is destructive: it modifies the given passages before evaluation.
     :param guessed: Passage object to evaluate
     :param ref: reference Passage object to compare to
     :param converter: optional function to apply to passages before evaluation
@@ -333,7 +335,7 @@ def evaluate(guessed, ref, converter=None, verbose=False, constructions=DEFAULT,
     :param units: whether to evaluate common units
     :param fscore: whether to compute precision, recall and f1 score
     :param errors: whether to print the mistakes
-    :param normalize: flatten centers and move common functions to root before evaluation - modifies passages
+    :param normalize: flatten centers and move common functions to root before evaluation (on forks of the passages)
     :param eval_type: specific evaluation type to limit to
     :param ref_yield_tags: reference passage for fine-grained evaluation
     :return: Scores object
@@ -342,7 +344,8 @@ def evaluate(guessed, ref, converter=None, verbose=False, constructions=DEFAULT,
     if converter is not None:
         guessed = converter(guessed)
         ref = converter(ref)
-    if normalize:  # FIXME clone passages to avoid modifying the original ones
+    if normalize:  # normalize forks, to avoid modifying the original passages
+        guessed, ref = guessed.fork(), ref.fork()
         for passage in (guessed, ref):
             normalization.normalize(passage)  # flatten Cs inside Cs
         move_functions(guessed, ref)  # move common Fs to be under the root
@@ -8,6 +8,11 @@ Layer 0 has only one type of node, :class:`Terminal`. This is a subtype of
 
 """
 
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+import numpy as np
+
 from ucca import core
 
 LAYER_ID = 0
@@ -21,6 +26,29 @@ class NodeTags:
 
 ATTRIB_KEYS = ('text', 'paragraph', 'paragraph_position')
 
+SEPARATOR = " "  # between the texts of consecutive Terminals in the detokenized text of a passage
+
+MISSING_ANNOTATION = np.iinfo(np.int64).min  # value of missing entries in doc matrices
+
+
+def doc_matrix(tokens):
+    """Converts per-token annotation values to a matrix, as stored in the Layer0 extra["doc"] list per paragraph.
+
+    Unsigned 64-bit values (e.g. spaCy string hashes) are stored as int64 with the same bits,
+    and None values as MISSING_ANNOTATION.
+
+    :param tokens: sequence with a sequence of int (or None) values per token, or an integer NumPy array
+
+    :return: NumPy int64 array of shape (number of tokens, number of values per token)
+    """
+    if isinstance(tokens, np.ndarray):
+        return tokens.astype(np.int64)
+    rows = [[MISSING_ANNOTATION if value is None else int(value) for value in token] for token in tokens]
+    if not rows:
+        return np.zeros((0, 0), dtype=np.int64)
+    return np.array([[value - 2 ** 64 if value >= 2 ** 63 else value for value in row] for row in rows],
+                    dtype=np.int64)
+
 
 class Terminal(core.Node):
     """Layer 0 Node type, represents a word or a punctuation mark.
@@ -36,7 +64,10 @@ class Terminal(core.Node):
         tag: from NodeTags
         layer: '0' (LAYER_ID)
         attrib: returns a copy of the attribute dictionary, so changing it
-            will not affect the Terminal object
+            will not affect the Terminal object. The text, paragraph and
+            paragraph_position attributes are stored by the :class:`Layer0`,
+            in columns indexed by position, and the Terminal only refers to
+            its row; any other attributes are stored with the Terminal.
         text: text of the Terminal, whether punctuation or a word
         position: global position of the Terminal in the passage, starting at 1
         paragraph: which paragraph the Terminal belongs to, starting at 1
@@ -46,9 +77,22 @@ class Terminal(core.Node):
 
     """
 
+    __slots__ = ()
+
+    def __init__(self, ID, root, tag, attrib=None, **kwargs):
+        """Creates a new Terminal, storing its text, paragraph and paragraph_position in its Layer0.
+
+        :param see :class:`core`.Node documentation.
+
+        """
+        attrib = dict(attrib or ())
+        row = [attrib.pop(key, None) for key in ATTRIB_KEYS]
+        super().__init__(ID, root, tag, attrib, **kwargs)
+        root.layer(LAYER_ID)._set_row(self.position, *row, punct=(tag == NodeTags.Punct))
+
     @property
     def text(self):
-        return self.attrib['text']
+        return self._root._layers[LAYER_ID]._texts[self._ID[1] - 1]
 
     @property
     def position(self):
@@ -57,25 +101,34 @@ class Terminal(core.Node):
 
     @property
     def para_pos(self):
-        return self.attrib['paragraph_position']
+        return self._root._layers[LAYER_ID]._para_pos[self._ID[1] - 1]
 
     @property
     def paragraph(self):
-        return self.attrib['paragraph']
+        return self._root._layers[LAYER_ID]._paragraphs[self._ID[1] - 1]
 
     @property
     def tok(self):
+        """The annotation values of the Terminal in its Layer0 doc: a row view of the paragraph's matrix."""
         try:
             return self.layer.extra["doc"][self.paragraph - 1][self.para_pos - 1]
         except (KeyError, IndexError):
             return None
 
     def get_annotation(self, attr, as_array=False):
-        return attr(self.tok[attr.value]) if as_array else self.extra.get(attr.key)
+        if not as_array:
+            return self.extra.get(attr.key)
+        value = self.tok[attr.value]
+        return None if value is None or value == MISSING_ANNOTATION else attr(value)
 
     @property
     def attrib(self):
-        return self._attrib.copy()
+        layer, i = self._root._layers[LAYER_ID], self._ID[1] - 1
+        attrib = {'text': layer._texts[i], 'paragraph': layer._paragraphs[i],
+                  'paragraph_position': layer._para_pos[i]}
+        if len(self._attrib):
+            attrib.update(self._attrib.items())
+        return attrib
 
     @property
     def punct(self):
@@ -91,6 +144,10 @@ class Terminal(core.Node):
         del args, kwargs
         return [] if self.punct and not punct else [self]
 
+    def _structural_key(self):
+        """Returns a hashable key which is equal for equal Terminals (see equals())."""
+        return self.layer.ID, self.text, self.position, self.tag, self.paragraph, self.para_pos
+
     def equals(self, other, *, ordered=False, **kwargs):
         """Equals if the Terminals are of the same Layer, tag, position & text.
 
@@ -133,6 +190,23 @@ class Terminal(core.Node):
 class Layer0(core.Layer):
     """Represents the :class:`Terminal` objects layer.
 
+    The text, paragraph, paragraph position and punctuation flag of the
+    Terminals are stored in parallel lists (columns), where the Terminal at
+    position i is in row i - 1. They can be read as arrays, e.g.,
+    ``layer0.texts()[layer0.punct_mask()]`` are the punctuation marks.
+    As in :meth:`add_terminal`, positions are assumed to have no holes.
+
+    The Layer0 also keeps an index of the row where each paragraph starts
+    (a new paragraph starts wherever the paragraph number changes), updated
+    as Terminals are added, so that the number of paragraphs and the
+    Terminals of each paragraph are available without scanning the Terminals.
+
+    For alignment with character-based annotation, the character offsets of
+    the Terminals in the detokenized text (their texts joined by SEPARATOR,
+    as in the UCCA-App format) are computed on first use and kept until a
+    Terminal is added or removed. So is an inverted index from the text of
+    the Terminals to their positions, used to search for sequences of tokens.
+
     Attributes:
         words: a tuple of only the words (not punctuation) Terminals, ordered
         pairs: a tuple of (position, terminal) tuples of all Terminals, ordered
@@ -140,8 +214,253 @@ class Layer0(core.Layer):
     """
 
     def __init__(self, root, attrib=None):
+        self._texts = []
+        self._paragraphs = []
+        self._para_pos = []
+        self._punct = []
+        self._para_starts = []  # None if it needs to be rebuilt
+        self._char_offsets = None  # computed on demand
+        self._token_index = {}  # lowercase -> inverted index, computed on demand
         super().__init__(ID=LAYER_ID, root=root, attrib=attrib)
 
+    def _set_row(self, position, text, paragraph, para_pos, punct):
+        """Stores the data of the Terminal at the given position."""
+        missing = position - len(self._texts)
+        self._char_offsets = None
+        self._token_index = {}
+        if self._para_starts is not None:
+            if missing == 1 and len(self._all) == position:  # appending the next Terminal
+                if position == 1 or paragraph != self._paragraphs[-1]:
+                    self._para_starts.append(position - 1)
+            else:
+                self._para_starts = None
+        if missing > 0:
+            for column in self._texts, self._paragraphs, self._para_pos, self._punct:
+                column.extend([None] * missing)
+        i = position - 1
+        self._texts[i] = text
+        self._paragraphs[i] = paragraph
+        self._para_pos[i] = para_pos
+        self._punct[i] = punct
+
+    def _clone(self, root, nodes):
+        other = super()._clone(root, nodes)
+        other._texts = self._texts[:]
+        other._paragraphs = self._paragraphs[:]
+        other._para_pos = self._para_pos[:]
+        other._punct = self._punct[:]
+        other._para_starts = None if self._para_starts is None else self._para_starts[:]
+        other._token_index = {}
+        return other
+
+    def _remove_node(self, node):
+        super()._remove_node(node)
+        self._para_starts = None
+        self._char_offsets = None
+        self._token_index = {}
+
+    def _change_node_tag(self, node, old_tag):
+        super()._change_node_tag(node, old_tag)
+        self._punct[node.position - 1] = node.tag == NodeTags.Punct
+
+    def texts(self):
+        """Returns a NumPy array of the text of each Terminal, by position (starting at 0)."""
+        return np.array(self._texts[:len(self._all)], dtype=object)
+
+    def paragraphs(self):
+        """Returns a NumPy array of the paragraph of each Terminal, by position (starting at 0)."""
+        return np.array(self._paragraphs[:len(self._all)], dtype=np.int64)
+
+    def para_positions(self):
+        """Returns a NumPy array of the position in its paragraph of each Terminal, by position (starting at 0)."""
+        return np.array(self._para_pos[:len(self._all)], dtype=np.int64)
+
+    def punct_mask(self):
+        """Returns a boolean NumPy array of whether each Terminal is punctuation, by position (starting at 0)."""
+        return np.array(self._punct[:len(self._all)], dtype=np.bool_)
+
+    def _paragraph_starts(self):
+        """Returns the list of rows where each paragraph starts, rebuilding it if necessary."""
+        if self._para_starts is None:
+            paragraphs = [self._paragraphs[terminal.position - 1] for terminal in self._all]
+            self._para_starts = [i for i, paragraph in enumerate(paragraphs)
+                                 if i == 0 or paragraph != paragraphs[i - 1]]
+        return self._para_starts
+
+    @property
+    def paragraph_count(self):
+        """The number of paragraphs."""
+        return len(self._paragraph_starts())
+
+    def paragraph_bounds(self, k):
+        """Returns the range of the Terminals of the k-th paragraph.
+
+        :param k: the index of the paragraph in the passage, starting at 1 (as in :attr:`Terminal.paragraph`,
+                  though paragraph numbers need not be consecutive)
+
+        :return: pair of (start, end) indices into :attr:`all`, such that ``all[start:end]`` is the paragraph
+
+        :raise IndexError: if k is out of bounds
+
+        """
+        starts = self._paragraph_starts()
+        if not 1 <= k <= len(starts):
+            raise IndexError("Paragraph %d out of range (1-%d)" % (k, len(starts)))
+        return starts[k - 1], starts[k] if k < len(starts) else len(self._all)
+
+    def paragraph_terminals(self, k, start=None, end=None):
+        """Returns the Terminals of the k-th paragraph, or a slice of them.
+
+        :param k: the index of the paragraph in the passage, starting at 1
+        :param start: index of the first Terminal to return, relative to the paragraph (para_pos - 1)
+        :param end: index after the last Terminal to return, relative to the paragraph
+
+        :return: a list of :class:`Terminal` objects
+
+        :raise IndexError: if k is out of bounds
+
+        """
+        first, last = self.paragraph_bounds(k)
+        return self._all[first:last][start:end]
+
+    def paragraph_ends(self):
+        """Returns a list of the position of the last Terminal of each paragraph."""
+        starts = self._paragraph_starts()
+        return starts[1:] + [len(self._all)] if starts else []
+
+    def char_offsets(self):
+        """Returns the character offsets of the Terminals in the detokenized text (see :meth:`detokenized_text`).
+
+        :return: pair of read-only NumPy int64 arrays, of the start and end offset of each Terminal, by position
+                 (starting at 0), where the end offset is exclusive
+        """
+        if self._char_offsets is None:
+            lengths = np.fromiter(map(len, self._texts[:len(self._all)]), dtype=np.int64, count=len(self._all))
+            ends = np.cumsum(lengths + len(SEPARATOR)) - len(SEPARATOR)
+            starts = ends - lengths
+            starts.setflags(write=False)
+            ends.setflags(write=False)
+            self._char_offsets = starts, ends
+        return self._char_offsets
+
+    def detokenized_text(self):
+        """Returns the texts of all Terminals, joined by SEPARATOR."""
+        return SEPARATOR.join(self._texts[:len(self._all)])
+
+    def char_span(self, start, end):
+        """Returns the span of a range of Terminals in the detokenized text.
+
+        :param start: index of the first Terminal in the range (position - 1)
+        :param end: index after the last Terminal in the range, greater than start
+
+        :return: pair of (start, end) character offsets, where end is exclusive
+        """
+        starts, ends = self.char_offsets()
+        return int(starts[start]), int(ends[end - 1])
+
+    def terminal_range(self, start, end):
+        """Returns the range of the Terminals overlapping a span of the detokenized text, in logarithmic time.
+
+        :param start: character offset of the start of the span
+        :param end: character offset after the end of the span
+
+        :return: pair of (start, end) indices into :attr:`all`, such that ``all[start:end]`` are the Terminals
+                 containing at least one character of the span (empty if it only covers separators)
+        """
+        starts, ends = self.char_offsets()
+        first = int(np.searchsorted(ends, start, side="right"))
+        return first, max(first, int(np.searchsorted(starts, end, side="left")))
+
+    def terminals_in_span(self, start, end):
+        """Returns a list of the Terminals overlapping a span of the detokenized text (see :meth:`terminal_range`)."""
+        first, last = self.terminal_range(start, end)
+        return self._all[first:last]
+
+    def token_index(self, lowercase=False):
+        """Returns an inverted index of the Terminals by their text.
+
+        :param lowercase: whether to index the texts in lower case, for case-insensitive search
+
+        :return: dict from text to a sorted list of the indices into :attr:`all` of the Terminals with this text
+        """
+        index = self._token_index.get(lowercase)
+        if index is None:
+            index = self._token_index[lowercase] = {}
+            for i, text in enumerate(self._texts[:len(self._all)]):
+                index.setdefault(text.lower() if lowercase else text, []).append(i)
+        return index
+
+    def _token_hits(self, tokens, lowercase):
+        """Returns the list of positions of each token, or None if any of them is missing."""
+        index = self.token_index(lowercase)
+        hits = [index.get(token.lower() if lowercase else token) for token in tokens]
+        return None if not hits or None in hits else hits
+
+    def find_phrase(self, tokens, lowercase=False):
+        """Finds the occurrences of a sequence of tokens as consecutive Terminals.
+
+        :param tokens: sequence of texts
+        :param lowercase: whether to search case-insensitively
+
+        :return: sorted list of (start, end) index ranges into :attr:`all`
+        """
+        hits = self._token_hits(tokens, lowercase)
+        if hits is None:
+            return []
+        starts = set(hits[0])
+        for offset, positions in enumerate(hits[1:], start=1):
+            starts.intersection_update(i - offset for i in positions)
+        return [(start, start + len(hits)) for start in sorted(starts)]
+
+    def find_subsequence(self, tokens, lowercase=False):
+        """Finds the occurrences of a sequence of tokens as Terminals in the same order, possibly with gaps.
+
+        :param tokens: sequence of texts
+        :param lowercase: whether to search case-insensitively
+
+        :return: sorted list of (start, end) index ranges into :attr:`all`, one for each occurrence of the first
+                 token that is followed by the rest, ending with the earliest such occurrence of the last token
+        """
+        hits = self._token_hits(tokens, lowercase)
+        spans = []
+        for start in hits[0] if hits else ():
+            end = start
+            for positions in hits[1:]:
+                i = bisect_right(positions, end)
+                if i == len(positions):
+                    return spans  # later starts would not be followed by the rest either
+                end = positions[i]
+            spans.append((start, end + 1))
+        return spans
+
+    def find_subset(self, tokens, lowercase=False):
+        """Finds the minimal ranges of Terminals containing all the given tokens, in any order.
+
+        :param tokens: collection of texts
+        :param lowercase: whether to search case-insensitively
+
+        :return: sorted list of (start, end) index ranges into :attr:`all`, none of which contains another
+        """
+        needed = {token.lower() if lowercase else token for token in tokens}
+        hits = self._token_hits(needed, lowercase)
+        if hits is None:
+            return []
+        hits = sorted((i, token) for token, positions in zip(needed, hits) for i in positions)
+        counts = Counter()
+        spans = []
+        left = 0
+        for end, token in hits:
+            counts[token] += 1
+            while len(counts) == len(needed):  # shrink the window from the left while it has all tokens
+                start, first = hits[left]
+                if counts[first] == 1:
+                    spans.append((start, end + 1))
+                    del counts[first]
+                else:
+                    counts[first] -= 1
+                left += 1
+        return spans
+
     @property
     def words(self):
         return tuple(x for x in self._all if not x.punct)
@@ -159,6 +478,18 @@ class Layer0(core.Layer):
         """
         return self._all[pos - 1]  # positions start at 1, not 0
 
+    def by_positions(self, start, end):
+        """Returns the Terminals in a range of positions, in logarithmic time (plus the number of Terminals).
+
+        Unlike :meth:`by_position`, positions may have holes.
+
+        :param start: the position of the first Terminal
+        :param end: the position of the last Terminal (inclusive)
+        :return: a list of the Terminals with positions from start to end
+        """
+        keys = self._all._keys  # Terminals are ordered by ID: (LAYER_ID, position)
+        return self._all[bisect_left(keys, (LAYER_ID, start)):bisect_right(keys, (LAYER_ID, end))]
+
     def add_terminal(self, text, punct, paragraph=1):
         """Adds the next Terminal at the next available position.
 
@@ -175,7 +506,8 @@ class Layer0(core.Layer):
                 caused by un-ordered Terminal positions in the layer
         """
         position = len(self._all) + 1  # we want positions to start with 1
-        para_pos = self._all[-1].para_pos + 1 if position > 1 and paragraph == self._all[-1].paragraph else 1
+        para_pos = self._para_pos[position - 2] + 1 if position > 1 and paragraph == self._paragraphs[position - 2] \
+            else 1
         tag = NodeTags.Punct if punct else NodeTags.Word
         return Terminal(ID=(LAYER_ID, position),
                         root=self.root, tag=tag,
@@ -183,6 +515,55 @@ class Layer0(core.Layer):
                                 'paragraph': paragraph,
                                 'paragraph_position': para_pos})
 
+    def add_terminals(self, texts, punct, paragraphs=None):
+        """Adds Terminals at the next available positions, in one pass.
+
+        The Terminals are identical to those created by calling :meth:`add_terminal` for each, in order.
+
+        :param texts: sequence of the texts of the Terminals
+        :param punct: sequence of booleans, whether each Terminal is a punctuation mark
+        :param paragraphs: sequence of the paragraph number of each Terminal, all 1 by default
+
+        :return: a list of the created Terminals
+
+        :raise ValueError: if the sequences have different lengths
+        :raise FrozenPassageError: if the Passage is frozen
+        """
+        texts, punct = list(texts), list(punct)
+        paragraphs = [1] * len(texts) if paragraphs is None else list(paragraphs)
+        if not len(texts) == len(punct) == len(paragraphs):
+            raise ValueError("Expected the same number of texts, punctuation flags and paragraphs, got %d, %d, %d" %
+                             (len(texts), len(punct), len(paragraphs)))
+        start = len(self._all)
+        if len(self._texts) != start:  # there are holes: no shortcut
+            return [self.add_terminal(*args) for args in zip(texts, punct, paragraphs)]
+        root = self._root
+        if root.frozen:
+            raise core.FrozenPassageError(root.ID)
+        para_pos = []
+        last_paragraph, last_para_pos = (self._paragraphs[-1], self._para_pos[-1]) if start else (None, 0)
+        for i, paragraph in enumerate(paragraphs, start=start):
+            last_para_pos = last_para_pos + 1 if paragraph == last_paragraph else 1
+            if last_para_pos == 1 and self._para_starts is not None:
+                self._para_starts.append(i)
+            last_paragraph = paragraph
+            para_pos.append(last_para_pos)
+        self._texts += texts
+        self._paragraphs += paragraphs
+        self._para_pos += para_pos
+        self._punct += map(bool, punct)
+        self._char_offsets = None
+        self._token_index = {}
+        terminals = []
+        for position, is_punct in enumerate(punct, start=start + 1):
+            terminal = Terminal.__new__(Terminal)
+            terminal._init_slots((LAYER_ID, position), root, NodeTags.Punct if is_punct else NodeTags.Word)
+            root._add_node(terminal)
+            terminals.append(terminal)
+        self._all.extend(terminals)
+        self._heads.extend(terminals)
+        return terminals
+
     def copy(self, other_passage):
         """Creates a copied Layer0 object and Terminals in other_passage.
 
@@ -191,19 +572,35 @@ class Layer0(core.Layer):
         """
         other = Layer0(root=other_passage, attrib=self.attrib.copy())
         other.extra = self.extra.copy()
-        for t in self._all:
-            copied = other.add_terminal(t.text, t.punct, t.paragraph)
+        terminals = self._all
+        copies = other.add_terminals([t.text for t in terminals], [t.punct for t in terminals],
+                                     [t.paragraph for t in terminals])
+        for t, copied in zip(terminals, copies):
             copied.extra = t.extra.copy()
 
     def docs(self, num_paragraphs=1):
-        docs = self.extra.setdefault("doc", [[]])
+        """Returns the list of per-paragraph annotation matrices (see :func:`doc_matrix`), extending it if necessary.
+
+        Passages saved by earlier versions may have nested lists instead of matrices, which are read as-is.
+
+        :param num_paragraphs: minimum length of the list
+        """
+        docs = self.extra.setdefault("doc", [])
         while len(docs) < num_paragraphs:
-            docs.append([])
+            docs.append(doc_matrix(()))
         return docs
 
     def doc(self, paragraph):
         return self.docs(paragraph)[paragraph - 1]
 
+    def set_doc(self, paragraph, tokens):
+        """Sets the annotation of a paragraph.
+
+        :param paragraph: paragraph number, starting at 1
+        :param tokens: per-token annotation values, converted by :func:`doc_matrix`
+        """
+        self.docs(paragraph)[paragraph - 1] = doc_matrix(tokens)
+
 
 def is_punct(node):
     """Returns whether the unit is a layer0 punctuation (for all Units)."""
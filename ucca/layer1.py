@@ -10,8 +10,6 @@ the type of relation between the Nodes.
 
 import itertools
 
-import operator
-
 from ucca import core, layer0
 
 LAYER_ID = 1
@@ -77,9 +75,9 @@ def _single_child_by_tag(node, tag, must=True):
         MissingRelationError if Node not found and must is set to True
 
     """
-    for edge in node:
-        if tag in edge.tags:
-            return edge.child
+    edges = node._edges_by_tag().get(core.tag_id(tag))
+    if edges:
+        return edges[0].child
     if must:
         raise MissingRelationError(node.ID, tag)
     return None
@@ -96,7 +94,7 @@ def _multiple_children_by_tag(node, tag):
         A list of connected Nodes, can be empty
 
     """
-    return [edge.child for edge in node if tag in edge.tags]
+    return [edge.child for edge in node._edges_by_tag().get(core.tag_id(tag), ())]
 
 
 class Linkage(core.Node):
@@ -116,6 +114,8 @@ class Linkage(core.Node):
 
     """
 
+    __slots__ = ()
+
     @property
     def relation(self):
         return _single_child_by_tag(self, EdgeTags.LinkRelation)
@@ -179,10 +179,13 @@ class FoundationalNode(core.Node):
             head, which returns None.
         ftag: the tag of the Edge connecting the fparent (as described above)
             with this FNode
+        ftag_id: the ID of ftag (see :func:`core.tag_id`)
         discontiguous: whether this FNode has continuous Terminals or not
 
     """
 
+    __slots__ = ()
+
     @property
     def participants(self):
         return _multiple_children_by_tag(self, EdgeTags.Participant)
@@ -247,6 +250,7 @@ class FoundationalNode(core.Node):
     def relator(self):
         return _single_child_by_tag(self, EdgeTags.Relator, False)
 
+    @core.frozen_cached
     def _fedge(self):
         """Returns the Edge of the fparent, or None."""
         for edge in self.incoming:
@@ -266,6 +270,11 @@ class FoundationalNode(core.Node):
         edge = self._fedge()
         return edge.tag if edge else None
 
+    @property
+    def ftag_id(self):
+        edge = self._fedge()
+        return edge.tag_id if edge else None
+
     def get_terminals(self, punct=True, remotes=False, visited=None):
         """Returns a list of all terminals under the span of this FoundationalNode.
         :param punct: whether to include punctuation Terminals, defaults to True
@@ -274,45 +283,51 @@ class FoundationalNode(core.Node):
         :return: a list of :class:`layer0`.Terminal objects
         """
         if visited is None:
-            return sorted(self.get_terminals(punct=punct, remotes=remotes, visited=set()),
-                          key=operator.attrgetter("position"))
+            return self._sorted_terminals(punct, remotes)
         outgoing = {e for e in set(self) - visited if remotes or not e.attrib.get("remote")}
         return [t for e in outgoing for t in e.child.get_terminals(
             punct=punct, remotes=remotes, visited=visited | outgoing)]
 
+    @core.frozen_cached_list
+    def _sorted_terminals(self, punct, remotes):
+        l0 = self._root.layer(layer0.LAYER_ID)
+        return [t for start, end in self._root.layer(LAYER_ID).spans(self, punct, remotes)
+                for t in l0.by_positions(start, end)]
+
+    def get_positions(self, punct=True, remotes=False):
+        """Returns a list of the positions of all terminals under the span of this FoundationalNode, in order.
+
+        :param punct: whether to include punctuation Terminals, defaults to True
+        :param remotes: whether to include Terminals from remote FoundationalNodes, defaults to false
+        """
+        return [position for start, end in self._root.layer(LAYER_ID).spans(self, punct, remotes)
+                for position in range(start, end + 1)]
+
     @property
+    @core.frozen_cached
     def start_position(self):
-        try:
-            return self.get_terminals()[0].position
-        except IndexError:  # implicit unit or having no Terminals
-            return -1
+        spans = self._root.layer(LAYER_ID).spans(self)
+        return spans[0][0] if spans else -1  # -1 for an implicit unit or having no Terminals
 
     @property
+    @core.frozen_cached
     def end_position(self):
-        try:
-            return self.get_terminals()[-1].position
-        except IndexError:  # implicit unit or having no Terminals
-            return -1
+        spans = self._root.layer(LAYER_ID).spans(self)
+        return spans[-1][1] if spans else -1  # -1 for an implicit unit or having no Terminals
 
     @property
+    @core.frozen_cached
     def discontiguous(self):
-        terms = self.get_terminals()
-        return any(terms[i].position + 1 != terms[i + 1].position
-                   for i in range(len(terms) - 1))
-
-    def get_sequences(self):
-        if self.attrib.get('implicit'):
-            return []
-        pos = sorted([x.position for x in self.get_terminals()])
+        return len(self._root.layer(LAYER_ID).spans(self)) > 1
 
-        # all terminals which end a sequence, including the last one
-        seq_closers = [pos[i] for i in range(len(pos) - 1)
-                       if pos[i] + 1 < pos[i + 1]] + [pos[-1]]
+    def get_sequences(self, punct=True, remotes=False):
+        """Returns the contiguous sequences of terminals under the span of this FoundationalNode.
 
-        # all terminals which start a sequence, including the first one
-        seq_openers = [pos[0]] + [pos[i] for i in range(1, len(pos))
-                                  if pos[i - 1] < pos[i] - 1]
-        return [(op, cl) for op, cl in zip(seq_openers, seq_closers)]
+        :param punct: whether to include punctuation Terminals, defaults to True
+        :param remotes: whether to include Terminals from remote FoundationalNodes, defaults to false
+        :return: a list of (start, end) position pairs (inclusive), in order
+        """
+        return list(self._root.layer(LAYER_ID).spans(self, punct, remotes))
 
     def to_text(self):
         """Returns the text in the span of self, separated by spaces."""
@@ -372,6 +387,8 @@ class PunctNode(FoundationalNode):
 
     """
 
+    __slots__ = ()
+
     def add(self, edge_tag, node, *, edge_attrib=None):
         if node.layer.ID != layer0.LAYER_ID:
             raise ValueError("Non-terminal child (%s) for %s node (%s)" % (node.ID, NodeTags.Punctuation, self.ID))
@@ -398,6 +415,18 @@ class PunctNode(FoundationalNode):
         return self.to_text()
 
 
+def _merge_spans(spans):
+    """Returns a sorted tuple of the given (start, end) ranges, merging overlapping and adjacent ones."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
 class Layer1(core.Layer):
     """
 
@@ -406,22 +435,139 @@ class Layer1(core.Layer):
     def __init__(self, root, attrib=None, *, orderkey=core.id_orderkey):
         super().__init__(ID=LAYER_ID, root=root, attrib=attrib,
                          orderkey=orderkey)
-        self._scenes = []
-        self._linkages = []
+        self._scenes = core._SortedList(orderkey)
+        self._linkages = core._SortedList(orderkey)
+        self._spans = {}  # (punct, remotes) -> {node: spans}, valid for Passage version self._spans_version
+        self._spans_version = None
         self._head_fnode = FoundationalNode(root=root,
                                             tag=NodeTags.Foundational,
                                             ID=self.next_id())
-        self._all = [self._head_fnode]
-        self._heads = [self._head_fnode]
 
     @property
     def top_scenes(self):
+        if self._outdated:
+            self._recompute()
         return self._scenes[:]
 
     @property
     def top_linkages(self):
+        if self._outdated:
+            self._recompute()
         return self._linkages[:]
 
+    def spans(self, node, punct=True, remotes=False):
+        """Returns the positions of the Terminals under a node, as a tuple of contiguous (start, end) ranges.
+
+        Spans are computed bottom-up, from the spans of the children, and cached for every node visited until the
+        Passage is next modified, so that computing them for all nodes takes linear time in total.
+
+        :param node: a layer 1 Node (usually a FoundationalNode)
+        :param punct: whether to include punctuation Terminals, defaults to True
+        :param remotes: whether to include Terminals under remote Edges, defaults to false
+        :return: tuple of (start, end) position pairs (inclusive), in order and not adjacent to each other
+        """
+        if self._spans_version != self._root._version:
+            self._spans = {}
+            self._spans_version = self._root._version
+        cache = self._spans.get((punct, remotes))
+        if cache is None:
+            cache = self._spans[punct, remotes] = {}
+        ret = cache.get(node)
+        if ret is None:
+            ret = self._compute_spans(node, punct, remotes, cache)
+        return ret
+
+    @staticmethod
+    def _compute_spans(node, punct, remotes, cache):
+        """Computes the spans of the node and of all nodes under it which are not yet in the cache (post-order)."""
+        computed = []
+        stack = [(node, False)]
+        on_path = set()
+        cyclic = False
+        while stack:
+            current, expanded = stack.pop()
+            if not expanded:
+                if current in cache:
+                    continue
+                stack.append((current, True))
+                on_path.add(id(current))
+                for edge in current:
+                    child = edge.child
+                    if child.layer.ID == LAYER_ID and (remotes or not edge.attrib.get("remote")) and \
+                            child not in cache:
+                        if id(child) in on_path:
+                            cyclic = True  # possible through remote edges
+                        else:
+                            stack.append((child, False))
+                continue
+            on_path.discard(id(current))
+            positions = []
+            for edge in current:
+                child = edge.child
+                if child.layer.ID == layer0.LAYER_ID:
+                    if punct or not child.punct:
+                        positions.append((child.position, child.position))
+                elif remotes or not edge.attrib.get("remote"):
+                    positions.extend(cache.get(child, ()))
+            if not punct and current.tag == NodeTags.Punctuation:
+                positions = ()
+            cache[current] = _merge_spans(positions)
+            computed.append(current)
+        if cyclic:  # the spans of nodes on the cycle may be partial: compute them from all reachable nodes instead
+            for current in computed:
+                del cache[current]
+            positions = []
+            visited = {id(node)}
+            queue = [node]
+            for current in queue:
+                for edge in current:
+                    child = edge.child
+                    if child.layer.ID == layer0.LAYER_ID:
+                        if (punct or not child.punct) and (punct or current.tag != NodeTags.Punctuation):
+                            positions.append((child.position, child.position))
+                    elif (remotes or not edge.attrib.get("remote")) and id(child) not in visited:
+                        visited.add(id(child))
+                        queue.append(child)
+            return _merge_spans(positions)
+        return cache[node]
+
+    def covering_unit(self, terminals):
+        """Returns the minimal unit covering the given Terminals, e.g., a range found by a Layer0 search.
+
+        This is the lowest common ancestor of the Terminals by primary edges, among FoundationalNodes.
+
+        :param terminals: non-empty sequence of :class:`layer0`.Terminal objects
+
+        :return: the lowest FoundationalNode with all the Terminals under it, or None if there is none
+        """
+        def _parent(terminal):  # the FoundationalNode above the Terminal (possibly through a PunctNode)
+            for edge in terminal.incoming:
+                if edge.parent.layer.ID == LAYER_ID and not edge.attrib.get("remote"):
+                    parent = edge.parent
+                    return parent.fparent if parent.tag == NodeTags.Punctuation else parent
+            return None
+
+        terminals = iter(terminals)
+        ancestors = []
+        node = _parent(next(terminals))
+        while node is not None:
+            ancestors.append(node)
+            node = node.fparent
+        depth = {id(node): i for i, node in enumerate(ancestors)}  # node -> index of the ancestor it leads to
+        highest = 0
+        for terminal in terminals:
+            path = []
+            node = _parent(terminal)
+            while node is not None and id(node) not in depth:
+                path.append(node)
+                node = node.fparent
+            if node is None:
+                return None
+            i = depth[id(node)]
+            depth.update((id(x), i) for x in path)
+            highest = max(highest, i)
+        return ancestors[highest] if ancestors else None
+
     def next_id(self):
         """Returns the next available ID string for this layer."""
         for n in itertools.count(start=len(self._all) + 1):
@@ -543,19 +689,25 @@ class Layer1(core.Layer):
         if node in self._scenes and not self._check_top_scene(node):
             self._scenes.remove(node)
         elif node not in self._scenes and self._check_top_scene(node):
-            self._scenes.append(node)
-            # Other scenes may now become not top-level, check it
-            for ts in self._scenes[:-1]:
-                if not self._check_top_scene(ts):
-                    self._scenes.remove(ts)
-            self._scenes.sort(key=self.orderkey)
+            self._scenes.add(node)
+            # Scenes under this one may now become not top-level, check them
+            visited = {node}
+            stack = [node]
+            while stack:
+                for edge in stack.pop():
+                    child = edge.child
+                    if child.tag == NodeTags.Foundational and child not in visited and \
+                            not edge.attrib.get('remote'):
+                        visited.add(child)
+                        stack.append(child)
+                        if child in self._scenes and not self._check_top_scene(child):
+                            self._scenes.remove(child)
 
     def _update_top_linkage(self, linkage):
         """Adds/removes the linkage if it's a top level linkage."""
         if all(fnode in self._scenes for fnode in linkage.arguments):
             if linkage not in self._linkages:
-                self._linkages.append(linkage)
-                self._linkages.sort(key=self.orderkey)
+                self._linkages.add(linkage)
         elif linkage in self._linkages:
             self._linkages.remove(linkage)
 
@@ -570,14 +722,60 @@ class Layer1(core.Layer):
                     if x.tag == NodeTags.Linkage]:
             self._update_top_linkage(lkg)
 
+    def _recompute(self):
+        """Recomputes order, heads, top scenes and top linkages from scratch.
+
+        A scene is top-level iff no FNode on its chain of fparents is a scene,
+        so whether each chain contains a scene is computed once per node.
+
+        """
+        super()._recompute()
+        under_scene = {None: False, self._head_fnode: False}  # node -> whether it or an fancestor is a scene
+        scenes = []
+        for node in self._all:
+            if node.tag != NodeTags.Foundational:
+                continue
+            path = []
+            current = node
+            while current not in under_scene:
+                under_scene[current] = False  # guard against cycles of fparents
+                path.append(current)
+                current = current.fparent
+            above = under_scene[current]
+            for current in reversed(path):
+                above = under_scene[current] = above or current.is_scene()
+            if node.is_scene() and not under_scene[node.fparent]:
+                scenes.append(node)
+        self._scenes = core._SortedList(self._orderkey, scenes)
+        self._linkages = core._SortedList(self._orderkey, (
+            node for node in self._all if node.tag == NodeTags.Linkage and node.outgoing and
+            all(fnode in self._scenes for fnode in node.arguments)))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_spans"], state["_spans_version"] = {}, None  # derived data, recomputed on demand
+        return state
+
+    def _clone(self, root, nodes):
+        other = super()._clone(root, nodes)
+        other._spans = {}
+        other._spans_version = None
+        other._scenes = self._scenes._clone(nodes)
+        other._linkages = self._linkages._clone(nodes)
+        other._head_fnode = nodes[id(self._head_fnode)]
+        return other
+
     def _add_edge(self, edge):
         super()._add_edge(edge)
-        self._update_edge(edge)
+        if not self._root._bulk:
+            self._update_edge(edge)
 
     def _remove_edge(self, edge):
         super()._remove_edge(edge)
-        self._update_edge(edge)
+        if not self._root._bulk:
+            self._update_edge(edge)
 
     def _change_edge_tag(self, edge, old_tag):
         super()._change_edge_tag(edge, old_tag)
-        self._update_edge(edge)
+        if not self._root._bulk:
+            self._update_edge(edge)
@@ -0,0 +1,193 @@
+"""Per-node values of a :class:`core`.Passage, stored in NumPy arrays.
+
+Every Node receives a dense integer index when it is created
+(:attr:`core.Node.index`), smaller than :attr:`core.Passage.node_count`.
+A :class:`NodeArray` stores one value per node index, so that per-node
+bookkeeping in algorithms can be done with array operations instead of dicts
+and sets keyed by Node objects, e.g.::
+
+    start, end = terminal_spans(passage)
+    lengths = end.values - start.values + 1
+
+The functions in this module compute common per-node properties this way,
+one array operation per level of the graph rather than one dict operation per
+node. Indices of Nodes which were removed from the Passage are not reused, and
+their entries keep the fill value.
+
+"""
+
+import numpy as np
+
+from ucca import core, layer0, traversal
+
+
+class NodeArray:
+    """Array of values indexed by the :class:`core`.Node objects of a Passage.
+
+    Can be indexed by a single Node, returning its value, or by a sequence of
+    Nodes, returning an array of their values. Nodes added to the Passage
+    after the array was created are supported too: the array grows on demand,
+    with the fill value.
+
+    Attributes:
+        passage: the Passage whose Nodes are indexed
+        values: NumPy array with an entry (or sub-array, for non-scalar shape)
+            per node index
+        fill: the value of entries which were not set
+
+    """
+
+    def __init__(self, passage, dtype=np.int64, fill=0, shape=()):
+        """Creates a NodeArray with all entries set to the fill value.
+
+        :param passage: the Passage whose Nodes are indexed
+        :param dtype: NumPy data type of the values
+        :param fill: initial value of all entries
+        :param shape: shape of the value of each node, scalar by default
+
+        """
+        self.passage = passage
+        self.fill = fill
+        self.values = np.full((passage.node_count,) + tuple(shape), fill, dtype=dtype)
+
+    def _indices(self, nodes):
+        if len(self.values) < self.passage.node_count:
+            grown = np.full((self.passage.node_count,) + self.values.shape[1:], self.fill, dtype=self.values.dtype)
+            grown[:len(self.values)] = self.values
+            self.values = grown
+        if isinstance(nodes, core.Node):
+            return nodes.index
+        return np.fromiter((node.index for node in nodes), dtype=np.int64)
+
+    def __getitem__(self, nodes):
+        indices = self._indices(nodes)  # may replace self.values
+        return self.values[indices]
+
+    def __setitem__(self, nodes, value):
+        indices = self._indices(nodes)
+        self.values[indices] = value
+
+    def __len__(self):
+        return len(self.values)
+
+    def items(self):
+        """Iterates pairs of (Node, value) for all Nodes in the Passage."""
+        self._indices(())
+        for node in self.passage.nodes.values():
+            yield node, self.values[node.index]
+
+
+class NodeProperty(NodeArray):
+    """:class:`NodeArray` of the values of a function of each Node in the Passage."""
+
+    def __init__(self, passage, function, dtype=np.int64, fill=0):
+        """Computes the function for every Node in the Passage.
+
+        :param passage: the Passage whose Nodes are indexed
+        :param function: function taking a Node and returning its value
+        :param dtype: NumPy data type of the values
+        :param fill: value of the entries of removed Nodes
+
+        """
+        super().__init__(passage, dtype=dtype, fill=fill)
+        nodes = list(passage.nodes.values())
+        self[nodes] = np.array([function(node) for node in nodes], dtype=dtype)
+
+
+def edge_arrays(passage, edge_filter=None):
+    """Returns the parent and child node indices of all the edges of a Passage.
+
+    :param passage: the Passage whose edges to list
+    :param edge_filter: function returning whether to include a given Edge, or None to include all
+
+    :return: two NumPy arrays, of the parent and child node index of each edge
+
+    """
+    edges = [(node.index, edge.child.index) for node in passage.nodes.values() for edge in node
+             if edge_filter is None or edge_filter(edge)]
+    parents, children = np.array(edges, dtype=np.int64).reshape(-1, 2).T
+    return parents, children
+
+
+def _present(passage):
+    """Returns a boolean array of which node indices belong to Nodes in the Passage."""
+    present = np.zeros(passage.node_count, dtype=np.bool_)
+    present[[node.index for node in passage.nodes.values()]] = True
+    return present
+
+
+def depth(passage, edge_filter=traversal.is_primary):
+    """Computes the depth of every Node: the length of the shortest path to it from a Node with no parents.
+
+    :param passage: the Passage whose Nodes to compute the depth of
+    :param edge_filter: function returning whether to follow a given Edge (primary edges by default)
+
+    :return: NodeArray of depths, -1 for Nodes which are not reachable from a Node with no parents (i.e., on a cycle)
+
+    """
+    parents, children = edge_arrays(passage, edge_filter)
+    result = NodeArray(passage, fill=-1)
+    has_parent = np.zeros(passage.node_count, dtype=np.bool_)
+    has_parent[children] = True
+    frontier = _present(passage) & ~has_parent
+    level = 0
+    while frontier.any():
+        result.values[frontier] = level
+        reached = np.zeros(passage.node_count, dtype=np.bool_)
+        reached[children[frontier[parents]]] = True
+        frontier = reached & (result.values < 0)
+        level += 1
+    return result
+
+
+def terminal_spans(passage, edge_filter=traversal.is_primary):
+    """Computes the positions of the first and last Terminal under every Node.
+
+    :param passage: the Passage whose Nodes to compute the spans of
+    :param edge_filter: function returning whether to follow a given Edge (primary edges by default)
+
+    :return: pair of NodeArrays, of start and end positions, -1 for Nodes with no Terminals under them
+
+    """
+    parents, children = edge_arrays(passage, edge_filter)
+    start, end = NodeArray(passage, fill=-1), NodeArray(passage, fill=-1)
+    try:
+        terminals = passage.layer(layer0.LAYER_ID).all
+    except KeyError:
+        terminals = []
+    start[terminals] = end[terminals] = [terminal.position for terminal in terminals]
+    no_terminals = np.iinfo(np.int64).max
+    start.values[start.values < 0] = no_terminals
+    while True:  # each iteration extends the spans by one level up
+        new_start, new_end = start.values.copy(), end.values.copy()
+        np.minimum.at(new_start, parents, start.values[children])
+        np.maximum.at(new_end, parents, end.values[children])
+        if np.array_equal(new_start, start.values) and np.array_equal(new_end, end.values):
+            break
+        start.values, end.values = new_start, new_end
+    start.values[start.values == no_terminals] = -1
+    return start, end
+
+
+def reachable(passage, nodes, edge_filter=traversal.is_primary):
+    """Computes which Nodes are under the given Nodes (inclusive).
+
+    For example, scene membership is ``reachable(passage, layer1_scenes)``.
+
+    :param passage: the Passage of the Nodes
+    :param nodes: the Nodes to start from
+    :param edge_filter: function returning whether to follow a given Edge (primary edges by default)
+
+    :return: boolean NodeArray
+
+    """
+    parents, children = edge_arrays(passage, edge_filter)
+    result = NodeArray(passage, dtype=np.bool_, fill=False)
+    result[nodes] = True
+    frontier = result.values.copy()
+    while frontier.any():
+        reached = np.zeros(passage.node_count, dtype=np.bool_)
+        reached[children[frontier[parents]]] = True
+        frontier = reached & ~result.values
+        result.values |= frontier
+    return result
@@ -1,4 +1,4 @@
-from ucca import layer0, layer1
+from ucca import core, layer0, layer1
 from ucca.layer0 import NodeTags as L0Tags
 from ucca.layer1 import EdgeTags as ETags, NodeTags as L1Tags
 
@@ -45,7 +45,7 @@ def copy_edge(edge, parent=None, child=None, tag=None, attrib=None):
     if child is None:
         child = edge.child
     if not tag:
-        categories = [(c.tag, c.slot, c.layer, c.parent) for c in edge.categories]
+        categories = [core.category_key(c) for c in edge.category_ids]
     else:
         categories = [(tag,)]
     if attrib is None:
@@ -241,7 +241,7 @@ def normalize_node(node, l1, extra):
             replace_edge_tags(node)
             move_scene_elements(node)
             move_sub_scene_elements(node)
-        separate_scenes(node, l1, top_level=node in l1.heads)
+        separate_scenes(node, l1, top_level=node in l1.heads_view)
         node = flatten_centers(node)
         if node is None:
             return
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from ucca import layer0, layer1
+from .conftest import l1_passage, PASSAGES
+
+"""Tests the compact module functionality and correctness."""
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_roundtrip(create):
+    p = create()
+    p.frozen = True
+    p2 = p.to_compact().to_passage()
+    assert p.equals(p2, ordered=True)
+    assert p2.frozen
+    for layer in p.layers:
+        assert [x.ID for x in layer.all] == [x.ID for x in p2.layer(layer.ID).all]
+        assert [x.ID for x in layer.heads] == [x.ID for x in p2.layer(layer.ID).heads]
+    assert [x.extra for x in p.layer(layer0.LAYER_ID).all] == [x.extra for x in p2.layer(layer0.LAYER_ID).all]
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_queries(create):
+    p = create()
+    compact = p.to_compact()
+    assert len(compact) == len(p.nodes)
+    for i, ID in enumerate(compact.node_ids):
+        node = p.by_id(ID)
+        assert compact.index(ID) == i
+        assert compact.tag(i) == node.tag
+        assert [compact.node_ids[j] for j in compact.children(i)] == [x.ID for x in node.children]
+        assert [compact.node_ids[j] for j in compact.parents(i)] == [x.ID for x in node.parents]
+        assert compact.tags(i) == [e.tag for e in node]
+        if node.layer.ID == layer0.LAYER_ID:
+            assert compact.position[i] == node.position
+            assert compact.texts[i] == node.text
+            assert compact.paragraph[i] == node.paragraph
+            assert compact.terminal_span(i) == (node.position, node.position)
+        elif node.tag == layer1.NodeTags.Foundational:
+            assert compact.terminal_span(i) == (node.start_position, node.end_position)
+            fparent = compact.fparent[i]
+            assert (compact.node_ids[fparent] if fparent >= 0 else None) == (node.fparent and node.fparent.ID)
+
+
+def test_arrays():
+    p = l1_passage()
+    compact = p.to_compact()
+    edges = [e for n in p.layer(layer1.LAYER_ID).all for e in n]
+    remote_tags = np.bincount(compact.edge_tag[compact.remote], minlength=len(compact.edge_tags))
+    assert {compact.edge_tags[code]: count for code, count in enumerate(remote_tags) if count} == \
+        {e.tag: sum(1 for x in edges if x.attrib.get("remote") and x.tag == e.tag)
+         for e in edges if e.attrib.get("remote")}
+    assert compact.implicit.sum() == sum(1 for n in p.layer(layer1.LAYER_ID).all if n.attrib.get("implicit"))
+    with pytest.raises(ValueError):
+        compact.child[0] = 0  # read-only
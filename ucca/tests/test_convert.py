@@ -1,7 +1,9 @@
 import xml.etree.ElementTree as ETree
 
+import pytest
+
 from ucca import layer0, layer1, convert, textutil
-from .conftest import loaded, load_xml
+from .conftest import loaded, load_xml, PASSAGES
 
 """Tests convert module correctness and API."""
 
@@ -201,3 +203,33 @@ def test_to_site():
     root = convert.to_site(passage)
     copy = convert.from_site(root)
     assert passage.equals(copy)
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_arrays(create):
+    passage = create()
+    arrays = convert.to_arrays(passage)
+    copy = convert.from_arrays(*arrays, passage_id=passage.ID)
+    assert passage.equals(copy)
+    assert convert.to_arrays(copy) == arrays
+
+
+@pytest.mark.parametrize("edges", [
+    [(0, 1, layer1.EdgeTags.Terminal, False)],  # out of a Terminal
+    [(1, 1, layer1.EdgeTags.Center, False)],  # into the head
+    [(1, 2, layer1.EdgeTags.Center, False), (2, 2, layer1.EdgeTags.Center, False)],  # two primary parents
+    [(2, 3, layer1.EdgeTags.Center, False), (3, 2, layer1.EdgeTags.Center, False)],  # cycle
+    [(1, 2, layer1.EdgeTags.Center, True)],  # only a remote parent
+    [(1, 2, layer1.EdgeTags.Center, False), (1, 3, layer1.EdgeTags.Center, False),
+     (2, 4, layer1.EdgeTags.Terminal, False)],  # out of range
+])
+def test_from_arrays_invalid(edges):
+    texts = ["word"]
+    node_types = [layer0.NodeTags.Word, layer1.NodeTags.Foundational, layer1.NodeTags.Foundational,
+                  layer1.NodeTags.Foundational]
+    passage = convert.from_arrays(texts, node_types, [(1, 2, layer1.EdgeTags.Center, False),
+                                                      (2, 0, layer1.EdgeTags.Terminal, False),
+                                                      (1, 3, layer1.EdgeTags.Participant, False)])
+    assert [n.attrib.get("implicit", False) for n in passage.layer(layer1.LAYER_ID).all] == [False, False, True]
+    with pytest.raises(ValueError):
+        convert.from_arrays(texts, node_types, edges)
@@ -1,9 +1,13 @@
 """Testing code for the ucca package, unit-testing only."""
 
+import gc
+import pickle
+import weakref
+
 import pytest
 
-from ucca import core, layer0, layer1
-from .conftest import basic, PASSAGES
+from ucca import core, layer0, layer1, convert, diffutil
+from .conftest import basic, l1_passage, PASSAGES
 
 
 def test_creation():
@@ -162,6 +166,133 @@ def test_copying(create):
     p2 = p1.copy([l0id])
     assert (p1.layer(l0id).equals(p2.layer(l0id)))
 
+    p2 = p1.copy()
+    assert p1.equals(p2, ordered=True) and p1.categories == p2.categories
+    for layer in p1.layers:
+        other = p2.layer(layer.ID)
+        assert type(layer) is type(other)
+        assert [x.ID for x in layer.all] == [x.ID for x in other.all]
+        assert [x.ID for x in layer.heads] == [x.ID for x in other.heads]
+        for node in layer.all:
+            copy = p2.by_id(node.ID)
+            assert copy is not node and copy.root is p2 and copy.layer is other
+            assert [(e.tag, e.child.ID) for e in node] == [(e.tag, e.child.ID) for e in copy]
+            assert all(e.parent is copy and e.root is p2 for e in copy) and node.extra == copy.extra
+    l1 = p2.layer(layer1.LAYER_ID)
+    assert [x.ID for x in p1.layer(layer1.LAYER_ID).top_scenes] == [x.ID for x in l1.top_scenes]
+
+    # Modifying the copy does not affect the original
+    if l1.top_scenes:
+        scene = l1.top_scenes[0]
+        l1.add_fnode(scene, layer1.EdgeTags.Adverbial).extra["remarks"] = "new"
+        scene.attrib["test"] = True
+        assert not p1.equals(p2)
+        assert len(p1.by_id(scene.ID)) == len(scene) - 1 and not p1.by_id(scene.ID).attrib.get("test")
+
+
+def test_copying_shared_attrib():
+    p1 = l1_passage()
+    node1 = p1.layer(layer1.LAYER_ID).add_fnode(None, layer1.EdgeTags.Function, implicit=True)
+    p2 = p1.copy(share_attrib=True)
+    p3 = p1.copy([layer0.LAYER_ID], share_attrib=True)
+    assert p1.equals(p2) and p1.layer(layer0.LAYER_ID).equals(p3.layer(layer0.LAYER_ID))
+    assert [n.ID for n in p3.nodes.values()] == [n.ID for n in p1.layer(layer0.LAYER_ID).all]
+    terminal1, terminal2 = [p.layer(layer0.LAYER_ID).all[0] for p in (p1, p2)]
+    assert terminal1._attrib._dict is terminal2._attrib._dict  # shared until modified
+    node2 = p2.by_id(node1.ID)
+    node2.attrib["implicit"] = False
+    node1.attrib["test"] = True
+    assert node1.attrib.copy() == {"implicit": True, "test": True} and node2.attrib.copy() == {"implicit": False}
+    p2 = pickle.loads(pickle.dumps(p2))
+    assert p2.layer(layer0.LAYER_ID).all[0].text == terminal1.text and not p2.by_id(node1.ID).attrib["implicit"]
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_fork(create):
+    p1 = create()
+    p1.frozen = True
+    p2 = p1.fork()
+    assert p1.equals(p2, ordered=True) and not p2.frozen
+    l1 = p2.layer(layer1.LAYER_ID)
+    for node in l1.all:
+        if node.tag == layer1.NodeTags.Foundational and node.fparent is not None:
+            node.fparent.remove(node)
+            l1.heads[0].add(layer1.EdgeTags.Function, node)
+            node.attrib["implicit"] = True
+            break
+    else:
+        return
+    assert not p1.equals(p2)
+    original = p1.by_id(node.ID)
+    assert original.fparent is not None and not original.attrib.get("implicit")
+
+
+def _assert_same(p1, p2):
+    assert p1.equals(p2, ordered=True) and p1.attrib.copy() == p2.attrib.copy()
+    for layer in p1.layers:
+        other = p2.layer(layer.ID)
+        assert layer.attrib.copy() == other.attrib.copy()
+        assert [x.ID for x in layer.all] == [x.ID for x in other.all]
+        assert [x.ID for x in layer.heads] == [x.ID for x in other.heads]
+    assert {n.ID: n.index for n in p1.nodes.values()} == {n.ID: n.index for n in p2.nodes.values()}
+    l1, other_l1 = p1.layer(layer1.LAYER_ID), p2.layer(layer1.LAYER_ID)
+    assert [x.ID for x in l1.top_scenes] == [x.ID for x in other_l1.top_scenes]
+    assert [x.ID for x in l1.top_linkages] == [x.ID for x in other_l1.top_linkages]
+
+
+def _mutate(p):
+    p.attrib["changed"] = True
+    l1 = p.layer(layer1.LAYER_ID)
+    scene = l1.add_fnode(None, layer1.EdgeTags.ParallelScene)
+    l1.add_fnode(scene, layer1.EdgeTags.Process).attrib["implicit"] = True
+    for node in l1.all:
+        if node.tag == layer1.NodeTags.Foundational and node.fparent is not None and len(node):
+            node.attrib["implicit"] = True
+            node[0].tag = "X"
+            node[0].add("Y")
+            node.fparent.remove(node)
+            node.destroy()
+            break
+    for terminal in p.layer(layer0.LAYER_ID).all[:1]:
+        terminal.destroy()
+    return scene
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_transaction(create):
+    p1 = create()
+    p2 = p1.copy()
+    with pytest.raises(ZeroDivisionError):
+        with p1.transaction():
+            _mutate(p1)
+            assert not p1.equals(p2)
+            1 / 0
+    _assert_same(p1, p2)
+    assert p1.journal is None
+
+    # The journal records the changes, including the reverting ones, in order
+    journal = p1.start_journal()
+    with p1.transaction() as transaction:
+        scene = _mutate(p1)
+        changes = transaction.changes
+        assert changes[1] == ("add_node", scene) and changes[0][:2] == ("attrib", p1)
+        touched = journal.touched()
+        assert scene in touched and all(x in touched for x in scene.parents)
+        with p1.transaction() as nested:
+            scene.tag = "x"
+            nested.rollback()
+        assert scene.tag == layer1.NodeTags.Foundational
+        for edge in scene.incoming[:1]:
+            tags = edge.tags
+            with p1.transaction() as nested:
+                edge.categories = [core.Category("Z"), core.Category("Y")]
+                assert edge.tags == ["Z", "Y"]
+                nested.rollback()
+            assert edge.tags == tags
+        transaction.rollback()
+    _assert_same(p1, p2)
+    assert len(journal) > 2 * len(changes) and p1.stop_journal() is journal and p1.journal is None
+
 
 def test_iteration():
     p = basic()
@@ -177,3 +308,223 @@ def test_iteration():
     assert list(node21.iter(duplicates=True)) == [node21, node11, node12, node13, node11]
     assert list(node21.iter()) == [node21, node11, node12, node13]
     assert list(node22.iter(method="bfs", duplicates=True)) == [node22, node11, node12, node13, node13, node11]
+
+
+def test_ordering():
+    p = basic()
+    l1 = p.layer("1")
+    node11, node12, node13 = l1.all
+    node22, node21 = p.layer("2").all
+
+    # node12 orders its edges by tag, so changing a tag should re-order them
+    assert node12.children == [node13, node11]
+    node12[0].tag = "test3"
+    assert node12.children == [node11, node13]
+    assert node12.incoming[0] in node12._incoming
+
+    # Ordering and membership should survive pickling
+    p = pickle.loads(pickle.dumps(l1_passage()))
+    l1 = p.layer(layer1.LAYER_ID)
+    ps1 = l1.top_scenes[0]
+    node = l1.add_fnode(ps1, layer1.EdgeTags.Adverbial)
+    assert l1.all[-1] is node and node not in l1.heads
+    ps1.remove(node)
+    assert node in l1.heads
+    assert l1.heads == sorted(l1.heads, key=l1.orderkey)
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_bulk_build(create):
+    p1 = create()
+    p2 = convert.from_standard(convert.to_standard(p1))  # built in bulk
+    assert p1.equals(p2)
+    assert p1.categories == p2.categories
+    for layer in p1.layers:
+        other = p2.layer(layer.ID)
+        assert [x.ID for x in layer.all] == [x.ID for x in other.all]
+        assert [x.ID for x in layer.heads] == [x.ID for x in other.heads]
+    l1, other_l1 = p1.layer(layer1.LAYER_ID), p2.layer(layer1.LAYER_ID)
+    assert [x.ID for x in l1.top_scenes] == [x.ID for x in other_l1.top_scenes]
+    assert [x.ID for x in l1.top_linkages] == [x.ID for x in other_l1.top_linkages]
+
+    # Derived state is recomputed on demand within the block as well
+    with p2.bulk_build():
+        node = other_l1.add_fnode(None, layer1.EdgeTags.ParallelScene)
+        assert node not in other_l1.heads
+        other_l1.add_fnode(node, layer1.EdgeTags.Process)
+    assert node in other_l1.top_scenes
+
+    p2.frozen = True
+    with pytest.raises(core.FrozenPassageError):
+        with p2.bulk_build():
+            pass
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_views(create):
+    p = create()
+    views = [(p.nodes_view, p.nodes)]
+    for layer in p.layers:
+        views += [(layer.all_view, layer.all), (layer.heads_view, layer.heads)]
+    for node in p.nodes.values():
+        views += [(node.incoming_view, list(node.incoming)), (node.outgoing_view, list(node.outgoing))]
+    for view, expected in views:
+        assert view.valid and len(view) == len(expected) and list(view) == list(expected)
+        assert all(x in view for x in expected) and view == expected
+    l1 = p.layer(layer1.LAYER_ID)
+    heads = l1.heads_view
+    assert all((node in heads) == (node in l1.heads) for node in l1.all_view)
+    iterator = iter(l1.all_view)
+    version = p.version
+    if l1.heads:
+        next(iterator)
+        l1.add_fnode(l1.heads[0], layer1.EdgeTags.Function)
+        assert p.version > version and not any(view.valid for view, _ in views)
+        with pytest.raises(core.StaleViewError):
+            len(heads)
+        with pytest.raises(core.StaleViewError):
+            next(iterator)
+        assert list(l1.all_view) == l1.all and set(p.nodes_view) == set(p.nodes)
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_close(create):
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with create() as p:
+            p.frozen = True
+            assert p.layer(layer1.LAYER_ID).all
+            ref = weakref.ref(p)
+        assert not p.nodes and not list(p.layers)
+        del p
+        assert ref() is None  # freed by reference counting
+        assert gc.collect() == 0  # no cyclic garbage left
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def test_slots():
+    p = l1_passage()
+    l0, l1 = p.layer(layer0.LAYER_ID), p.layer(layer1.LAYER_ID)
+    for element in l0.all + l1.all + [e for n in l1.all for e in n] + [c for n in l1.all for e in n for c in e]:
+        assert not hasattr(element, "__dict__")
+
+    # Empty attributes are shared until first written to, but never across elements
+    node1, node2 = l1.add_fnode(None, layer1.EdgeTags.Function), l1.add_fnode(None, layer1.EdgeTags.Function)
+    node1.attrib["implicit"] = True
+    node1.extra["remarks"] = "a"
+    assert node1.attrib.get("implicit") and not node2.attrib.get("implicit")
+    assert node1.extra == {"remarks": "a"} and node2.extra == {}
+    p.frozen = True
+    with pytest.raises(core.FrozenPassageError):
+        node2.attrib["implicit"] = True
+
+    p = pickle.loads(pickle.dumps(p))
+    node1, node2 = p.by_id(node1.ID), p.by_id(node2.ID)
+    assert node1.attrib.get("implicit") and not node2.attrib.get("implicit")
+    assert node1.extra == {"remarks": "a"} and node2.extra == {}
+
+
+def test_categories():
+    p1, p2 = l1_passage(), l1_passage()
+    edges1, edges2 = [[e for n in p.layer(layer1.LAYER_ID).all for e in n] for p in (p1, p2)]
+    for edge1, edge2 in zip(edges1, edges2):
+        assert edge1.category_ids == edge2.category_ids and edge1.tag_id == edge2.tag_id == core.tag_id(edge1.tag)
+        assert core.tag_by_id(edge1.tag_id) == edge1.tag and edge1.categories == edge2.categories
+    assert p1.category_ids == {c for e in edges1 for c in e.category_ids}
+    assert set(p1.categories) == {e.tag for e in edges1}
+
+    edge = edges1[0]
+    category = edge.categories[0]
+    with pytest.raises(AttributeError):  # categories are immutable values
+        category.tag = "X"
+    with pytest.raises(AttributeError):
+        category.extra = {}
+    assert category == core.Category(edge.tag) and pickle.loads(pickle.dumps(category)) == category
+    version = p1.version
+    edge.add("Y", parent=edge.tag)
+    assert p1.version > version
+    edge.tag = "Z"
+    assert edge.tags == ["Z", "Y"] and edge[1].parent == core.category_key(edge.category_ids[1])[3] != ""
+    assert {"Z", "Y"} <= set(p1.categories) and edge[1].parent in p1.refined_categories
+    assert core.category_id("Y", parent=edge[1].parent) in p1.category_ids
+    p3 = pickle.loads(pickle.dumps(p1))
+    assert p3.by_id(edge.parent.ID)[0].tags == ["Z", "Y"] and p3.category_ids == p1.category_ids
+    p1.frozen = True
+    with pytest.raises(core.FrozenPassageError):
+        edge.categories = [core.Category("X")]
+    assert edge.tags == ["Z", "Y"]
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_structural_hash(create):
+    p1 = create()
+    p2 = convert.from_standard(convert.to_standard(p1))
+    assert p1.structural_hash() == p2.structural_hash()
+    assert p1.equals(p2, verify=True)
+    for node in p1.nodes.values():
+        other = p2.by_id(node.ID)
+        assert node.structural_hash() == other.structural_hash()
+        assert node.structural_hash(ordered=True) == other.structural_hash(ordered=True)
+
+    # Hashes are cached while frozen, and recomputed after modification
+    if p1.layers and p1.layer(layer0.LAYER_ID).all:
+        p1.frozen = True
+        frozen_hash = p1.structural_hash()
+        assert frozen_hash == p1.structural_hash() == p2.structural_hash()
+        p1.frozen = False
+        terminal = p1.layer(layer0.LAYER_ID).all[0]
+        terminal.extra["x"] = 1  # extra is not part of equality
+        assert p1.structural_hash() == frozen_hash
+        l1 = p1.layer(layer1.LAYER_ID)
+        l1.add_fnode(None, layer1.EdgeTags.Function).add(layer1.EdgeTags.Terminal, terminal)
+        assert p1.structural_hash() != frozen_hash
+        assert not p1.equals(p2)
+
+
+def test_equals_shared_subgraphs():
+    # Each level refers twice to the one below, so there are 2^depth paths from the top
+    def create(depth, tag="x"):
+        p = core.Passage("1")
+        core.Layer("1", p)
+        nodes = [core.Node("1.%d" % i, p, tag=tag if i == depth else "") for i in range(depth + 1)]
+        for parent, child in zip(nodes, nodes[1:]):
+            parent.add("a", child)
+            parent.add("b", child)
+        return p, nodes[0]
+
+    (p1, top1), (p2, top2), (p3, top3) = create(60), create(60), create(60, tag="y")
+    assert top1.equals(top2, verify=True) and p1.equals(p2, verify=True)
+    assert top1.structural_hash() == top2.structural_hash() != top3.structural_hash()
+    assert not (top1.equals(top3, verify=True) or p1.equals(p3))
+    p1.frozen = True
+    assert pickle.loads(pickle.dumps(p1)).structural_hash() == p1.structural_hash()
+
+
+def test_missing(tmp_path, monkeypatch):
+    p1 = l1_passage()
+    p2 = convert.join_passages([p1], remarks=True)
+    assert not p1.missing_nodes(p2) and not p2.missing_nodes(p1)
+    head1, head2 = [p.layer(layer1.LAYER_ID).heads[0] for p in (p1, p2)]
+    assert not head1.missing_edges(head2)
+
+    # The new node and all of its ancestors are missing from the original passage
+    scene = p2.layer(layer1.LAYER_ID).top_scenes[0]
+    node = p2.layer(layer1.LAYER_ID).add_fnode(scene, layer1.EdgeTags.Adverbial, implicit=True)
+    node.attrib["new"] = True
+    node.extra["remarks"] = "new"
+    ancestors = [n for n in p2.nodes.values() if any(x is node for x in n.iter())]
+    assert len(ancestors) > 2
+    assert p2.missing_nodes(p1) == sorted(ancestors, key=core.id_orderkey)
+    assert p1.missing_nodes(p2) == sorted([p1.by_id(n.extra["remarks"]) for n in ancestors if n is not node],
+                                          key=core.id_orderkey)
+    assert [e.child for e in scene.missing_edges(p1.by_id(scene.extra["remarks"]))] == [node]
+    assert not p2.missing_nodes(p1, ignore_node=lambda n: n.attrib.get("new"))
+
+    monkeypatch.chdir(tmp_path)
+    diff = diffutil.diff_passages(p1, p2)
+    assert "Mistake edges: %s->%s" % (layer1.EdgeTags.Adverbial, node.ID) in diff
+    assert "Mistake nodes: new" in diff
@@ -318,10 +318,12 @@ def test_evaluate_self(create, units, errors, normalize):
 def test_evaluate(create1, create2, f1, units, errors):
     p1 = create1()
     p2 = create2()
+    originals = [p.copy() for p in (p1, p2)]
     validation_errors_before = [list(validate(p, linkage=False)) for p in (p1, p2)]
     scores = evaluate(p1, p2, units=units, errors=errors)
     validation_errors_after = [list(validate(p, linkage=False)) for p in (p1, p2)]
     for before, after in zip(validation_errors_before, validation_errors_after):
         if not before:
             assert not after
+    assert all(p.equals(original, ordered=True) for p, original in zip((p1, p2), originals))  # normalized forks
     check_primary_remote(scores, f1)
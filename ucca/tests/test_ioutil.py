@@ -1,10 +1,11 @@
 import os
 import pytest
 import random
+import sys
 from glob import glob
 
-from ucca import layer0, layer1, convert, ioutil, diffutil
-from .conftest import loaded, multi_sent, discontiguous, l1_passage
+from ucca import core, layer0, layer1, convert, ioutil, diffutil, textutil
+from .conftest import loaded, loaded_valid, multi_sent, discontiguous, l1_passage
 
 """Tests the ioutil module functions and classes."""
 
@@ -62,6 +63,54 @@ def test_split_join_paragraphs(create):
     assert p.equals(copy)
 
 
+@pytest.mark.parametrize("create", (loaded, loaded_valid, multi_sent, discontiguous, l1_passage))
+def test_passage_view(create):
+    p = create()
+    ends = textutil.break2sentences(p)
+    split = convert.split_passage(p, ends, remarks=True)
+    for start, end, other in zip([0] + ends[:-1], ends, split):
+        view = convert.PassageView(p, start, end)
+        assert [t.ID for t in view.layer(layer0.LAYER_ID).all] == \
+            [t.extra["remarks"] for t in other.layer(layer0.LAYER_ID).all] == [t.ID for t in view.get_terminals()]
+        assert len(view.layer(layer1.LAYER_ID).heads) == len(other.layer(layer1.LAYER_ID).heads)
+        copied = {n.extra["remarks"]: n for layer in other.layers for n in layer.all if "remarks" in n.extra}
+        assert {n.ID for layer in view.layers for n in layer.all} == set(copied)
+        for ID, node in copied.items():
+            assert view.by_id(ID) is p.by_id(ID)
+            if node.tag == layer1.NodeTags.Foundational:
+                terminals = [t.extra["remarks"] for t in node.get_terminals()]
+                assert [t.ID for t in view.get_terminals(p.by_id(ID))] == terminals
+            # Edges between copied nodes are the same (the nodes split_passage creates rather than copies are left out)
+            assert {(e.tag, e.child.ID) for e in view.outgoing(p.by_id(ID))} == \
+                {(e.tag, e.child.extra["remarks"]) for e in node if "remarks" in e.child.extra}
+    view = convert.PassageView(p, 0, ends[0])
+    p.layer(layer1.LAYER_ID).add_fnode(None, layer1.EdgeTags.Function)
+    with pytest.raises(core.StaleViewError):
+        view.layer(layer1.LAYER_ID).all
+
+
+def test_passage_view_cost():
+    """Tests that the cost of creating a PassageView depends on the length of its range, not of the passage."""
+    def calls(num_copies):
+        p = convert.join_passages([l1_passage() for _ in range(num_copies)])
+        length = len(p.layer(layer0.LAYER_ID).all) // num_copies
+        convert.PassageView(p, 0, length)  # derived data of the whole passage is computed once
+        count = 0
+
+        def profile(frame, event, arg):
+            nonlocal count
+            count += event == "call"
+        sys.setprofile(profile)
+        try:
+            convert.PassageView(p, 0, length)
+            convert.PassageView(p, len(p.layer(layer0.LAYER_ID).all) - length, len(p.layer(layer0.LAYER_ID).all))
+        finally:
+            sys.setprofile(None)
+        return count
+
+    assert calls(1) == calls(2) == calls(16)
+
+
 def _test_passages(passages):
     for passage in passages:
         assert passage.layer(layer0.LAYER_ID).all, "No terminals in passage " + passage.ID
@@ -1,4 +1,9 @@
-from ucca import core, layer0
+import pickle
+
+import numpy as np
+import pytest
+
+from ucca import convert, core, layer0, textutil
 
 """Tests module layer0 functionality."""
 
@@ -60,3 +65,114 @@ def test_layer0():
     assert [x[0] for x in l0.pairs] == [1, 2, 3]
     assert [t.para_pos for t in l0.all] == [1, 1, 2]
     assert l0.words == (t1, t3)
+
+
+def test_columns():
+    p = core.Passage("1")
+    l0 = layer0.Layer0(p)
+    l0.add_terminal(text="a", punct=False)
+    l0.add_terminal(text=",", punct=True)
+    layer0.Terminal(ID=(layer0.LAYER_ID, 3), root=p, tag=layer0.NodeTags.Word,
+                    attrib={"text": "b", "paragraph": 2, "paragraph_position": 1, "extra": 1})
+    for other in p, p.copy(), pickle.loads(pickle.dumps(p)):
+        layer = other.layer(layer0.LAYER_ID)
+        assert list(layer.texts()) == ["a", ",", "b"]
+        assert list(layer.punct_mask()) == [False, True, False]
+        assert list(layer.paragraphs()) == [1, 1, 2]
+        assert list(layer.para_positions()) == [1, 2, 1]
+        assert layer.all[2].attrib == {"text": "b", "paragraph": 2, "paragraph_position": 1, "extra": 1}
+
+
+def test_paragraph_index():
+    p = core.Passage("1")
+    l0 = layer0.Layer0(p)
+    assert l0.paragraph_count == 0 and l0.paragraph_ends() == []
+    terms = [l0.add_terminal(text=str(i), punct=False, paragraph=paragraph)
+             for i, paragraph in enumerate((1, 1, 2, 4, 4, 4))]
+    assert l0.paragraph_count == 3
+    assert [l0.paragraph_bounds(k) for k in (1, 2, 3)] == [(0, 2), (2, 3), (3, 6)]
+    assert l0.paragraph_terminals(3) == terms[3:]
+    assert l0.paragraph_terminals(3, 1, 2) == [terms[4]]
+    assert l0.paragraph_ends() == [2, 3, 6]
+    assert [t.para_pos for t in terms] == [1, 2, 1, 1, 2, 3]
+    with pytest.raises(IndexError):
+        l0.paragraph_bounds(4)
+    for other in p.copy(), pickle.loads(pickle.dumps(p)):
+        assert other.layer(layer0.LAYER_ID).paragraph_ends() == [2, 3, 6]
+    terms[2].destroy()  # the index is rebuilt after removal
+    assert l0.paragraph_count == 2 and l0.paragraph_ends() == [2, 5]
+
+
+def test_doc_matrix():
+    p = core.Passage("1")
+    l0 = layer0.Layer0(p)
+    terms = [l0.add_terminal(text=str(i), punct=False, paragraph=paragraph) for i, paragraph in enumerate((1, 1, 2))]
+    big = 2 ** 64 - 3  # e.g., a spaCy string hash
+    tokens = [len(textutil.Attr) * [1] for _ in terms]
+    tokens[0][textutil.Attr.ORTH.value] = big
+    tokens[0][textutil.Attr.HEAD.value] = -1
+    tokens[1][textutil.Attr.ORTH.value] = None
+    l0.set_doc(1, tokens[:2])
+    l0.set_doc(2, tokens[2:])
+    doc = l0.doc(1)
+    assert doc.dtype == np.int64 and doc.shape == (2, len(textutil.Attr)) and doc[0, 0] == big - 2 ** 64
+    assert doc[1, 0] == layer0.MISSING_ANNOTATION
+    assert terms[1].tok.base is doc and list(terms[2].tok) == tokens[2]
+    assert terms[0].get_annotation(textutil.Attr.HEAD, as_array=True) == -1
+    assert terms[1].get_annotation(textutil.Attr.ORTH, as_array=True) is None
+    for other in convert.from_standard(convert.to_standard(p)), pickle.loads(pickle.dumps(p)):
+        docs = other.layer(layer0.LAYER_ID).extra["doc"]
+        assert len(docs) == 2 and all(d.dtype == np.int64 for d in docs)
+        assert np.array_equal(docs[0], doc) and np.array_equal(docs[1], l0.doc(2))
+
+
+def test_char_offsets():
+    p = core.Passage("1")
+    l0 = layer0.Layer0(p)
+    terms = [l0.add_terminal(text=text, punct=text == ".") for text in ("Hello", "big", "world", ".")]
+    text = l0.detokenized_text()
+    assert text == "Hello big world ."
+    starts, ends = l0.char_offsets()
+    assert [text[s:e] for s, e in zip(starts, ends)] == [t.text for t in terms]
+    assert l0.char_span(1, 3) == (6, 15)
+    assert l0.terminals_in_span(7, 12) == terms[1:3]
+    assert l0.terminals_in_span(5, 6) == []  # only the separator
+    assert l0.terminal_range(0, len(text)) == (0, 4)
+    new = l0.add_terminal(text="Bye", punct=False, paragraph=2)
+    assert l0.terminals_in_span(len(text) + 1, len(text) + 2) == [new]
+
+
+def test_add_terminals():
+    texts, punct, paragraphs = ["a", ",", "b", "c", "."], [False, True, False, False, True], [1, 1, 2, 2, 3]
+    p1, p2 = core.Passage("1"), core.Passage("1")
+    l0, bulk = layer0.Layer0(p1), layer0.Layer0(p2)
+    for args in zip(texts, punct, paragraphs):
+        l0.add_terminal(*args)
+    bulk.add_terminal(texts[0], punct[0], paragraphs[0])
+    added = bulk.add_terminals(texts[1:], punct[1:], paragraphs[1:])
+    assert [t.position for t in added] == [2, 3, 4, 5] and list(bulk.all[1:]) == added
+    assert p1.equals(p2)
+    assert [t.attrib for t in l0.all] == [t.attrib for t in bulk.all]
+    assert bulk.heads == bulk.all and all(p2.by_id(t.ID) is t for t in added)
+    assert bulk.paragraph_ends() == l0.paragraph_ends() == [2, 4, 5]
+    assert list(bulk.punct_mask()) == punct
+    assert [t.attrib for t in bulk.add_terminals(["d"], [False], [3])] == [
+        {"text": "d", "paragraph": 3, "paragraph_position": 2}]
+    with pytest.raises(ValueError):
+        bulk.add_terminals(["e"], [])
+
+
+def test_token_search():
+    p = core.Passage("1")
+    l0 = layer0.Layer0(p)
+    l0.add_terminals("The cat saw the dog and the Cat ran".split(), 9 * [False])
+    assert l0.token_index()["the"] == [3, 6] and l0.token_index(lowercase=True)["the"] == [0, 3, 6]
+    assert l0.find_phrase(["the", "dog"]) == [(3, 5)]
+    assert l0.find_phrase(["the", "cat"], lowercase=True) == [(0, 2), (6, 8)]
+    assert l0.find_phrase(["the", "bird"]) == l0.find_phrase([]) == []
+    assert l0.find_subsequence(["cat", "the", "ran"]) == [(1, 9)]
+    assert l0.find_subsequence(["the", "the"], lowercase=True) == [(0, 4), (3, 7)]
+    assert l0.find_subset(["the", "cat"], lowercase=True) == [(0, 2), (1, 4), (6, 8)]
+    assert l0.find_subset(["dog", "saw", "dog"]) == [(2, 5)]
+    l0.add_terminal("dog", False)
+    assert l0.find_phrase(["ran", "dog"]) == [(8, 10)]  # the index is updated
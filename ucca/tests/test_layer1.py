@@ -1,5 +1,9 @@
-from ucca import layer1
-from .conftest import l1_passage, discontiguous
+import pickle
+
+import pytest
+
+from ucca import core, layer0, layer1
+from .conftest import l1_passage, discontiguous, PASSAGES
 
 """Tests layer1 module functionality and correctness."""
 
@@ -155,3 +159,119 @@ def test_discontiguous():
     assert ps3.get_sequences() == [(15, 17)]
     assert a3.get_sequences() == [(16, 17)]
     assert not p3.get_sequences()
+
+
+def test_frozen_cache():
+    p = l1_passage()
+    l1 = p.layer(layer1.LAYER_ID)
+    nodes = [n for n in l1.all if n.tag == layer1.NodeTags.Foundational]
+
+    def derived():
+        return [(n.get_terminals(), n.get_terminals(punct=False, remotes=True), n.start_position, n.end_position,
+                 n.discontiguous, n.fparent, n.ftag, n.parents, n.children) for n in nodes] + [l1.all, l1.heads]
+
+    expected = derived()
+    p.frozen = True
+    assert derived() == expected and p._frozen_cache
+    # Memoized lists are copied, so modifying the result does not affect later calls
+    l1.heads.clear()
+    nodes[0].get_terminals().clear()
+    nodes[0].children.clear()
+    assert derived() == expected
+    p.frozen = False
+    assert not p._frozen_cache
+    head = l1.heads[0]
+    children = head.children
+    l1.add_fnode(head, layer1.EdgeTags.Function)
+    p.frozen = True
+    assert len(head.children) == len(children) + 1
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_covering_unit(create):
+    p = create()
+    terminals = p.layer(layer0.LAYER_ID).all
+    l1 = p.layer(layer1.LAYER_ID)
+    for start in range(len(terminals)):
+        for end in range(start + 1, len(terminals) + 1):
+            span = set(terminals[start:end])
+            unit = l1.covering_unit(terminals[start:end])
+            assert unit is not None and span <= set(unit.get_terminals())
+            assert not any(span <= set(e.child.get_terminals()) for e in unit
+                           if e.child.tag == layer1.NodeTags.Foundational and not e.attrib.get("remote"))
+    if create is l1_passage:
+        assert l1.covering_unit(terminals[1:4]).ftag == layer1.EdgeTags.Process
+        assert l1.covering_unit(terminals[1:10]).ftag == layer1.EdgeTags.ParallelScene
+        assert l1.covering_unit(terminals[:2]) is l1.heads[0]
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_spans(create):
+    p = create()
+    l1 = p.layer(layer1.LAYER_ID)
+    fnodes = [n for n in l1.all if isinstance(n, layer1.FoundationalNode)]
+    for node in fnodes:
+        for punct in (True, False):
+            for remotes in (True, False):
+                recursive = node.get_terminals(punct=punct, remotes=remotes, visited=set())
+                expected = sorted({t.position: t for t in recursive}.items())
+                assert list(node.get_terminals(punct=punct, remotes=remotes)) == [t for _, t in expected]
+        positions = node.get_positions()
+        assert (node.start_position, node.end_position) == ((positions[0], positions[-1]) if positions else (-1, -1))
+        assert node.discontiguous == (len(node.get_sequences()) > 1)
+        assert [p for start, end in node.get_sequences() for p in range(start, end + 1)] == positions
+    if fnodes:  # spans are recomputed after the passage is modified
+        head = l1.heads[0]
+        before = head.get_positions()
+        terminal = p.layer(layer0.LAYER_ID).add_terminal("new", punct=False)
+        l1.add_fnode(head, layer1.EdgeTags.Function).add(layer1.EdgeTags.Terminal, terminal)
+        assert head.get_positions() == before + [terminal.position]
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_children_by_tag(create):
+    p = create()
+    l1 = p.layer(layer1.LAYER_ID)
+
+    def check(passage):
+        for node in passage.layer(layer1.LAYER_ID).all:
+            for tag in set(layer1.EdgeTags.__dict__.values()) | {"X"}:
+                expected = [e.child for e in node if tag in e.tags]
+                assert layer1._multiple_children_by_tag(node, tag) == expected
+                assert layer1._single_child_by_tag(node, tag, must=False) is (expected[0] if expected else None)
+
+    check(p)
+    terminals = p.layer(layer0.LAYER_ID).all
+    if not l1.heads or not terminals:
+        return
+    head = l1.heads[0]
+    first = l1.add_fnode(head, layer1.EdgeTags.Participant)  # after the other Edges
+    head.add(layer1.EdgeTags.Terminal, terminals[0])  # before the other Edges
+    check(p)
+    edge = next(e for e in head if e.child is first)
+    edge.tag = layer1.EdgeTags.Center
+    assert first in head.centers and first not in head.participants
+    edge.add(layer1.EdgeTags.Ground)
+    assert head.grounds == [first]
+    head.remove(edge)
+    assert first not in head.centers + head.grounds
+    check(p)
+    for other in p.copy(), pickle.loads(pickle.dumps(p)):
+        check(other)
+
+
+def test_spans_remote_attrib():
+    p = core.Passage("1")
+    l0 = layer0.Layer0(p)
+    l1 = layer1.Layer1(p)
+    terms = [l0.add_terminal(text=str(i), punct=False) for i in range(1, 5)]
+    scene = l1.add_fnode(None, layer1.EdgeTags.ParallelScene)
+    other = l1.add_fnode(None, layer1.EdgeTags.ParallelScene)
+    for terminal in terms[:2]:
+        scene.add(layer1.EdgeTags.Terminal, terminal)
+    for terminal in terms[2:]:
+        other.add(layer1.EdgeTags.Terminal, terminal)
+    edge = l1.add_remote(scene, layer1.EdgeTags.Participant, other)
+    assert scene.get_terminals() == terms[:2] and scene.end_position == 2
+    edge.attrib["remote"] = False  # spans are recomputed after an attribute changes too
+    assert scene.get_terminals() == terms and scene.end_position == 4
@@ -0,0 +1,56 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from ucca import layer0, layer1, nodearray, traversal
+from .conftest import l1_passage, PASSAGES
+
+"""Tests the nodearray module functionality and correctness."""
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_indices(create):
+    p = create()
+    indices = [node.index for node in p.nodes.values()]
+    assert sorted(indices) == list(range(p.node_count))
+    for other in p.copy(), pickle.loads(pickle.dumps(p)):
+        assert other.node_count == p.node_count
+        assert all(other.by_id(node.ID).index == node.index for node in p.nodes.values())
+
+
+def test_node_array():
+    p = l1_passage()
+    l1 = p.layer(layer1.LAYER_ID)
+    heads = l1.heads
+    array = nodearray.NodeArray(p, fill=-1)
+    assert len(array) == p.node_count and array[heads[0]] == -1
+    array[heads] = 7
+    assert list(array[heads]) == [7] * len(heads)
+    node = l1.add_fnode(heads[0], layer1.EdgeTags.Function)
+    assert node.index == len(array) and array[node] == -1  # grows on demand
+    array[node] = 3
+    assert array[node] == 3 and len(array) == p.node_count
+    node.destroy()
+    assert node.index == p.node_count - 1 and node not in [n for n, _ in array.items()]
+    tags = nodearray.NodeProperty(p, lambda n: len(n.tag), dtype=np.int8)
+    assert all(tags[n] == len(n.tag) for n in p.nodes.values())
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_properties(create):
+    p = create()
+    depth = nodearray.depth(p)
+    start, end = nodearray.terminal_spans(p)
+    l1 = p.layer(layer1.LAYER_ID)
+    scenes = [n for n in l1.all if n.tag == layer1.NodeTags.Foundational and n.is_scene()]
+    in_scene = nodearray.reachable(p, scenes)
+    under_scenes = {id(n) for n in traversal.bfs(*scenes, edge_filter=traversal.is_primary)}
+    for node in p.nodes.values():
+        parents = [e.parent for e in node.incoming if traversal.is_primary(e)]
+        assert depth[node] == (min(depth[x] for x in parents) + 1 if parents else 0)
+        if node.layer.ID == layer0.LAYER_ID:
+            assert start[node] == end[node] == node.position
+        elif node.tag == layer1.NodeTags.Foundational and node.terminals:
+            assert (start[node], end[node]) == (node.start_position, node.end_position)
+        assert in_scene[node] == (id(node) in under_scenes)
@@ -0,0 +1,74 @@
+import pytest
+
+from ucca import core, layer1, traversal
+from .conftest import basic, l1_passage, PASSAGES
+
+"""Tests the traversal module functionality and correctness."""
+
+
+def test_bfs_dfs():
+    p = basic()
+    node11, node12, node13 = p.layer("1").all
+    node22, node21 = p.layer("2").all
+    assert list(traversal.dfs(node21)) == [node21, node11, node12, node13]
+    assert list(traversal.dfs(node22, node21)) == [node22, node11, node12, node13, node21]
+    assert list(traversal.bfs(node22)) == [node22, node11, node12, node13]
+    assert list(traversal.bfs(node22, duplicates=True)) == [node22, node11, node12, node13, node13, node11]
+    assert [e.ID for e in traversal.dfs(node12, edges=True)] == ["1.2->1.3", "1.2->1.1"]
+    assert list(traversal.dfs(node12, edge_filter=lambda e: e.child is not node13)) == [node12, node11]
+
+
+def test_diamond():
+    p = core.Passage("1")
+    core.Layer("1", p)
+    top, left, right, bottom = [core.Node("1.%d" % i, p, tag="") for i in range(1, 5)]
+    top.add("", left)
+    top.add("", right)
+    left.add("", bottom)
+    right.add("", bottom)
+    for traverse in traversal.bfs, traversal.dfs:
+        nodes = list(traverse(top))
+        assert len(nodes) == len(set(nodes)) == 4
+    assert list(traversal.postorder(top)) == [bottom, left, right, top]
+    assert list(traversal.topological_order(p)) == [top, left, right, bottom]
+    bottom.add("", top)
+    assert list(traversal.postorder(top)) == [bottom, left, right, top]
+    with pytest.raises(ValueError):
+        list(traversal.topological_order(p))
+
+
+@pytest.mark.parametrize("create", PASSAGES)
+def test_orders(create):
+    p = create()
+    for edge_filter in None, traversal.is_primary:
+        order = list(traversal.topological_order(p, edge_filter=edge_filter))
+        assert len(order) == len(p.nodes)
+        position = {node.ID: i for i, node in enumerate(order)}
+        for node in order:
+            for edge in node:
+                if edge_filter is None or edge_filter(edge):
+                    assert position[node.ID] < position[edge.child.ID]
+    heads = [n for layer in p.layers for n in layer.heads]
+    done = set()
+    for node in traversal.postorder(*heads):
+        assert node.ID not in done and all(c.ID in done for c in node.children)
+        done.add(node.ID)
+
+
+def test_edge_filter():
+    p = l1_passage()
+    head = p.layer(layer1.LAYER_ID).heads[0]
+    remotes = [e for e in traversal.dfs(head, edges=True) if traversal.is_remote(e)]
+    assert remotes and all(e.attrib.get("remote") for e in remotes)
+    assert not any(e.attrib.get("remote") for e in traversal.bfs(head, edges=True, edge_filter=traversal.is_primary))
+
+
+def test_long_chain():
+    p = core.Passage("1")
+    core.Layer("1", p)
+    nodes = [core.Node("1.%d" % i, p, tag="") for i in range(1, 5001)]
+    for parent, child in zip(nodes, nodes[1:]):
+        parent.add("", child)
+    assert list(nodes[0].iter()) == nodes
+    assert list(nodes[0].iter(method="bfs")) == nodes
+    assert list(traversal.postorder(nodes[0])) == nodes[::-1]
@@ -41,6 +41,8 @@ class Attr(Enum):
             return None
         if self in (Attr.ENT_IOB, Attr.HEAD):
             return int(np.int64(value))
+        if isinstance(value, np.signedinteger):  # from a doc matrix, where unsigned IDs are stored as int64
+            value = int(value) & 0xFFFFFFFFFFFFFFFF
         if as_array:
             is_str = isinstance(value, str)
             if is_str or self in (Attr.ORTH, Attr.LEMMA):
@@ -230,9 +232,9 @@ def is_annotated(passage, as_array):
     l0 = passage.layer(layer0.LAYER_ID)
     if as_array:
         docs = l0.extra.get("doc")
-        return not l0.all or docs is not None and len(docs) == max(t.paragraph for t in l0.all) and \
+        return not l0.all or docs is not None and len(docs) == l0.paragraph_count and \
             sum(map(len, docs)) == len(l0.all) and \
-            all(i is None or isinstance(i, int) for l in docs for t in l for i in t)
+            all(isinstance(l, np.ndarray) or all(i is None or isinstance(i, int) for t in l for i in t) for l in docs)
     return all(a.key in t.extra for t in l0.all for a in Attr)
 
 
@@ -243,10 +245,18 @@ def set_docs(annotated, as_array, lang, vocab, replace, verbose):
             from spacy import attrs
             arr = doc.to_array([getattr(attrs, a.name) for a in Attr])
             if as_array:
-                docs = passage.layer(layer0.LAYER_ID).docs(i + 1)
-                existing = docs[i] + (len(arr) - len(docs[i])) * [len(Attr) * [None]]
-                docs[i] = [[a(v if e is None or replace else e, get_vocab(vocab, lang), as_array=True)
-                            for a, v, e in zip(Attr, values, es)] for values, es in zip(arr, existing)]
+                l0 = passage.layer(layer0.LAYER_ID)
+                values = layer0.doc_matrix([[a(v, get_vocab(vocab, lang), as_array=True) for a, v in zip(Attr, token)]
+                                            for token in arr])
+                existing = l0.doc(i + 1)
+                if not replace and len(existing):
+                    if not isinstance(existing, np.ndarray):  # nested lists, possibly with strings
+                        existing = layer0.doc_matrix([[a(e, get_vocab(vocab, lang), as_array=True)
+                                                       for a, e in zip(Attr, es)] for es in existing])
+                    existing = existing[:len(values)]
+                    keep = existing != layer0.MISSING_ANNOTATION
+                    values[:len(existing)][keep] = existing[keep]
+                l0.set_doc(i + 1, values)
             else:
                 for terminal, values in zip(terminals, arr):
                     for attr, value in zip(Attr, values):
@@ -313,17 +323,16 @@ def break2paragraphs(passage, return_terminals=False, *args, **kwargs):
     """
     Breaks into paragraphs according to the annotation.
 
-    Uses the `paragraph' attribute of layer 0 to find paragraphs.
+    Uses the paragraph index of layer 0 to find paragraphs.
     :param passage: the Passage object to operate on
     :param return_terminals: whether to return actual Terminal objects of all terminals rather than just end positions
     :return: a list of positions in the Passage, each denotes a closing Terminal of a paragraph.
     """
     del args, kwargs
-    terminals = list(extract_terminals(passage))
-    if not terminals:
-        return []
-    return [list(p) for _, p in groupby(terminals, key=attrgetter("paragraph"))] if return_terminals else \
-        [t.position - 1 for t in terminals if t.position > 1 and t.para_pos == 1] + [terminals[-1].position]
+    l0 = passage.layer(layer0.LAYER_ID)
+    if return_terminals:
+        return [l0.paragraph_terminals(k) for k in range(1, l0.paragraph_count + 1)]
+    return l0.paragraph_ends()
 
 
 def indent_xml(xml_as_string):
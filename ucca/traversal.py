@@ -0,0 +1,170 @@
+"""Linear-time traversal of UCCA annotation graphs.
+
+All traversals are generators which take constant time per visited element.
+They work on the :class:`core`.Node objects reachable from the given start
+nodes through their outgoing edges, and can be restricted to a subset of the
+edges by an edge filter: a boolean function taking an :class:`core`.Edge,
+e.g. :func:`is_primary` to skip remote edges.
+
+Unless duplicates are requested, each element is visited once, even when it
+is reachable through several paths, and cycles are tolerated.
+
+"""
+
+from collections import deque
+
+
+def is_primary(edge):
+    """Edge filter for primary (non-remote) edges."""
+    return not edge.attrib.get("remote")
+
+
+def is_remote(edge):
+    """Edge filter for remote edges."""
+    return bool(edge.attrib.get("remote"))
+
+
+def _successors(edges, edge_filter):
+    """Returns a function mapping an element to its children, in order.
+
+    :param edges: whether elements are edges (otherwise nodes)
+    :param edge_filter: function returning whether to follow an edge, or None to follow all
+
+    """
+    if edges:
+        def successors(edge):
+            return [e for e in edge.child._outgoing if edge_filter is None or edge_filter(e)]
+    else:
+        def successors(node):
+            return [e.child for e in node._outgoing if edge_filter is None or edge_filter(e)]
+    return successors
+
+
+def _initial(nodes, edges, edge_filter):
+    if edges:
+        return [e for node in nodes for e in node._outgoing if edge_filter is None or edge_filter(e)]
+    return list(nodes)
+
+
+def bfs(*nodes, edges=False, duplicates=False, edge_filter=None):
+    """Iterates the subgraph under the given nodes breadth-first.
+
+    :param nodes: the Nodes to start from
+    :param edges: whether to yield Edges rather than Nodes. If True, the
+        start nodes themselves are not yielded, only the Edges under them.
+    :param duplicates: whether to yield an element again every time it is
+        reached (which never ends if there is a cycle). Defaults to False.
+    :param edge_filter: function returning whether to follow a given Edge
+
+    Yields:
+        :class:`core`.Node or :class:`core`.Edge objects, level by level.
+
+    """
+    successors = _successors(edges, edge_filter)
+    queue = deque(_initial(nodes, edges, edge_filter))
+    visited = set()
+    while queue:
+        element = queue.popleft()
+        if not duplicates:
+            if id(element) in visited:
+                continue
+            visited.add(id(element))
+        yield element
+        queue.extend(x for x in successors(element) if duplicates or id(x) not in visited)
+
+
+def dfs(*nodes, edges=False, duplicates=False, edge_filter=None):
+    """Iterates the subgraph under the given nodes depth-first, in pre-order.
+
+    :param nodes: the Nodes to start from
+    :param edges: whether to yield Edges rather than Nodes. If True, the
+        start nodes themselves are not yielded, only the Edges under them.
+    :param duplicates: whether to yield an element again every time it is
+        reached (which never ends if there is a cycle). Defaults to False.
+    :param edge_filter: function returning whether to follow a given Edge
+
+    Yields:
+        :class:`core`.Node or :class:`core`.Edge objects, each before the
+        elements under it.
+
+    """
+    successors = _successors(edges, edge_filter)
+    stack = _initial(nodes, edges, edge_filter)[::-1]
+    visited = set()
+    while stack:
+        element = stack.pop()
+        if not duplicates:
+            if id(element) in visited:
+                continue
+            visited.add(id(element))
+        yield element
+        stack.extend(reversed([x for x in successors(element) if duplicates or id(x) not in visited]))
+
+
+def postorder(*nodes, edge_filter=None):
+    """Iterates the Nodes under the given nodes depth-first, in post-order.
+
+    Each Node is yielded once, after all the Nodes under it (except for
+    Nodes on a cycle with it, which are cut where the cycle closes).
+
+    :param nodes: the Nodes to start from
+    :param edge_filter: function returning whether to follow a given Edge
+
+    Yields:
+        :class:`core`.Node objects, children before their parents.
+
+    """
+    successors = _successors(False, edge_filter)
+    visited = set()
+    for node in nodes:
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        stack = [(node, iter(successors(node)))]
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                if id(child) not in visited:
+                    visited.add(id(child))
+                    stack.append((child, iter(successors(child))))
+                    break
+            else:
+                stack.pop()
+                yield parent
+
+
+def topological_order(passage, edge_filter=None):
+    """Iterates all Nodes of a Passage so that parents come before children.
+
+    Nodes are taken in the order of their Layers when there is no constraint
+    between them.
+
+    :param passage: the :class:`core`.Passage whose Nodes to order
+    :param edge_filter: function returning whether to take a given Edge into account
+
+    Yields:
+        :class:`core`.Node objects, each after all of its parents.
+
+    :raise ValueError: if the (filtered) graph has a cycle, once all Nodes
+        not on or under it have been yielded
+
+    """
+    nodes = [node for layer in passage.layers for node in layer.all]
+    in_degree = dict.fromkeys(map(id, nodes), 0)
+    for node in nodes:
+        for edge in node._outgoing:
+            if edge_filter is None or edge_filter(edge):
+                in_degree[id(edge.child)] += 1
+    queue = deque(node for node in nodes if not in_degree[id(node)])
+    yielded = 0
+    while queue:
+        node = queue.popleft()
+        yield node
+        yielded += 1
+        for edge in node._outgoing:
+            if edge_filter is None or edge_filter(edge):
+                in_degree[id(edge.child)] -= 1
+                if not in_degree[id(edge.child)]:
+                    queue.append(edge.child)
+    if yielded < len(nodes):
+        raise ValueError("Passage %s has a cycle" % passage.ID)
@@ -1,5 +1,5 @@
 import argparse
-from ucca import layer1, convert
+from ucca import layer0, layer1, convert
 from uccaapp.download_task import TaskDownloader
 
 desc = "Get all units according to a specified filter. Units that meet any of the filters are output."
@@ -25,27 +25,28 @@ def get_top_level_ancestor(node):
         return parent
 
 
-def tokens_match(tokens1, tokens2, mode):
+def units_matching_tokens(passage, tokens, mode, case_insensitive=False):
     """
-    Returns True iff tokens2 is contained in tokens1.
+    Returns the units which contain the tokens, using the token index of the passage
     mode can be CONSECUTIVE, SUBSET, SUBSEQUENCE
-    :param tokens1:
-    :param tokens2:
-    :param mode:
+    :param passage: Passage object to search
+    :param tokens: list of token texts to search for
+    :param mode: how the tokens should occur in the unit
+    :param case_insensitive: whether to ignore case
+    :return: set of the minimal units covering each match, and their ancestors
     """
-    if mode == SUBSET:
-        return set(tokens2).issubset(set(tokens1))
-    else:
-        try:
-            indices = [tokens1.index(t) for t in tokens2]
-            if mode == CONSECUTIVE:
-                return indices == list(range(indices[0],indices[0]+len(indices)))
-            elif mode == SUBSEQUENCE:
-                return indices == sorted(indices)
-            else:
-                raise Exception("Invalid option for token mode")
-        except ValueError:
-            return False
+    l0 = passage.layer(layer0.LAYER_ID)
+    l1 = passage.layer(layer1.LAYER_ID)
+    find = {CONSECUTIVE: l0.find_phrase, SUBSEQUENCE: l0.find_subsequence, SUBSET: l0.find_subset}.get(mode)
+    if find is None:
+        raise Exception("Invalid option for token mode")
+    units = set()
+    for start, end in find(tokens, lowercase=case_insensitive):
+        node = l1.covering_unit(l0.all[start:end])
+        while node is not None and node not in units:
+            units.add(node)
+            node = node.fparent
+    return units
 
 
 def main(output = None, comment = False, sentence_level = False, categories = (), tokens = (), tokens_mode = CONSECUTIVE,
@@ -56,16 +57,16 @@ def main(output = None, comment = False, sentence_level = False, categories = ()
             cur_passages = convert.split2sentences(passage)
             all_nodes = [P.layer('1').heads[0] for P in cur_passages]
         else:
+            cur_passages = [passage]
             all_nodes = list(passage.layer(layer1.LAYER_ID).all)
+        if tokens:
+            matching_units = set().union(*(units_matching_tokens(P, tokens, tokens_mode, case_insensitive)
+                                           for P in cur_passages))
         for node in all_nodes:
             if comment and node.extra.get("remarks"):
                 filtered_nodes.append(("comment",node,task_id,user_id))
             if tokens and not node.attrib.get("implicit"):
-                unit_tokens = [t.text for t in node.get_terminals(punct=True)]
-                if case_insensitive:
-                    unit_tokens = [x.lower() for x in unit_tokens]
-                    tokens = [x.lower() for x in tokens]
-                if tokens_match(unit_tokens, tokens, tokens_mode):
+                if node in matching_units:
                     filtered_nodes.append(('TOKENS', node, task_id, user_id))
             else:
                 all_tags = []